@@ -0,0 +1,240 @@
+"""
+Admission Control
+Bounds concurrent work per workload class and sheds low-priority requests
+with a fast 503 when the event loop falls behind, so reviewer and chair
+traffic (and health checks) stay responsive at submission deadlines
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from timing import record
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Lower value = shed first"""
+    LOW = 0  # Re-runnable author helpers (polish, keywords)
+    NORMAL = 1  # Author spellcheck
+    HIGH = 2  # Reviewer and chair workflows
+
+
+class Workload:
+    CPU = "cpu"  # Runs on the event loop / a core for its whole duration
+    LLM = "llm"  # Mostly waits on Groq in a worker thread
+
+
+# (path prefix, workload, priority) - first match wins, unmatched paths are not gated
+ENDPOINT_CLASSES: List[Tuple[str, str, Priority]] = [
+    ("/api/ai/author/spellcheck/manuscript", Workload.LLM, Priority.NORMAL),
+    ("/api/ai/author/spellcheck", Workload.LLM, Priority.NORMAL),
+    ("/api/ai/author/polish", Workload.LLM, Priority.LOW),
+    ("/api/ai/author/keywords", Workload.CPU, Priority.LOW),
+    ("/api/ai/reviewer/", Workload.CPU, Priority.HIGH),
+    ("/api/ai/chair/near-duplicates", Workload.CPU, Priority.HIGH),
+    ("/api/ai/chair/", Workload.LLM, Priority.HIGH),
+]
+
+# Event-loop lag, as a multiple of ADMISSION_TARGET_LAG, at which a priority is shed
+SHED_AT_PRESSURE = {
+    Priority.LOW: 1.0,
+    Priority.NORMAL: 3.0,
+    Priority.HIGH: float("inf"),  # Only rejected when its queue is full
+}
+
+# Share of a workload's queue each priority may fill
+QUEUE_SHARE = {
+    Priority.LOW: 0.25,
+    Priority.NORMAL: 0.5,
+    Priority.HIGH: 1.0,
+}
+
+
+def classify(path: str) -> Optional[Tuple[str, Priority]]:
+    for prefix, workload, priority in ENDPOINT_CLASSES:
+        if path.startswith(prefix):
+            return workload, priority
+    return None
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a fixed sleep (EWMA)"""
+
+    def __init__(self, interval: float, smoothing: float = 0.3):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - start - self.interval, 0.0)
+            self.lag += self.smoothing * (lag - self.lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+class WorkloadGate:
+    """Concurrency limit plus bounded wait queue for one workload class"""
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed: Dict[str, int] = {p.name.lower(): 0 for p in Priority}
+
+    def queue_allows(self, priority: Priority) -> bool:
+        if self.active < self.limit:
+            return True
+        return self.waiting < max(int(self.max_queue * QUEUE_SHARE[priority]), 1)
+
+    async def acquire(self, timeout: float) -> bool:
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+        }
+
+
+class AdmissionController:
+    """Decides per request: run now, queue, or reject with 503"""
+
+    def __init__(self, target_lag: float, queue_timeout: float, lag_interval: float):
+        self.target_lag = target_lag
+        self.queue_timeout = queue_timeout
+        self.monitor = LoopLagMonitor(lag_interval)
+        cpu_limit = settings.ADMISSION_CPU_CONCURRENCY or (os.cpu_count() or 1)
+        llm_limit = settings.ADMISSION_LLM_CONCURRENCY or settings.LLM_MAX_CONCURRENCY * 4
+        self.gates = {
+            Workload.CPU: WorkloadGate(Workload.CPU, cpu_limit, cpu_limit * settings.ADMISSION_QUEUE_FACTOR),
+            Workload.LLM: WorkloadGate(Workload.LLM, llm_limit, llm_limit * settings.ADMISSION_QUEUE_FACTOR),
+        }
+
+    def pressure(self) -> float:
+        """Event-loop lag relative to the target (1.0 = at target)"""
+        return self.monitor.lag / self.target_lag if self.target_lag > 0 else 0.0
+
+    def retry_after(self) -> int:
+        return max(1, int(round(self.queue_timeout + self.monitor.lag)))
+
+    async def admit(self, workload: str, priority: Priority) -> Optional[str]:
+        """Take a slot; returns the rejection reason instead when shedding"""
+        gate = self.gates[workload]
+        key = priority.name.lower()
+        if self.pressure() >= SHED_AT_PRESSURE[priority]:
+            gate.shed[key] += 1
+            return "event_loop_lag"
+        if not gate.queue_allows(priority):
+            gate.shed[key] += 1
+            return "queue_full"
+        if not await gate.acquire(self.queue_timeout):
+            gate.shed[key] += 1
+            return "queue_timeout"
+        return None
+
+    def release(self, workload: str):
+        self.gates[workload].release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "event_loop_lag_ms": round(self.monitor.lag * 1000, 2),
+            "event_loop_lag_max_ms": round(self.monitor.max_lag * 1000, 2),
+            "pressure": round(self.pressure(), 2),
+            "workloads": {name: gate.stats() for name, gate in self.gates.items()},
+        }
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware, so streaming responses keep their slot until done"""
+
+    def __init__(self, app, controller: "AdmissionController"):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.ENABLE_ADMISSION_CONTROL:
+            await self.app(scope, receive, send)
+            return
+        classification = classify(scope["path"])
+        if classification is None:
+            await self.app(scope, receive, send)
+            return
+
+        workload, priority = classification
+        waiting = time.perf_counter()
+        reason = await self.controller.admit(workload, priority)
+        record("admission", time.perf_counter() - waiting)
+        if reason is not None:
+            await self._reject(send, reason)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(workload)
+
+    async def _reject(self, send, reason: str):
+        logger.warning(f"Request shed: {reason}")
+        # Same shape as models.ErrorResponse
+        body = json.dumps({
+            "error": "Service overloaded",
+            "detail": f"Request shed ({reason}) - please retry shortly",
+            "feature": None,
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.controller.retry_after()).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Global controller instance
+admission_controller = AdmissionController(
+    target_lag=settings.ADMISSION_TARGET_LAG,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+    lag_interval=settings.ADMISSION_LAG_INTERVAL
+)
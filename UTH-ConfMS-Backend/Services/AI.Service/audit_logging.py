@@ -14,6 +14,7 @@ import logging
 
 from models import AuditLogEntry, AIFeature, UserRole
 from config import settings
+from timing import stage
 
 
 class AuditLogger:
@@ -124,7 +125,8 @@ class AuditLogger:
             log_message += f" | metadata={json.dumps(metadata)}"
         
         # Write to log
-        self.logger.info(log_message)
+        with stage("audit"):
+            self.logger.info(log_message)
         
         return log_id
     
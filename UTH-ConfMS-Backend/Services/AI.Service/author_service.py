@@ -4,260 +4,185 @@ Provides AI assistance for authors during paper submission
 Focus: Vietnamese spell checking and keyword extraction
 """
 
+import asyncio
 import re
-from typing import List, Dict
+from typing import AsyncIterator, Iterable, List, Dict, Optional, Tuple
 from collections import Counter
 import nltk
 from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
-from groq import Groq
 
 from models import (
-    SpellCheckRequest, SpellCheckResponse, TextCorrection,
-    PolishRequest, PolishResponse,
-    KeywordSuggestionRequest, KeywordSuggestionResponse,
+    SpellCheckRequest,
+    PolishRequest, PolishResponse, TextChange,
+    KeywordSuggestionRequest,
     AIFeature, UserRole
 )
+from records import Correction, SpellCheckResult, KeywordSuggestionResult
+from corrections import resolve, apply as apply_corrections, to_patches, IntervalSet
 from config import settings
 from audit_logging import audit_logger
+from fast_json import dumps_line
+from manuscript import iter_chunks, ManuscriptTooLarge
+from llm import chat_completion, groq_client
+from prompts import POLISH, CONTEXTUAL_EN, CONTEXTUAL_VI, prompt_usage
+from textdiff import diff_words
+from circuit_breaker import groq_breaker, CircuitOpenError
+from deadline import Deadline, DeadlineExceeded, degraded_stages
+from collocations import collocation_stats
+from tokenizer import fold, segment, terms, MIN_SYLLABLE_LENGTH
+from resources import get_resources
+from contextual_gate import contextual_gate
+from diacritics import diacritic_restorer
+from timing import stage
+from langid import language_spans, languages_of, join_spans, LanguageSpan, VIETNAMESE, ENGLISH
 
 
 class AuthorAIService:
     """AI service for author support - Vietnamese spell checking and keyword extraction"""
     
     def __init__(self):
-        self.vietnamese_dict = self._build_dictionary()
-        self.vietnamese_stopwords = self._build_vietnamese_stopwords()
-        
-        # Initialize Groq client if API key is available
-        self.groq_client = None
-        if settings.GROQ_API_KEY and settings.GROQ_API_KEY != "your_groq_api_key_here":
-            try:
-                self.groq_client = Groq(api_key=settings.GROQ_API_KEY)
-            except Exception as e:
-                print(f"Warning: Failed to initialize Groq client: {e}")
-                self.groq_client = None
+        # Shared Groq client (pooled keep-alive transport); None if not configured
+        self.groq_client = groq_client
     
-    def _build_vietnamese_stopwords(self) -> set:
-        """Build Vietnamese stopwords set"""
-        stopwords_vi = {
-            # Đại từ
-            'tôi', 'bạn', 'anh', 'chị', 'em', 'họ', 'chúng', 'ta', 'mình',
-            # Liên từ
-            'và', 'hoặc', 'nhưng', 'mà', 'hay', 'còn', 'cũng', 'vì', 'do',
-            # Giới từ
-            'của', 'cho', 'với', 'từ', 'trong', 'ngoài', 'trên', 'dưới', 'về',
-            'đến', 'tại', 'qua', 'theo', 'bằng', 'để', 'khi', 'sau', 'trước',
-            # Trợ từ
-            'là', 'được', 'có', 'không', 'đã', 'sẽ', 'đang', 'vẫn', 'còn',
-            'thì', 'nếu', 'như', 'bởi', 'nên', 'rằng', 'mỗi', 'các', 'này',
-            'đó', 'kia', 'nào', 'gì', 'ai', 'đâu', 'thế', 'nào',
-            # Động từ phổ biến
-            'làm', 'đi', 'đến', 'ra', 'vào', 'lên', 'xuống', 'về', 'qua',
-            # Số từ
-            'một', 'hai', 'ba', 'bốn', 'năm', 'sáu', 'bảy', 'tám', 'chín',
-            'mười', 'trăm', 'nghìn', 'triệu', 'tỷ',
-            # English common words
-            'the', 'and', 'for', 'this', 'that', 'with', 'from', 'are', 'was',
-            'were', 'been', 'have', 'has', 'had', 'can', 'will', 'would', 'could'
-        }
-        return stopwords_vi
+    @property
+    def vietnamese_dict(self) -> Dict[str, str]:
+        """Vietnamese dictionary: no-diacritics -> correct form (active resource version)"""
+        return get_resources().dictionary
     
-    def _build_dictionary(self) -> Dict[str, str]:
-        """Build Vietnamese dictionary: no-diacritics -> correct form"""
-        correct_words = [
-            # Từ học thuật phổ biến
-            'bài', 'báo', 'cáo', 'này', 'nay', 'trình', 'bày', 'kết', 'quả',
-            'nghiên', 'cứu', 'phương', 'pháp', 'về', 'sử', 'dụng', 'công', 'nghệ',
-            'thông', 'tin', 'giáo', 'dục', 'hệ', 'thống', 'dữ', 'liệu',
-            'phân', 'tích', 'đánh', 'giá', 'thiết', 'kế', 'phát', 'triển',
-            'nghiệp', 'sinh', 'viên', 'giảng', 'môn', 'học', 'khoa',
-            'đề', 'tài', 'liệu', 'chuyên', 'mục', 'tiêu', 'yêu', 'cầu',
-            'thực', 'hiện', 'ứng', 'dụng', 'giải', 'pháp', 'vấn', 'đề',
-            
-            # Đại từ và liên từ
-            'tôi', 'tui', 'chúng', 'chung', 'anh', 'chị', 'em',
-            'khi', 'được', 'các', 'cho', 'của', 'từ', 'với', 'và',
-            'có', 'không', 'là', 'đã', 'sẽ', 'để', 'theo', 'nhưng',
-            'mà', 'nếu', 'thì', 'cũng', 'đến', 'trong', 'trên', 'tại',
-            'sau', 'trước', 'đây', 'đó', 'người', 'năm', 'ngày', 'thời',
-            
-            # Động từ phổ biến
-            'thập', 'làm', 'việc', 'đào', 'tạo', 'gian', 
-            'liên', 'quan', 'hệ', 'thứ', 'kiểm', 'tra',
-            
-            # Từ về địa danh
-            'nước', 'thế', 'giới', 'quốc', 'tế', 'Hồ', 'Chí', 'Minh',
-            'Hà', 'Nội', 'Đà', 'Nẵng', 'Cần', 'Thơ', 'Huế', 'Hải', 'Phòng',
-            
-            # Từ chính trị - kinh tế - xã hội
-            'chính', 'trị', 'kinh', 'tế', 'xã', 'hội', 'văn', 'hóa',
-            'khách', 'hàng', 'sản', 'phẩm', 'dịch', 'vụ', 'quản', 'lý',
-            
-            # Từ về tổ chức
-            'tổ', 'chức', 'doanh', 'công', 'ty', 'cơ', 'quan', 'đơn', 'vị',
-            'địa', 'điểm', 'vị', 'trí', 'khu', 'vực', 'miền', 'tỉnh', 'thành',
-            'phố', 'thị', 'trường', 'trường', 'lớp', 'trường', 'hợp',
-            
-            # Từ mô tả
-            'hình', 'thức', 'loại', 'kiểu', 'mẫu', 'số', 'lượng',
-            'chất', 'lượng', 'tiêu', 'chuẩn', 'quy', 'định', 'luật', 'pháp',
-            
-            # Từ về vai trò
-            'quyền', 'lợi', 'nghĩa', 'vụ', 'trách', 'nhiệm', 'ủy', 'ban',
-            'hội', 'đồng', 'đại', 'biểu', 'ủy', 'viên', 'chủ', 'tịch',
-            'phó', 'ký', 'kế', 'toán', 'giám', 'đốc', 'hiệu', 'trưởng',
-            
-            # Từ công nghệ
-            'máy', 'tính', 'điện', 'thoại', 'mạng', 'internet', 'website',
-            'email', 'phần', 'mềm', 'cứng', 'lập', 'trình', 'chương', 'trình',
-            'tệp', 'tin', 'dữ', 'liệu', 'cơ', 'sở', 'bảng', 'trường', 'bản', 'ghi',
-            
-            # Từ về hệ thống
-            'giao', 'diện', 'người', 'dùng', 'đăng', 'nhập', 'đăng', 'ký',
-            'tài', 'khoản', 'mật', 'khẩu', 'bảo', 'mật', 'an', 'toàn',
-            'sao', 'lưu', 'phục', 'hồi', 'cập', 'nhật', 'nâng', 'cấp',
-            
-            # Từ về hành động
-            'khởi', 'động', 'tắt', 'khởi', 'chạy', 'dừng', 'tạm', 'dừng',
-            'kết', 'nối', 'ngắt', 'tải', 'lên', 'xuống', 'gửi', 'nhận',
-            'mở', 'đóng', 'lưu', 'xóa', 'sửa', 'thêm', 'bớt', 'tìm', 'kiếm',
-            'tìm', 'tra', 'cứu', 'tra', 'tìm', 'xem', 'đọc', 'viết', 'in',
-            'chỉnh', 'sửa', 'điều', 'chỉnh', 'thay', 'đổi', 'cải', 'tiến',
-            
-            # Từ về quy trình
-            'nộp', 'gửi', 'nhận', 'duyệt', 'phê', 'duyệt', 'từ', 'chối',
-            'chấp', 'nhận', 'đồng', 'ý', 'hủy', 'bỏ', 'hủy', 'hoàn', 'thành',
-            'hoàn', 'tất', 'kết', 'thúc', 'bắt', 'đầu', 'khởi', 'đầu',
-        ]
-        
-        viet_dict = {}
-        for word in correct_words:
-            key = self._remove_diacritics(word).lower()
-            if key != word.lower():
-                viet_dict[key] = word
-        
-        return viet_dict
+    @property
+    def vietnamese_stopwords(self) -> frozenset:
+        """Vietnamese stopwords (active resource version)"""
+        return get_resources().stopwords
     
     def _remove_diacritics(self, text: str) -> str:
         """Remove all Vietnamese diacritics"""
-        replacements = {
-            'à': 'a', 'á': 'a', 'ả': 'a', 'ã': 'a', 'ạ': 'a',
-            'ă': 'a', 'ằ': 'a', 'ắ': 'a', 'ẳ': 'a', 'ẵ': 'a', 'ặ': 'a',
-            'â': 'a', 'ầ': 'a', 'ấ': 'a', 'ẩ': 'a', 'ẫ': 'a', 'ậ': 'a',
-            'è': 'e', 'é': 'e', 'ẻ': 'e', 'ẽ': 'e', 'ẹ': 'e',
-            'ê': 'e', 'ề': 'e', 'ế': 'e', 'ể': 'e', 'ễ': 'e', 'ệ': 'e',
-            'ì': 'i', 'í': 'i', 'ỉ': 'i', 'ĩ': 'i', 'ị': 'i',
-            'ò': 'o', 'ó': 'o', 'ỏ': 'o', 'õ': 'o', 'ọ': 'o',
-            'ô': 'o', 'ồ': 'o', 'ố': 'o', 'ổ': 'o', 'ỗ': 'o', 'ộ': 'o',
-            'ơ': 'o', 'ờ': 'o', 'ớ': 'o', 'ở': 'o', 'ỡ': 'o', 'ợ': 'o',
-            'ù': 'u', 'ú': 'u', 'ủ': 'u', 'ũ': 'u', 'ụ': 'u',
-            'ư': 'u', 'ừ': 'u', 'ứ': 'u', 'ử': 'u', 'ữ': 'u', 'ự': 'u',
-            'ỳ': 'y', 'ý': 'y', 'ỷ': 'y', 'ỹ': 'y', 'ỵ': 'y',
-            'đ': 'd', 'Đ': 'D',
-        }
-        return ''.join(replacements.get(c, c) for c in text)
+        return fold(text)
     
-    def _check_vietnamese_spelling(self, text: str) -> List[TextCorrection]:
-        """Check Vietnamese spelling using regex word boundaries"""
+    def _check_vietnamese_spelling(self, text: str) -> List[Correction]:
+        """Check Vietnamese spelling on the segmented token stream"""
         corrections = []
+        # One resource version for the whole text, even if a reload lands meanwhile
+        resources = get_resources()
+        lexicon, dictionary = resources.lexicon, resources.dictionary
         
-        # 1. Check common academic phrases FIRST (bigram priority)
-        phrase_dict = {
-            'bai bao': 'bài báo',  # scientific paper (NOT "báo cáo")
-            'nghien cuu': 'nghiên cứu',
-            'phuong phap': 'phương pháp',
-            'ket qua': 'kết quả',
-            'du lieu': 'dữ liệu',
-            'phan tich': 'phân tích',
-            'thac si': 'thạc sĩ',
-            'tien si': 'tiến sĩ',
-        }
-        
-        for no_dia, correct in phrase_dict.items():
-            phrase_pattern = r'\b' + no_dia.replace(' ', r'\s+') + r'\b'
-            for match in re.finditer(phrase_pattern, text, re.IGNORECASE):
-                original = match.group()
-                if original.lower() != correct.lower():
-                    corrections.append(TextCorrection(
+        for token in segment(text, lexicon):
+            # 1. Multi-syllable words: compare with the lexicon's accented form
+            if token.size > 1:
+                correct = lexicon.form(token.key)
+                original = token.text
+                if correct and " ".join(original.lower().split()) != correct.lower():
+                    corrections.append(Correction(
                         original=original,
                         suggested=correct if original[0].islower() else correct.capitalize(),
-                        position=match.start(),
+                        position=token.start,
                         error_type="phrase",
                         explanation=f"Cụm từ học thuật thiếu dấu"
                     ))
-        
-        # 2. Check single words (skip positions already corrected)
-        corrected_ranges = [(c.position, c.position + len(c.original)) for c in corrections]
-        
-        # Match Vietnamese words (3+ chars only to avoid false positives)
-        pattern = r'\b[a-zA-ZàáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđĐ]{3,}\b'
-        
-        for match in re.finditer(pattern, text):
-            word = match.group()
-            position = match.start()
-            
-            # Skip if overlaps with phrase correction
-            if any(start <= position < end for start, end in corrected_ranges):
                 continue
             
-            # Check dictionary
-            word_no_dia = self._remove_diacritics(word).lower()
-            
-            if word_no_dia in self.vietnamese_dict:
-                correct = self.vietnamese_dict[word_no_dia]
-                
-                # Preserve capitalization
-                if word[0].isupper():
-                    correct = correct.capitalize()
-                
-                if word != correct:
-                    corrections.append(TextCorrection(
-                        original=word,
-                        suggested=correct,
-                        position=position,
-                        error_type="spelling",
-                        explanation=f"Thiếu dấu tiếng Việt"
-                    ))
+            # 2. Single syllables (3+ chars only to avoid false positives)
+            word = token.text
+            if len(word) < MIN_SYLLABLE_LENGTH or token.key not in dictionary:
+                continue
+            correct = dictionary[token.key]
+            
+            # Preserve capitalization
+            if word[0].isupper():
+                correct = correct.capitalize()
+            
+            if word != correct:
+                corrections.append(Correction(
+                    original=word,
+                    suggested=correct,
+                    position=token.start,
+                    error_type="spelling",
+                    explanation=f"Thiếu dấu tiếng Việt"
+                ))
         
+        return resolve(text, corrections)
+    
+    def _check_spelling_routed(self, text: str, spans: Iterable[LanguageSpan]) -> List[Correction]:
+        """
+        Dictionary and diacritic-model pass over the Vietnamese sentences only
+        English has nothing to re-accent
+        """
+        corrections = []
+        for span in spans:
+            if span.language != VIETNAMESE:
+                continue
+            segment_text = text[span.start:span.end]
+            restored, confirmed = diacritic_restorer.analyze(segment_text)
+            # The model overrules the dictionary's single guess where context settles it
+            found = [
+                corr for corr in self._check_vietnamese_spelling(segment_text)
+                if not (corr.error_type == "spelling" and corr.position in confirmed)
+            ]
+            for corr in resolve(segment_text, found + restored):
+                corr.position += span.start
+                corrections.append(corr)
+        return corrections
+    
+    def _dictionary_pass(self, text: str) -> Tuple[Tuple[LanguageSpan, ...], List[Correction]]:
+        """Language routing and dictionary pass of one manuscript chunk (CPU-bound)"""
+        spans = language_spans(text)
+        return spans, self._check_spelling_routed(text, spans)
+    
+    def _check_contextual_routed(
+        self,
+        text: str,
+        spans: Iterable[LanguageSpan],
+        deadline: Optional[Deadline] = None
+    ) -> List[Correction]:
+        """
+        One contextual AI call per language present, each with its own prompt
+        Vietnamese text only reaches the LLM when the local gate escalates it;
+        the gate sees the text after diacritic restoration, so syllables the
+        local model already settled do not count as ambiguous
+        """
+        spans = list(spans)
+        corrections = []
+        if not self.groq_client:
+            return corrections
+        for language in languages_of(spans):
+            if language == ENGLISH and not settings.ENABLE_ENGLISH_CONTEXTUAL_CHECK:
+                continue
+            joined, to_original = join_spans(text, [s for s in spans if s.language == language])
+            if language == VIETNAMESE:
+                restored, confirmed = diacritic_restorer.analyze(joined)
+                # Restoration keeps syllable lengths, so confirmed positions still hold
+                if not contextual_gate.decide(apply_corrections(joined, restored), confirmed).escalate:
+                    continue
+            for corr in self._check_contextual_errors_with_ai(joined, deadline, language):
+                position = to_original(corr.position, len(corr.original))
+                if position is not None:
+                    corr.position = position
+                    corrections.append(corr)
         return corrections
     
-    def _check_contextual_errors_with_ai(self, text: str) -> List[TextCorrection]:
-        """Use Groq AI to detect contextual errors (e.g., 'moi' vs 'mới')"""
+    def _check_contextual_errors_with_ai(
+        self,
+        text: str,
+        deadline: Optional[Deadline] = None,
+        language: str = VIETNAMESE
+    ) -> List[Correction]:
+        """Use Groq AI to detect contextual errors (e.g., 'moi' vs 'mới', 'there' vs 'their')"""
         corrections = []
         
         if not self.groq_client:
             return corrections
         
         try:
-            prompt = f"""Bạn là chuyên gia tiếng Việt chuyên về văn bản KHOA HỌC/HỌC THUẬT.
-            
-NGỮ CẢNH: Đây là văn bản trong hệ thống quản lý BÀI BÁO KHOA HỌC (scientific paper/conference paper).
-
-Tìm LỖI NGỮ CẢNH (ví dụ: "phương pháp moi" → "phương pháp mới", "bai bao" → "bài báo").
-
-LƯU Ý:
-- "bài báo" = scientific paper (ĐÚNG)
-- "bài bảo" hoặc "báo cáo" = report (SAI trong ngữ cảnh này)
-- Chỉ sửa từ SAI RÕ RÀNG, không sửa từ đúng ngữ pháp
-
-CHỈ TRẢ VỀ JSON:
-{{"errors": [{{"original": "từ sai", "correct": "từ đúng", "context": "ngữ cảnh"}}]}}
-
-Nếu không có lỗi: {{"errors": []}}
-
-Văn bản:
-{text}"""
-
-            response = self.groq_client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "Bạn là chuyên gia kiểm tra tiếng Việt. Chỉ trả về JSON."},
-                    {"role": "user", "content": prompt}
-                ],
+            prompt = (CONTEXTUAL_EN if language == ENGLISH else CONTEXTUAL_VI).render(text)
+            response = chat_completion(
+                self.groq_client,
+                deadline=deadline,
+                messages=prompt.messages,
                 model=settings.GROQ_MODEL,
                 temperature=0.3,
-                max_tokens=500,
+                max_tokens=prompt.max_tokens,
             )
+            prompt_usage.record(prompt, response)
             
             result_text = response.choices[0].message.content.strip()
             
@@ -282,49 +207,69 @@ Văn bản:
                         # Find position in text
                         position = text.find(original)
                         if position >= 0:
-                            corrections.append(TextCorrection(
+                            corrections.append(Correction(
                                 original=original,
                                 suggested=correct,
                                 position=position,
                                 error_type="contextual",
-                                explanation=f"Lỗi ngữ cảnh: {context[:50]}"
+                                explanation=(
+                                    f"Contextual error: {context[:50]}" if language == ENGLISH
+                                    else f"Lỗi ngữ cảnh: {context[:50]}"
+                                )
                             ))
         
+        except CircuitOpenError:
+            # Groq is down - dictionary-only result
+            pass
+        except DeadlineExceeded:
+            deadline.degrade("contextual_check")
         except Exception as e:
             # Silently fail, don't break spell checking
-            print(f"AI contextual check error: {e}")
+            if deadline is not None and deadline.expired():
+                deadline.degrade("contextual_check")
+            else:
+                print(f"AI contextual check error: {e}")
         
         return corrections
     
-    def spell_and_grammar_check(self, request: SpellCheckRequest) -> SpellCheckResponse:
-        """Check Vietnamese spelling + AI contextual errors"""
+    def spell_and_grammar_check(
+        self,
+        request: SpellCheckRequest,
+        deadline: Optional[Deadline] = None
+    ) -> SpellCheckResult:
+        """
+        Check Vietnamese spelling + AI contextual errors
+        The AI stage is skipped when the request deadline leaves no time for it
+        """
         if not settings.ENABLE_AUTHOR_SPELLCHECK:
             audit_logger.log_feature_disabled(request.user_id, AIFeature.AUTHOR_SPELLCHECK)
             raise ValueError("Spell check feature is disabled")
         
         original_text = request.text
+        # Route each sentence by language: English skips the Vietnamese stages
+        with stage("langid"):
+            spans = language_spans(original_text)
         
         # 1. Dictionary-based spelling check
-        corrections = self._check_vietnamese_spelling(original_text)
+        with stage("dictionary"):
+            dict_corrections = self._check_spelling_routed(original_text, spans)
         
         # 2. AI-powered contextual check (if available)
-        ai_corrections = self._check_contextual_errors_with_ai(original_text)
+        with stage("contextual"):
+            ai_corrections = self._check_contextual_routed(original_text, spans, deadline)
         
-        # Merge corrections (avoid duplicates)
-        existing_positions = {c.position for c in corrections}
-        for ai_corr in ai_corrections:
-            if ai_corr.position not in existing_positions:
-                corrections.append(ai_corr)
-        
-        # Apply corrections
-        suggested_text = original_text
-        if corrections:
-            for corr in sorted(corrections, key=lambda x: x.position, reverse=True):
-                suggested_text = (
-                    suggested_text[:corr.position] +
-                    corr.suggested +
-                    suggested_text[corr.position + len(corr.original):]
-                )
+        # Merge corrections - dictionary wins over AI wherever they overlap
+        with stage("merge"):
+            corrections = resolve(original_text, dict_corrections + ai_corrections)
+            ai_count = sum(1 for c in corrections if c.error_type == "contextual")
+            
+            # Apply corrections (single pass) or return patches
+            suggested_text = None
+            patches = None
+            if request.output_format == "patch":
+                patches = to_patches(corrections)
+            else:
+                suggested_text = apply_corrections(original_text, corrections)
         
         # Log operation
         audit_logger.log_ai_operation(
@@ -334,22 +279,175 @@ Văn bản:
             input_text=original_text,
             output_data={
                 "corrections_count": len(corrections),
-                "dict_corrections": len(corrections) - len(ai_corrections),
-                "ai_corrections": len(ai_corrections)
+                "dict_corrections": len(corrections) - ai_count,
+                "ai_corrections": ai_count
             },
             applied=False,
-            metadata={"field_type": request.field_type}
+            metadata={
+                "field_type": request.field_type,
+                "languages": languages_of(spans),
+                "degraded_stages": degraded_stages(deadline)
+            }
         )
         
-        return SpellCheckResponse(
+        return SpellCheckResult(
             original_text=original_text,
             suggested_text=suggested_text,
             corrections=corrections,
-            applied=False
+            applied=False,
+            patches=patches,
+            degraded_stages=degraded_stages(deadline)
         )
     
-    def polish_abstract(self, request: PolishRequest) -> PolishResponse:
-        """Polish abstract using Groq AI"""
+    async def check_manuscript(
+        self,
+        stream: AsyncIterator[bytes],
+        user_id: str,
+        field_type: str = "manuscript",
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Streaming spellcheck for full manuscripts beyond MAX_TEXT_LENGTH
+        
+        Text is processed in overlapping chunks; each chunk's dictionary
+        corrections are emitted as soon as it is read, AI contextual checks run
+        in parallel under the global LLM limiter and are emitted as they finish.
+        Every NDJSON line carries absolute character offsets.
+        
+        When the deadline runs out, remaining chunks are not read and pending
+        AI checks are cancelled; the final line lists the degraded stages.
+        """
+        if not settings.ENABLE_AUTHOR_SPELLCHECK:
+            audit_logger.log_feature_disabled(user_id, AIFeature.AUTHOR_SPELLCHECK)
+            raise ValueError("Spell check feature is disabled")
+        
+        pending = set()
+        max_pending = max(settings.LLM_MAX_CONCURRENCY * 2, 1)
+        dict_count = 0
+        ai_count = 0
+        chunks = 0
+        emitted_until = 0  # End of the last dictionary correction already sent
+        
+        def contextual_line(task) -> bytes:
+            index, chunk, corrections = task.result()
+            return dumps_line({"chunk": index, "stage": "contextual", "corrections": corrections})
+        
+        async def run_contextual(chunk, spans, dict_corrections):
+            found = await asyncio.to_thread(self._check_contextual_routed, chunk.text, spans, deadline)
+            # Dictionary corrections already sent for this chunk take priority
+            taken = IntervalSet()
+            for corr in dict_corrections:
+                taken.add(corr.position, corr.position + len(corr.original))
+            corrections = []
+            for corr in resolve(chunk.text, found):
+                corr.position += chunk.offset
+                end = corr.position + len(corr.original)
+                if corr.position < chunk.owned_end and not taken.overlaps(corr.position, end):
+                    corrections.append(corr)
+            return chunk.index, chunk, corrections
+        
+        try:
+            async for chunk in iter_chunks(
+                stream,
+                chunk_size=settings.MANUSCRIPT_CHUNK_SIZE,
+                overlap=settings.MANUSCRIPT_CHUNK_OVERLAP,
+                max_length=settings.MANUSCRIPT_MAX_LENGTH
+            ):
+                if deadline is not None and deadline.expired():
+                    deadline.degrade("dictionary")
+                    break
+                chunks += 1
+                
+                # 1. Dictionary pass (off the event loop) - only corrections
+                # starting in the owned region
+                corrections = []
+                spans, found = await asyncio.to_thread(self._dictionary_pass, chunk.text)
+                for corr in found:
+                    corr.position += chunk.offset
+                    if emitted_until <= corr.position < chunk.owned_end:
+                        corrections.append(corr)
+                for corr in corrections:
+                    emitted_until = max(emitted_until, corr.position + len(corr.original))
+                dict_count += len(corrections)
+                yield dumps_line({
+                    "chunk": chunk.index,
+                    "stage": "dictionary",
+                    "offset": chunk.offset,
+                    "corrections": corrections
+                })
+                
+                # 2. AI contextual pass - bounded number of chunks in flight
+                if self.groq_client and deadline is not None and not deadline.allows(groq_breaker.expected_latency()):
+                    deadline.degrade("contextual_check")
+                elif self.groq_client:
+                    pending.add(asyncio.ensure_future(run_contextual(chunk, spans, corrections)))
+                    if len(pending) >= max_pending:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            ai_count += len(task.result()[2])
+                            yield contextual_line(task)
+                
+                # Flush AI results that are already finished
+                done = {task for task in pending if task.done()}
+                pending -= done
+                for task in done:
+                    ai_count += len(task.result()[2])
+                    yield contextual_line(task)
+            
+            if pending and deadline is not None:
+                # Abandon AI checks that cannot finish before the deadline
+                done, pending = await asyncio.wait(pending, timeout=max(deadline.remaining(), 0))
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    deadline.degrade("contextual_check")
+                pending = done
+            
+            for task in asyncio.as_completed(pending):
+                index, chunk, corrections = await task
+                ai_count += len(corrections)
+                yield dumps_line({"chunk": index, "stage": "contextual", "corrections": corrections})
+            pending = set()
+            
+            yield dumps_line({
+                "done": True,
+                "chunks": chunks,
+                "dict_corrections": dict_count,
+                "ai_corrections": ai_count,
+                "degraded_stages": degraded_stages(deadline)
+            })
+        
+        except ManuscriptTooLarge as e:
+            yield dumps_line({"done": True, "error": str(e), "chunks": chunks})
+        
+        finally:
+            # Client disconnected or input rejected - drop queued AI work
+            for task in pending:
+                task.cancel()
+            
+            audit_logger.log_ai_operation(
+                user_id=user_id,
+                user_role=UserRole.AUTHOR,
+                feature=AIFeature.AUTHOR_SPELLCHECK,
+                input_text=f"manuscript:{chunks} chunks",
+                output_data={
+                    "corrections_count": dict_count + ai_count,
+                    "dict_corrections": dict_count,
+                    "ai_corrections": ai_count
+                },
+                applied=False,
+                metadata={"field_type": field_type, "mode": "manuscript", "chunks": chunks}
+            )
+    
+    def polish_abstract(
+        self,
+        request: PolishRequest,
+        deadline: Optional[Deadline] = None
+    ) -> PolishResponse:
+        """
+        Polish abstract using Groq AI
+        Falls back to the original text when the deadline leaves no time for it
+        """
         if not settings.ENABLE_AUTHOR_ABSTRACT_POLISHING:
             audit_logger.log_feature_disabled(request.user_id, AIFeature.AUTHOR_POLISH)
             raise ValueError("Polish feature is disabled")
@@ -375,47 +473,35 @@ Văn bản:
             )
         
         try:
-            # Create prompt for Groq
-            prompt = f"""Bạn là một chuyên gia viết bài báo khoa học. Hãy cải thiện đoạn văn sau để phù hợp với phong cách học thuật (academic writing), giữ nguyên ý nghĩa nhưng làm cho văn phong chuyên nghiệp hơn.
-
-Yêu cầu:
-- Giữ nguyên ngôn ngữ gốc (tiếng Việt hoặc tiếng Anh)
-- Sửa lỗi ngữ pháp nếu có
-- Cải thiện cấu trúc câu cho rõ ràng hơn
-- Dùng từ ngữ học thuật phù hợp
-- KHÔNG thêm hoặc bớt thông tin
-- CHỈ trả về văn bản đã chỉnh sửa, KHÔNG giải thích
-
-Văn bản gốc:
-{request.abstract}
-
-Văn bản đã cải thiện:"""
-
-            # Call Groq API
-            chat_completion = self.groq_client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Bạn là chuyên gia viết bài báo khoa học, giúp tác giả cải thiện văn phong academic."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            # Output budget follows the abstract length
+            prompt = POLISH.render(request.abstract)
+            completion = chat_completion(
+                self.groq_client,
+                deadline=deadline,
+                messages=prompt.messages,
                 model=settings.GROQ_MODEL,
                 temperature=settings.GROQ_TEMPERATURE,
-                max_tokens=settings.GROQ_MAX_TOKENS,
+                max_tokens=prompt.max_tokens,
             )
-            
-            polished_text = chat_completion.choices[0].message.content.strip()
-            
-            # Basic improvements detection (compare lengths, word changes)
-            improvements = []
-            if len(polished_text) != len(request.abstract):
-                improvements.append("Cấu trúc câu được cải thiện")
-            if polished_text != request.abstract:
-                improvements.append("Văn phong academic được nâng cao")
+            prompt_usage.record(prompt, completion)
+            
+            polished_text = completion.choices[0].message.content.strip()
+            
+            # Word-level diff for the side-by-side view
+            with stage("diff"):
+                changes = [
+                    TextChange(
+                        operation=edit.operation,
+                        original_start=edit.original_start,
+                        original_end=edit.original_end,
+                        polished_start=edit.revised_start,
+                        polished_end=edit.revised_end,
+                        original=request.abstract[edit.original_start:edit.original_end],
+                        polished=polished_text[edit.revised_start:edit.revised_end]
+                    )
+                    for edit in diff_words(request.abstract, polished_text)
+                ]
+            improvements = self._describe_changes(changes)
             
             # Log operation
             audit_logger.log_ai_operation(
@@ -427,7 +513,9 @@ Văn bản đã cải thiện:"""
                     "polished": True,
                     "method": "groq",
                     "model": settings.GROQ_MODEL,
-                    "improvements_count": len(improvements)
+                    "prompt": POLISH.key,
+                    "improvements_count": len(improvements),
+                    "changes_count": len(changes)
                 },
                 applied=False,
                 metadata={}
@@ -437,17 +525,22 @@ Văn bản đã cải thiện:"""
                 original_abstract=request.abstract,
                 polished_abstract=polished_text,
                 improvements=improvements,
+                changes=changes,
                 applied=False
             )
             
         except Exception as e:
-            # Fallback on error
+            # Fallback on error (or fail fast while the Groq circuit is open)
+            method = "circuit_open" if isinstance(e, CircuitOpenError) else "error"
+            if isinstance(e, DeadlineExceeded) or (deadline is not None and deadline.expired()):
+                deadline.degrade("polish")
+                method = "deadline"
             audit_logger.log_ai_operation(
                 user_id=request.user_id,
                 user_role=UserRole.AUTHOR,
                 feature=AIFeature.AUTHOR_POLISH,
                 input_text=request.abstract,
-                output_data={"polished": False, "method": "error", "error": str(e)},
+                output_data={"polished": False, "method": method, "error": str(e)},
                 applied=False,
                 metadata={}
             )
@@ -456,27 +549,82 @@ Văn bản đã cải thiện:"""
                 original_abstract=request.abstract,
                 polished_abstract=request.abstract,
                 improvements=[],
-                applied=False
+                applied=False,
+                degraded_stages=degraded_stages(deadline)
             )
     
-    def suggest_keywords(self, request: KeywordSuggestionRequest) -> KeywordSuggestionResponse:
-        """Extract keywords using TF-IDF"""
+    @staticmethod
+    def _describe_changes(changes: List[TextChange]) -> List[str]:
+        """Improvement summary from the diff, one line per kind of edit"""
+        counts = Counter(change.operation for change in changes)
+        improvements = []
+        if counts["replace"]:
+            improvements.append(f"Thay thế {counts['replace']} cụm từ")
+        if counts["insert"]:
+            improvements.append(f"Bổ sung {counts['insert']} cụm từ")
+        if counts["delete"]:
+            improvements.append(f"Lược bỏ {counts['delete']} cụm từ")
+        return improvements
+    
+    def _sentence_terms(self, text: str) -> List[List[str]]:
+        """Segmented words grouped by sentence, from one tokenization of the text"""
+        sentences = []
+        start = 0
+        bounds = [m.start() for m in re.finditer(r'[.!?;]\s+', text)] + [len(text)]
+        tokens = iter(segment(text))
+        token = next(tokens, None)
+        for end in bounds:
+            words = []
+            while token is not None and token.start < end:
+                if token.size > 1 or len(token.text) >= MIN_SYLLABLE_LENGTH:
+                    words.append(" ".join(token.text.lower().split()))
+                token = next(tokens, None)
+            # Same filter as before: skip fragments of 10 characters or less
+            if len(text[start:end].strip()) > 10:
+                sentences.append(words)
+            start = end
+        return sentences
+    
+    def suggest_keywords(self, request: KeywordSuggestionRequest) -> KeywordSuggestionResult:
+        """
+        Extract keywords: whole keyphrases from the conference's collocation
+        statistics when enough abstracts are indexed, TF-IDF otherwise
+        """
         if not settings.ENABLE_AUTHOR_KEYWORD_SUGGESTION:
             audit_logger.log_feature_disabled(request.user_id, AIFeature.AUTHOR_KEYWORDS)
             raise ValueError("Keywords feature is disabled")
         
+        limit = settings.MAX_KEYWORDS
+        stats = collocation_stats.ready(request.conference_id)
+        if stats is not None:
+            with stage("collocations"):
+                ranked = stats.keyphrases(request.abstract, limit=limit)
+            if ranked:
+                keywords = [term for term, _ in ranked]
+                audit_logger.log_ai_operation(
+                    user_id=request.user_id,
+                    user_role=UserRole.AUTHOR,
+                    feature=AIFeature.AUTHOR_KEYWORDS,
+                    input_text=request.abstract,
+                    output_data={"keywords_count": len(keywords), "method": "collocations"},
+                    applied=False,
+                    metadata={"conference_id": request.conference_id}
+                )
+                return KeywordSuggestionResult(
+                    suggested_keywords=keywords,
+                    confidence_scores=dict(ranked),
+                    applied=False
+                )
+        
+        # Stopwords of the languages actually present in the abstract
+        with stage("langid"):
+            stopwords = get_resources().stopwords_for(languages_of(language_spans(request.abstract)))
         try:
-            # Clean and tokenize text
-            text = request.abstract.lower()
-            
-            # Extract words (Vietnamese + English, min 3 chars)
-            words = re.findall(
-                r'\b[a-zA-ZàáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđĐ]{3,}\b',
-                text
-            )
+            # Segmented words (Vietnamese + English); multi-syllable words stay whole
+            words = terms(request.abstract)
             
             # Filter stopwords
-            filtered_words = [w for w in words if w not in self.vietnamese_stopwords]
+            filtered_words = [w for w in words if w not in stopwords]
             
             # Need at least 5 words for TF-IDF
             if len(filtered_words) < 5:
@@ -484,26 +632,29 @@ Văn bản đã cải thiện:"""
             else:
                 # Use TF-IDF for keyword extraction
                 # Create a "corpus" from the single document by treating sentences as documents
-                sentences = re.split(r'[.!?;]\s+', request.abstract)
-                sentences = [s for s in sentences if len(s.strip()) > 10]
+                sentences = self._sentence_terms(request.abstract)
                 
                 if len(sentences) >= 2:
-                    # TF-IDF across sentences
+                    # TF-IDF across sentences, on the already segmented words
                     vectorizer = TfidfVectorizer(
-                        max_features=20,
+                        max_features=max(20, 2 * limit),
                         ngram_range=(1, 2),  # Unigrams and bigrams
                         min_df=1,
-                        token_pattern=r'\b[a-zA-ZàáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđĐ]{3,}\b'
+                        preprocessor=_identity,
+                        tokenizer=_identity,
+                        token_pattern=None,
+                        lowercase=False
                     )
                     
-                    tfidf_matrix = vectorizer.fit_transform(sentences)
+                    with stage("tfidf"):
+                        tfidf_matrix = vectorizer.fit_transform(sentences)
                     feature_names = vectorizer.get_feature_names_out()
                     
                     # Get average TF-IDF score across all sentences
                     avg_scores = np.asarray(tfidf_matrix.mean(axis=0)).ravel()
                     
                     # Get top keywords
-                    top_indices = avg_scores.argsort()[-15:][::-1]
+                    top_indices = avg_scores.argsort()[-(limit + 5):][::-1]
                     candidate_keywords = [feature_names[i] for i in top_indices]
                     
                     # Filter stopwords and short words
@@ -511,18 +662,18 @@ Văn bản đã cải thiện:"""
                     for kw in candidate_keywords:
                         # Check if any word in the keyword is a stopword
                         kw_words = kw.split()
-                        if not any(w in self.vietnamese_stopwords for w in kw_words):
+                        if not any(w in stopwords for w in kw_words):
                             keywords.append(kw)
                         
-                        if len(keywords) >= 10:
+                        if len(keywords) >= limit:
                             break
                 else:
                     # Fallback to word frequency
                     freq = Counter(filtered_words)
-                    keywords = [word for word, count in freq.most_common(10)]
+                    keywords = [word for word, count in freq.most_common(limit)]
             
-            # Limit to max 10 keywords
-            keywords = keywords[:10]
+            # Limit to MAX_KEYWORDS
+            keywords = keywords[:limit]
             
             # Create confidence scores (TF-IDF scores normalized)
             confidence_scores = {}
@@ -549,8 +700,7 @@ Văn bản đã cải thiện:"""
                 metadata={}
             )
             
-            return KeywordSuggestionResponse(
-                original_keywords=request.existing_keywords,
+            return KeywordSuggestionResult(
                 suggested_keywords=keywords,
                 confidence_scores=confidence_scores,
                 applied=False
@@ -558,11 +708,8 @@ Văn bản đã cải thiện:"""
             
         except Exception as e:
             # Fallback to simple word frequency if TF-IDF fails
-            words = re.findall(
-                r'\b[a-zA-ZàáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđĐ]{4,}\b',
-                request.abstract.lower()
-            )
-            filtered = [w for w in words if w not in self.vietnamese_stopwords]
+            words = [w for w in terms(request.abstract) if len(w) >= 4]
+            filtered = [w for w in words if w not in stopwords]
             freq = Counter(filtered)
             keywords = [word for word, count in freq.most_common(10)][:5]
             
@@ -579,13 +726,17 @@ Văn bản đã cải thiện:"""
                 metadata={}
             )
             
-            return KeywordSuggestionResponse(
-                original_keywords=request.existing_keywords,
+            return KeywordSuggestionResult(
                 suggested_keywords=keywords,
                 confidence_scores=confidence_scores,
                 applied=False
             )
 
 
+def _identity(doc):
+    """TfidfVectorizer hook for documents that are already token lists"""
+    return doc
+
+
 # Create service instance
 author_service = AuthorAIService()
@@ -0,0 +1,346 @@
+"""
+Chair AI Services
+Provides AI assistance for conference chairs
+Focus: email templates generated once per conference, rendered in bulk locally
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from models import (
+    EmailTemplateRequest, EmailTemplateResponse, EmailType,
+    BulkEmailRequest,
+    NearDuplicateRequest, NearDuplicateResponse, NearDuplicateMatch,
+    AIFeature, UserRole
+)
+from config import settings
+from audit_logging import audit_logger
+from fast_json import dumps_line
+from llm import chat_completion, groq_client
+from deadline import Deadline, DeadlineExceeded, degraded_stages
+from near_duplicate import near_duplicates
+from prompts import CHAIR_EMAIL, prompt_usage
+from timing import stage
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\}\}')
+
+# Used when Groq is not configured or the LLM answer cannot be parsed
+DEFAULT_TEMPLATES: Dict[EmailType, Tuple[str, str]] = {
+    EmailType.INVITATION: (
+        "Invitation to {{conference_name}}",
+        "Dear {{recipient_name}},\n\n"
+        "On behalf of the organizing committee, we are pleased to invite you to serve as "
+        "{{recipient_role}} for {{conference_name}}.\n\n"
+        "Please reply before {{deadline}}.\n\n"
+        "Best regards,\n{{chair_name}}"
+    ),
+    EmailType.REMINDER: (
+        "Reminder: {{conference_name}} deadline on {{deadline}}",
+        "Dear {{recipient_name}},\n\n"
+        "This is a friendly reminder that the deadline for {{conference_name}} is {{deadline}}.\n\n"
+        "Best regards,\n{{chair_name}}"
+    ),
+    EmailType.ACCEPTANCE: (
+        "{{conference_name}}: Paper {{paper_id}} accepted",
+        "Dear {{recipient_name}},\n\n"
+        "We are pleased to inform you that your paper \"{{paper_title}}\" ({{paper_id}}) "
+        "has been accepted for presentation at {{conference_name}}.\n\n"
+        "Please submit the camera-ready version before {{deadline}}.\n\n"
+        "Best regards,\n{{chair_name}}"
+    ),
+    EmailType.REJECTION: (
+        "{{conference_name}}: Decision on paper {{paper_id}}",
+        "Dear {{recipient_name}},\n\n"
+        "Thank you for submitting your paper \"{{paper_title}}\" ({{paper_id}}) to {{conference_name}}. "
+        "We regret to inform you that it could not be accepted this year.\n\n"
+        "The reviewers' comments are available in the submission system.\n\n"
+        "Best regards,\n{{chair_name}}"
+    ),
+    EmailType.GENERAL: (
+        "{{conference_name}}",
+        "Dear {{recipient_name}},\n\n{{message}}\n\nBest regards,\n{{chair_name}}"
+    ),
+}
+
+
+class CompiledTemplate:
+    """
+    Template split once into literal and placeholder parts
+    Rendering is a single join - no regex and no LLM call per recipient
+    """
+
+    __slots__ = ("source", "placeholders", "_parts", "_slots")
+
+    def __init__(self, source: str):
+        self.source = source
+        parts: List[str] = []
+        slots: List[Tuple[int, str]] = []
+        placeholders: List[str] = []
+        last = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            parts.append(source[last:match.start()])
+            name = match.group(1)
+            slots.append((len(parts), name))
+            parts.append("")
+            if name not in placeholders:
+                placeholders.append(name)
+            last = match.end()
+        parts.append(source[last:])
+        self._parts = parts
+        self._slots = slots
+        self.placeholders = placeholders
+
+    def render(self, values: Dict[str, Any]) -> Tuple[str, List[str]]:
+        """
+        Fill placeholders from values
+
+        Returns:
+            (rendered text, placeholders left unfilled)
+        """
+        parts = list(self._parts)
+        missing = []
+        for index, name in self._slots:
+            value = values.get(name)
+            if value is None:
+                parts[index] = "{{" + name + "}}"
+                missing.append(name)
+            else:
+                parts[index] = str(value)
+        return "".join(parts), missing
+
+
+class EmailTemplate:
+    """Compiled subject + body pair"""
+
+    __slots__ = ("subject", "body", "placeholders", "source")
+
+    def __init__(self, subject: str, body: str, source: str):
+        self.subject = CompiledTemplate(subject)
+        self.body = CompiledTemplate(body)
+        self.placeholders = list(dict.fromkeys(self.subject.placeholders + self.body.placeholders))
+        self.source = source  # "groq" or "default"
+
+
+class ChairAIService:
+    """AI service for chair support - email templates built for volume"""
+
+    def __init__(self):
+        self._templates: Dict[Tuple[str, str, str], EmailTemplate] = {}
+        self._generating: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._lock = threading.Lock()  # Guards _generating only, never held during a call
+
+        # Shared Groq client (pooled keep-alive transport); None if not configured
+        self.groq_client = groq_client
+
+    @staticmethod
+    def _conference(request: EmailTemplateRequest) -> str:
+        return request.conference_id or str(request.context.get("conference_name", ""))
+
+    @staticmethod
+    def _prompt_input(request: EmailTemplateRequest) -> str:
+        """What the LLM sees of a request - only conference-level context, never recipient data"""
+        context = {k: v for k, v in request.context.items() if isinstance(v, (str, int, float))}
+        return (
+            f"Email type: {request.email_type.value}\n"
+            f"Conference context (JSON): {json.dumps(context, ensure_ascii=False, sort_keys=True)}\n"
+            f"Additional instructions: {request.custom_instructions or 'none'}"
+        )
+
+    def _cache_key(self, request: EmailTemplateRequest) -> Tuple[str, str, str]:
+        # Changed context or instructions give a new template, not a stale one
+        digest = hashlib.sha256(self._prompt_input(request).encode("utf-8")).hexdigest()[:16]
+        return request.email_type.value, self._conference(request), digest
+
+    def get_template(self, request: EmailTemplateRequest, deadline: Optional[Deadline] = None) -> EmailTemplate:
+        """
+        One LLM call per (email_type, conference, prompt input); cached and compiled afterwards
+        Only requests for the same key wait on each other's generation
+        A fallback caused by a transient Groq failure is served but not cached
+        """
+        key = self._cache_key(request)
+        template = self._templates.get(key)
+        if template is not None:
+            return template
+
+        with self._lock:
+            key_lock = self._generating.setdefault(key, threading.Lock())
+
+        with key_lock:
+            try:
+                template = self._templates.get(key)
+                if template is None:
+                    with stage("template_generation"):
+                        template = self._generate_template(request, deadline)
+                    if template.source == "groq" or not self.groq_client:
+                        self._templates[key] = template
+            finally:
+                with self._lock:
+                    # Waiters still hold this lock; a newer one is left alone
+                    if self._generating.get(key) is key_lock:
+                        del self._generating[key]
+        return template
+
+    def _generate_template(self, request: EmailTemplateRequest, deadline: Optional[Deadline]) -> EmailTemplate:
+        default_subject, default_body = DEFAULT_TEMPLATES[request.email_type]
+
+        if not self.groq_client:
+            return EmailTemplate(default_subject, default_body, source="default")
+
+        try:
+            prompt = CHAIR_EMAIL.render(self._prompt_input(request))
+            response = chat_completion(
+                self.groq_client,
+                deadline=deadline,
+                messages=prompt.messages,
+                model=settings.GROQ_MODEL,
+                temperature=settings.GROQ_TEMPERATURE,
+                max_tokens=prompt.max_tokens,
+            )
+            prompt_usage.record(prompt, response)
+
+            result_text = response.choices[0].message.content.strip()
+            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', result_text, re.DOTALL)
+            if json_match:
+                result_text = json_match.group(1)
+            result = json.loads(result_text)
+
+            subject = str(result.get("subject", "")).strip()
+            body = str(result.get("body", "")).strip()
+            if subject and body:
+                return EmailTemplate(subject, body, source="groq")
+
+        except DeadlineExceeded:
+            deadline.degrade("template_generation")
+        except Exception as e:
+            if deadline is not None and deadline.expired():
+                deadline.degrade("template_generation")
+            else:
+                logger.warning(f"AI email template error: {str(e)}")
+
+        return EmailTemplate(default_subject, default_body, source="default")
+
+    def generate_email_template(
+        self,
+        request: EmailTemplateRequest,
+        deadline: Optional[Deadline] = None
+    ) -> EmailTemplateResponse:
+        """Return the (cached) template for review - chair must approve before sending"""
+        if not settings.ENABLE_CHAIR_EMAIL_TEMPLATES:
+            audit_logger.log_feature_disabled(request.chair_id, AIFeature.CHAIR_EMAIL_TEMPLATE)
+            raise ValueError("Email template feature is disabled")
+
+        template = self.get_template(request, deadline)
+
+        # Conference-level values are filled now; recipient placeholders stay open
+        subject, _ = template.subject.render(request.context)
+        body, _ = template.body.render(request.context)
+        placeholders = [p for p in template.placeholders if p not in request.context]
+
+        warnings = []
+        if template.source == "default":
+            warnings.append("AI generation unavailable - built-in template used")
+        if placeholders:
+            warnings.append("Fill all placeholders before sending")
+
+        audit_logger.log_ai_operation(
+            user_id=request.chair_id,
+            user_role=UserRole.CHAIR,
+            feature=AIFeature.CHAIR_EMAIL_TEMPLATE,
+            input_text=json.dumps(request.context, ensure_ascii=False, default=str),
+            output_data={"email_type": request.email_type.value, "source": template.source},
+            applied=False,
+            metadata={"conference": self._conference(request)}
+        )
+
+        return EmailTemplateResponse(
+            subject=subject,
+            body=body,
+            placeholders=placeholders,
+            applied=False,
+            warnings=warnings,
+            degraded_stages=degraded_stages(deadline)
+        )
+
+    def render_bulk(self, request: BulkEmailRequest, deadline: Optional[Deadline] = None) -> Iterator[bytes]:
+        """
+        Render one email per recipient from the cached template
+        The template is fetched (and generated if needed) before returning;
+        the returned iterator yields NDJSON lines without any LLM call
+        """
+        if not settings.ENABLE_CHAIR_EMAIL_TEMPLATES:
+            audit_logger.log_feature_disabled(request.chair_id, AIFeature.CHAIR_EMAIL_TEMPLATE)
+            raise ValueError("Email template feature is disabled")
+
+        template = self.get_template(request, deadline)
+        audit_logger.log_ai_operation(
+            user_id=request.chair_id,
+            user_role=UserRole.CHAIR,
+            feature=AIFeature.CHAIR_EMAIL_TEMPLATE,
+            input_text=json.dumps(request.context, ensure_ascii=False, default=str),
+            output_data={"email_type": request.email_type.value, "recipients": len(request.recipients)},
+            applied=False,
+            metadata={"conference": self._conference(request), "mode": "bulk"}
+        )
+        return self._render_lines(template, request)
+
+    @staticmethod
+    def _render_lines(template: EmailTemplate, request: BulkEmailRequest) -> Iterator[bytes]:
+        base = dict(request.context)
+        for recipient in request.recipients:
+            values = base
+            if recipient:
+                values = dict(base)
+                values.update(recipient)
+            subject, missing_subject = template.subject.render(values)
+            body, missing_body = template.body.render(values)
+            yield dumps_line({
+                "recipient_id": recipient.get("recipient_id"),
+                "subject": subject,
+                "body": body,
+                "missing_placeholders": list(dict.fromkeys(missing_subject + missing_body)),
+                "applied": False
+            })
+
+    def check_near_duplicates(self, request: NearDuplicateRequest) -> NearDuplicateResponse:
+        """
+        Compare a submission with every earlier one of the conference via LSH
+        Only paper IDs and similarity estimates are returned (double-blind)
+        """
+        if not settings.ENABLE_CHAIR_DUPLICATE_DETECTION:
+            audit_logger.log_feature_disabled(request.chair_id, AIFeature.CHAIR_DUPLICATE_CHECK)
+            raise ValueError("Duplicate detection feature is currently disabled")
+
+        index = near_duplicates.get(request.conference_id)
+        with stage("minhash"):
+            signature = index.signature_of(request.title, request.abstract)
+        threshold = request.threshold if request.threshold is not None else settings.NEAR_DUPLICATE_THRESHOLD
+        with stage("lsh_query"):
+            matches = index.query(signature, threshold, exclude=request.paper_id)
+        if request.index:
+            index.add(request.paper_id, signature)
+
+        audit_logger.log_ai_operation(
+            user_id=request.chair_id,
+            user_role=UserRole.CHAIR,
+            feature=AIFeature.CHAIR_DUPLICATE_CHECK,
+            input_text=f"{request.title}\n{request.abstract}",
+            output_data={"matches": len(matches)},
+            applied=False,
+            metadata={"conference_id": request.conference_id, "paper_id": request.paper_id}
+        )
+
+        return NearDuplicateResponse(
+            paper_id=request.paper_id,
+            matches=[NearDuplicateMatch(paper_id=p, estimated_jaccard=j) for p, j in matches],
+            indexed_papers=len(index)
+        )
+
+
+# Create service instance
+chair_service = ChairAIService()
@@ -0,0 +1,218 @@
+"""
+Circuit Breaker
+Protects workers from a slow or failing LLM provider: after too many
+failures requests fail fast to the local fallbacks, then a few probe
+calls decide when to resume. Timeouts follow observed p95 latency.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from config import settings
+
+
+class CircuitOpenError(Exception):
+    """Call rejected because the circuit is open"""
+
+
+class CircuitBreaker:
+    """Rolling-window error-rate breaker with half-open probing and adaptive timeout"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int,
+        min_calls: int,
+        failure_rate_threshold: float,
+        open_seconds: float,
+        half_open_probes: int,
+        slow_call_seconds: float,
+        timeout_min: float,
+        timeout_max: float,
+        timeout_p95_multiplier: float
+    ):
+        self.name = name
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.slow_call_seconds = slow_call_seconds
+        self.timeout_min = timeout_min
+        self.timeout_max = timeout_max
+        self.timeout_p95_multiplier = timeout_p95_multiplier
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._outcomes: deque = deque(maxlen=window_size)  # True = failure
+        self._latencies: deque = deque(maxlen=window_size)  # successful calls only
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+        # Counters for metrics
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened_count = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        """Move OPEN -> HALF_OPEN once the open period has elapsed (lock held)"""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        return self._state
+
+    def p95_latency(self) -> float:
+        with self._lock:
+            return self._p95()
+
+    def _p95(self) -> float:
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def timeout(self) -> float:
+        """Per-call timeout derived from observed p95 latency"""
+        with self._lock:
+            if len(self._latencies) < self.min_calls:
+                return self.timeout_max
+            return min(max(self._p95() * self.timeout_p95_multiplier, self.timeout_min), self.timeout_max)
+
+    def expected_latency(self) -> float:
+        """Typical call duration, used to decide whether a deadline leaves room for a call"""
+        with self._lock:
+            if len(self._latencies) < self.min_calls:
+                return self.timeout_min
+            return self._p95()
+
+    def raise_if_open(self):
+        """Fail fast without taking a probe slot"""
+        with self._lock:
+            if self._current_state() == self.OPEN:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit is open")
+
+    def _acquire(self) -> bool:
+        """Admit a call; returns True if it is a half-open probe"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return False
+            if state == self.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self.rejected += 1
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+    def _release_probe(self):
+        with self._lock:
+            self._probes_in_flight -= 1
+
+    def _record(self, probe: bool, failed: bool, latency: float):
+        with self._lock:
+            self.calls += 1
+            if failed:
+                self.failures += 1
+            else:
+                self._latencies.append(latency)
+
+            if probe:
+                self._probes_in_flight -= 1
+                if failed:
+                    self._trip()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._state = self.CLOSED
+                        self._outcomes.clear()
+                return
+
+            if self._state != self.CLOSED:
+                return
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self.min_calls:
+                failure_rate = sum(self._outcomes) / len(self._outcomes)
+                if failure_rate >= self.failure_rate_threshold:
+                    self._trip()
+
+    def _trip(self):
+        """Open the circuit (lock held)"""
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened_count += 1
+
+    @contextmanager
+    def guard(self, limit: Optional[float] = None) -> Iterator[float]:
+        """
+        Wrap one dependency call; yields the timeout to use for it
+
+        Exceptions and calls slower than slow_call_seconds count as failures.
+        If limit (the caller's remaining deadline) cut the timeout short and
+        the call failed after it, the provider is not blamed.
+
+        Raises:
+            CircuitOpenError: if the circuit is open (fail fast)
+        """
+        probe = self._acquire()
+        timeout = self.timeout()
+        caller_limited = limit is not None and limit < timeout
+        if caller_limited:
+            timeout = max(limit, 0.0)
+        start = time.monotonic()
+        failed = True
+        try:
+            yield timeout
+            failed = False
+        finally:
+            latency = time.monotonic() - start
+            if failed and caller_limited and latency >= timeout:
+                if probe:
+                    self._release_probe()
+            else:
+                self._record(probe, failed or latency > self.slow_call_seconds, latency)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            window = len(self._outcomes)
+            return {
+                "name": self.name,
+                "state": state,
+                "failure_rate": round(sum(self._outcomes) / window, 3) if window else 0.0,
+                "p95_latency_ms": round(self._p95() * 1000, 1),
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "opened_count": self.opened_count,
+            }
+
+
+# Global breaker around the Groq API
+groq_breaker = CircuitBreaker(
+    name="groq",
+    window_size=settings.LLM_BREAKER_WINDOW,
+    min_calls=settings.LLM_BREAKER_MIN_CALLS,
+    failure_rate_threshold=settings.LLM_BREAKER_FAILURE_RATE,
+    open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+    half_open_probes=settings.LLM_BREAKER_HALF_OPEN_PROBES,
+    slow_call_seconds=settings.LLM_SLOW_CALL_SECONDS,
+    timeout_min=settings.LLM_TIMEOUT_MIN,
+    timeout_max=settings.LLM_TIMEOUT_MAX,
+    timeout_p95_multiplier=settings.LLM_TIMEOUT_P95_MULTIPLIER
+)
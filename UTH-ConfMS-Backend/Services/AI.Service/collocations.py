@@ -0,0 +1,399 @@
+"""
+Conference Collocation Statistics
+Syllable n-gram counts over every submitted abstract of a conference, kept in
+count-min sketches so memory is fixed however large the corpus grows.
+Normalized PMI separates real multi-syllable terms ("xử lý ảnh", "học tăng
+cường") from syllables that merely co-occur; keyword suggestion then becomes
+a handful of sketch lookups per abstract. Each conference's statistics live
+in the conference resource LRU and are saved to disk when evicted, every
+COLLOCATION_SAVE_EVERY new abstracts and at shutdown
+"""
+
+import hashlib
+import logging
+import math
+import os
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import settings
+from conferences import conference_resources
+from tokenizer import syllables, terms
+from resources import get_resources
+
+logger = logging.getLogger(__name__)
+
+VERSION_ENTRY_BYTES = 160  # Resident size of one paper_id -> digest entry
+
+
+class CountMinSketch:
+    """Fixed-size frequency table; estimates never undercount"""
+
+    def __init__(self, width: int, depth: int, seed: int = 0):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.uint32)
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash family, one (a, b) pair per row
+        self._a = rng.integers(1, 2 ** 62, size=depth, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 62, size=depth, dtype=np.uint64)
+        self._rows = np.arange(depth)[:, None]
+
+    @staticmethod
+    def _hash(items: Sequence[str]) -> np.ndarray:
+        # Stable across processes (unlike hash()), so saved tables stay valid
+        return np.fromiter((zlib.crc32(i.encode("utf-8")) for i in items), dtype=np.uint64, count=len(items))
+
+    def _columns(self, items: Sequence[str]) -> np.ndarray:
+        """(depth, len(items)) column index of every item in every row"""
+        h = self._hash(items)
+        mixed = self._a[:, None] * h[None, :] + self._b[:, None]  # wraps mod 2^64
+        return (mixed >> np.uint64(32)) % np.uint64(self.width)
+
+    def add(self, items: Sequence[str]):
+        if not items:
+            return
+        columns = self._columns(items)
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], 1)
+
+    def estimate(self, items: Sequence[str]) -> np.ndarray:
+        if not items:
+            return np.zeros(0, dtype=np.uint32)
+        return self.table[self._rows, self._columns(items)].min(axis=0)
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+
+def _sentences(text: str) -> List[List[str]]:
+    """Lowercased syllables, split wherever the gap is not plain whitespace"""
+    runs: List[List[str]] = []
+    current: List[str] = []
+    previous_end = None
+    for token in syllables(text):
+        if previous_end is not None and not text[previous_end:token.start].isspace():
+            runs.append(current)
+            current = []
+        current.append(token.text.lower())
+        previous_end = token.end
+    if current:
+        runs.append(current)
+    return runs
+
+
+def _ngrams(run: List[str], n: int, edge_words: FrozenSet[str]) -> List[str]:
+    """n-grams that neither start nor end with an edge word (stopwords, "of", "using"...)"""
+    return [
+        " ".join(run[i:i + n])
+        for i in range(len(run) - n + 1)
+        if run[i] not in edge_words and run[i + n - 1] not in edge_words
+    ]
+
+
+class StatsEvicted(Exception):
+    """The statistics object was saved and dropped - fetch it again"""
+
+
+class CollocationStats:
+    """
+    Sketch-backed n-gram statistics for one conference
+
+    Token counts feed PMI, document frequencies feed IDF. A paper is counted
+    once per content version; sketches cannot forget, so a revised abstract
+    adds its new n-grams on top of the old ones (an accepted over-count,
+    like the sketch error itself).
+    """
+
+    def __init__(self, width: int, depth: int, max_ngram: int):
+        self.max_ngram = max_ngram
+        self.unigrams = CountMinSketch(width, depth, seed=1)
+        self.ngrams = CountMinSketch(width, depth, seed=2)
+        self.doc_freq = CountMinSketch(width, depth, seed=3)
+        self.totals = [0] * (max_ngram + 1)  # Token count per n-gram order
+        self.documents = 0
+        self.unsaved = 0  # Documents counted since the last save
+        self.evicted = False
+        self._versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path, width: int, depth: int, max_ngram: int) -> "CollocationStats":
+        """Statistics saved by save(); ValueError if they were built with other dimensions"""
+        stats = cls(width, depth, max_ngram)
+        with np.load(path, allow_pickle=False) as arrays:
+            if arrays["unigrams"].shape != (depth, width) or len(arrays["totals"]) != max_ngram + 1:
+                raise ValueError("Sketch dimensions changed")
+            stats.unigrams.table = arrays["unigrams"]
+            stats.ngrams.table = arrays["ngrams"]
+            stats.doc_freq.table = arrays["doc_freq"]
+            stats.totals = arrays["totals"].tolist()
+            stats.documents = int(arrays["documents"][0])
+            stats._versions = dict(zip(arrays["paper_ids"].tolist(), arrays["digests"].tolist()))
+        return stats
+
+    def _write(self, path: Path):
+        """Under self._lock: write the statistics (atomic replace)"""
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                unigrams=self.unigrams.table,
+                ngrams=self.ngrams.table,
+                doc_freq=self.doc_freq.table,
+                totals=np.asarray(self.totals, dtype=np.int64),
+                documents=np.asarray([self.documents], dtype=np.int64),
+                paper_ids=np.asarray(list(self._versions), dtype=str),
+                digests=np.asarray(list(self._versions.values()), dtype=str),
+            )
+        os.replace(tmp_path, path)
+        self.unsaved = 0
+
+    def save(self, path: Optional[Path]):
+        """Write the statistics and stop accepting documents (eviction)"""
+        with self._lock:
+            self.evicted = True
+            if path is not None:
+                self._write(path)
+
+    def checkpoint(self, path: Optional[Path]) -> bool:
+        """Write the statistics if documents were counted since the last save; they stay live"""
+        with self._lock:
+            if self.evicted or path is None or not self.unsaved:
+                return False
+            self._write(path)
+            return True
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.unigrams.nbytes + self.ngrams.nbytes + self.doc_freq.nbytes
+            + len(self._versions) * VERSION_ENTRY_BYTES
+        )
+
+    def add_document(self, paper_id: str, text: str) -> bool:
+        """
+        Count a submitted abstract; returns False if this version was already counted
+        Raises StatsEvicted once the object has been saved and dropped
+        """
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        runs = _sentences(text)
+        edge_words = get_resources().edge_words
+        unigrams = [w for run in runs for w in run]
+        ngrams_by_order = {
+            n: [g for run in runs for g in _ngrams(run, n, edge_words)]
+            for n in range(2, self.max_ngram + 1)
+        }
+        ngrams = [g for grams in ngrams_by_order.values() for g in grams]
+
+        with self._lock:
+            if self.evicted:
+                raise StatsEvicted(paper_id)
+            if self._versions.get(paper_id) == digest:
+                return False
+            self._versions[paper_id] = digest
+            self.unigrams.add(unigrams)
+            self.ngrams.add(ngrams)
+            self.doc_freq.add(list(set(unigrams) | set(ngrams)))
+            self.totals[1] += len(unigrams)
+            for n, grams in ngrams_by_order.items():
+                # Denominator uses every n-gram position, filtered or not
+                self.totals[n] += sum(max(len(run) - n + 1, 0) for run in runs)
+            self.documents += 1
+            self.unsaved += 1
+        return True
+
+    def npmi(self, phrases: List[str]) -> np.ndarray:
+        """
+        Normalized PMI of each multi-syllable phrase, in [-1, 1]
+        log(p(phrase) / prod p(syllable)) / -log p(phrase)
+        """
+        words = [p.split() for p in phrases]
+        flat = [w for ws in words for w in ws]
+        with self._lock:
+            phrase_counts = self.ngrams.estimate(phrases).astype(np.float64)
+            word_counts = self.unigrams.estimate(flat).astype(np.float64)
+            totals = list(self.totals)
+
+        scores = np.full(len(phrases), -1.0)
+        offset = 0
+        for i, ws in enumerate(words):
+            n = len(ws)
+            counts = word_counts[offset:offset + n]
+            offset += n
+            if phrase_counts[i] == 0 or totals[n] == 0 or not counts.all():
+                continue
+            p_phrase = phrase_counts[i] / totals[n]
+            log_independent = float(np.log(counts / totals[1]).sum())
+            if p_phrase >= 1.0:
+                scores[i] = 1.0
+                continue
+            scores[i] = (math.log(p_phrase) - log_independent) / -math.log(p_phrase)
+        return scores
+
+    def keyphrases(self, text: str, limit: int) -> List[Tuple[str, float]]:
+        """
+        Rank the abstract's keyphrases by local frequency x IDF, boosted by NPMI
+
+        Overlapping collocation occurrences are merged into one span, so terms
+        longer than COLLOCATION_MAX_NGRAM syllables come out whole; remaining
+        segmented words fill the list (single syllables only if repeated).
+        """
+        runs = _sentences(text)
+        resources = get_resources()
+        edge_words = resources.edge_words
+        phrases = sorted({
+            g for run in runs for n in range(2, self.max_ngram + 1) for g in _ngrams(run, n, edge_words)
+        })
+        if not phrases:
+            return []
+        with self._lock:
+            corpus_counts = dict(zip(phrases, self.ngrams.estimate(phrases).tolist()))
+            documents = self.documents
+        association = dict(zip(phrases, self.npmi(phrases).tolist()))
+        collocations = {
+            p for p in phrases
+            if corpus_counts[p] >= settings.COLLOCATION_MIN_COUNT
+            and association[p] >= settings.COLLOCATION_MIN_NPMI
+        }
+
+        # Union of overlapping collocation occurrences -> keyphrase spans
+        local: Dict[str, int] = {}
+        parts: Dict[str, List[str]] = {}
+        for run in runs:
+            spans: List[List] = []  # [start, end, constituent phrases]
+            for i in range(len(run)):
+                for n in range(min(self.max_ngram, len(run) - i), 1, -1):
+                    gram = " ".join(run[i:i + n])
+                    if gram not in collocations:
+                        continue
+                    if spans and i < spans[-1][1]:
+                        spans[-1][1] = max(spans[-1][1], i + n)
+                        spans[-1][2].append(gram)
+                    else:
+                        spans.append([i, i + n, [gram]])
+                    break
+            for start, end, grams in spans:
+                phrase = " ".join(run[start:end])
+                local[phrase] = local.get(phrase, 0) + 1
+                parts.setdefault(phrase, grams)
+
+        covered = {w for p in local for w in p.split()}
+        single_counts: Dict[str, int] = {}
+        for word in terms(text, resources.lexicon):
+            if word in edge_words or any(w in covered for w in word.split()):
+                continue
+            single_counts[word] = single_counts.get(word, 0) + 1
+        singles = {w: c for w, c in single_counts.items() if " " in w or c >= 2}
+
+        lookups = sorted({g for grams in parts.values() for g in grams} | set(singles))
+        with self._lock:
+            doc_freq = dict(zip(lookups, self.doc_freq.estimate(lookups).tolist()))
+
+        def idf(df: int) -> float:
+            return math.log((1 + documents) / (1 + df)) + 1.0
+
+        scored = []
+        for phrase, count in local.items():
+            grams = parts[phrase]
+            # Most common constituent bounds the span's document frequency
+            boost = 1.0 + max(association[g] for g in grams)
+            scored.append((phrase, count * idf(max(doc_freq[g] for g in grams)) * boost * len(phrase.split())))
+        for word, count in singles.items():
+            scored.append((word, count * idf(doc_freq[word]) * len(word.split())))
+
+        ranked = sorted(scored, key=lambda x: -x[1])[:limit]
+        if not ranked:
+            return []
+        top = ranked[0][1]
+        return [(term, round(s / top, 3)) for term, s in ranked]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "documents": self.documents,
+                "tokens": self.totals[1],
+                "memory_bytes": self.unigrams.nbytes + self.ngrams.nbytes + self.doc_freq.nbytes,
+            }
+
+
+class CollocationRegistry:
+    """
+    One statistics object per conference, loaded on first use into the
+    conference resource LRU and saved under COLLOCATION_STORE_DIR on eviction,
+    every COLLOCATION_SAVE_EVERY new abstracts and by flush() at shutdown
+    """
+
+    def __init__(self, directory: Optional[str]):
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, conference_id: str) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        name = hashlib.sha256(conference_id.encode("utf-8")).hexdigest()[:32]
+        return self.directory / f"{name}.npz"
+
+    def _load(self, conference_id: str) -> CollocationStats:
+        dimensions = (settings.COLLOCATION_SKETCH_WIDTH, settings.COLLOCATION_SKETCH_DEPTH, settings.COLLOCATION_MAX_NGRAM)
+        path = self._path(conference_id)
+        if path is not None and path.is_file():
+            try:
+                return CollocationStats.load(path, *dimensions)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Collocation statistics of {conference_id} not loaded, starting empty: {e}")
+        return CollocationStats(*dimensions)
+
+    def get(self, conference_id: str) -> CollocationStats:
+        return conference_resources.get(
+            ("collocations", conference_id),
+            load=lambda: self._load(conference_id),
+            size=lambda stats: stats.nbytes,
+            on_evict=lambda stats: stats.save(self._path(conference_id))
+        )
+
+    def add_document(self, conference_id: str, paper_id: str, text: str) -> bool:
+        """Count a submitted abstract in its conference (see CollocationStats.add_document)"""
+        while True:
+            stats = self.get(conference_id)
+            try:
+                added = stats.add_document(paper_id, text)
+            except StatsEvicted:
+                continue  # Evicted under us: count it in the reloaded copy
+            if added and 0 < settings.COLLOCATION_SAVE_EVERY <= stats.unsaved:
+                stats.checkpoint(self._path(conference_id))
+            return added
+
+    def flush(self) -> int:
+        """Save every loaded conference with unsaved counts; returns how many were written"""
+        written = 0
+        for key, stats in conference_resources.items("collocations"):
+            try:
+                written += stats.checkpoint(self._path(key[1]))
+            except OSError as e:
+                logger.error(f"Saving collocation statistics of {key[1]} failed: {str(e)}")
+        return written
+
+    def ready(self, conference_id: Optional[str]) -> Optional[CollocationStats]:
+        """Statistics of a conference with enough abstracts to trust, else None"""
+        if not conference_id:
+            return None
+        if not conference_resources.contains(("collocations", conference_id)):
+            path = self._path(conference_id)
+            if path is None or not path.is_file():
+                return None  # Nothing counted yet: do not load an empty object
+        stats = self.get(conference_id)
+        if stats.documents < settings.COLLOCATION_MIN_DOCUMENTS:
+            return None
+        return stats
+
+
+# Global registry instance
+collocation_stats = CollocationRegistry(settings.COLLOCATION_STORE_DIR)
@@ -0,0 +1,276 @@
+"""
+Per-Conference Configuration and Resources
+Conference overlays on the global settings, read from one JSON file and
+activated per request by the X-Conference-Id header, so every `settings.X`
+read inside that request sees the conference's value. Per-conference state
+(keyphrase statistics, near-duplicate indexes, custom language resources) is
+loaded on first use into one memory-bounded LRU; evicted entries are written
+back or simply re-read later, so inactive conferences cost no memory
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from config import Settings, base_settings, conference_scope, settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_DIR = Path(__file__).resolve().parent
+CONFERENCE_HEADER = b"x-conference-id"
+
+# Settings read per request; process-wide ones (pools, limits, paths of
+# shared caches, admission) are not overridable
+OVERRIDABLE_SETTINGS = frozenset({
+    "ENABLE_AUTHOR_SPELLCHECK",
+    "ENABLE_AUTHOR_ABSTRACT_POLISHING",
+    "ENABLE_AUTHOR_KEYWORD_SUGGESTION",
+    "ENABLE_ENGLISH_CONTEXTUAL_CHECK",
+    "CONTEXTUAL_GATE_THRESHOLD",
+    "ENABLE_REVIEWER_SUMMARY",
+    "ENABLE_REVIEWER_KEY_POINTS",
+    "ENABLE_REVIEWER_SIMILARITY",
+    "ENABLE_CHAIR_EMAIL_TEMPLATES",
+    "ENABLE_CHAIR_DUPLICATE_DETECTION",
+    "SUMMARY_MIN_LENGTH",
+    "SUMMARY_MAX_LENGTH",
+    "MAX_KEYWORDS",
+    "LANGUAGE_RESOURCE_FILE",
+    "DIACRITIC_MIN_MARGIN",
+    "COLLOCATION_MIN_COUNT",
+    "COLLOCATION_MIN_NPMI",
+    "COLLOCATION_MIN_DOCUMENTS",
+    "NEAR_DUPLICATE_THRESHOLD",
+    "GROQ_MODEL",
+    "GROQ_MAX_TOKENS",
+    "GROQ_TEMPERATURE",
+})
+
+
+class ConferenceConfig:
+    """
+    Settings overlays keyed by conference ID
+
+    File format: {"conferences": {"<conference_id>": {"GROQ_MODEL": "...", ...}}}
+    Unknown or non-overridable names and invalid values are logged and
+    skipped; a missing file means no overlays.
+    """
+
+    def __init__(self, path: str):
+        if path:
+            self.path: Optional[Path] = Path(path) if Path(path).is_absolute() else SERVICE_DIR / path
+        else:
+            self.path = None
+        self._overlays: Dict[str, Settings] = {}
+        self.activations = 0
+        self.reload()
+
+    def _validate(self, conference_id: str, overrides: Any) -> Dict[str, Any]:
+        if not isinstance(overrides, dict):
+            logger.warning(f"Conference {conference_id}: overrides must be an object")
+            return {}
+        valid = {}
+        for name, value in overrides.items():
+            if name not in OVERRIDABLE_SETTINGS:
+                logger.warning(f"Conference {conference_id}: {name} cannot be set per conference")
+                continue
+            try:
+                valid[name] = TypeAdapter(Settings.model_fields[name].annotation).validate_python(value)
+            except ValidationError:
+                logger.warning(f"Conference {conference_id}: invalid value for {name}")
+        return valid
+
+    def reload(self):
+        """Read the overlay file; on error the current overlays stay"""
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Conference settings not loaded: {e}")
+            return
+        conferences = data.get("conferences", {}) if isinstance(data, dict) else {}
+        overlays = {}
+        for conference_id, overrides in conferences.items():
+            valid = self._validate(conference_id, overrides)
+            if valid:
+                overlays[conference_id] = base_settings.model_copy(update=valid)
+        self._overlays = overlays
+        logger.info(f"Settings overlays for {len(overlays)} conferences")
+
+    def settings_for(self, conference_id: Optional[str]) -> Optional[Settings]:
+        """The conference's settings, or None when it has no overlay"""
+        if not conference_id:
+            return None
+        return self._overlays.get(conference_id)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "conferences": len(self._overlays),
+            "activations": self.activations,
+        }
+
+
+class _Entry:
+    __slots__ = ("value", "nbytes", "size", "on_evict")
+
+    def __init__(self, value: Any, size: Callable[[Any], int], on_evict: Optional[Callable[[Any], None]]):
+        self.value = value
+        self.size = size
+        self.nbytes = size(value)
+        self.on_evict = on_evict
+
+
+class ResourceCache:
+    """
+    LRU of lazily loaded per-conference objects, bounded by their estimated
+    memory (re-measured on every access, as indexes grow)
+
+    Loads of different keys run concurrently; the most recently used entry is
+    never evicted, even when it alone exceeds the budget. on_evict (writing
+    the object back) runs under the cache lock, so a reload of the same key
+    always sees what it wrote.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._loading: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _hit(self, key: Hashable) -> Tuple[bool, Any]:
+        """Under self._lock: (found, value), re-measuring the entry"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        nbytes = entry.size(entry.value)
+        self.bytes += nbytes - entry.nbytes
+        entry.nbytes = nbytes
+        self._shrink()
+        return True, entry.value
+
+    def _shrink(self):
+        """Under self._lock: evict least recently used entries down to the budget"""
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self.bytes -= entry.nbytes
+            self.evictions += 1
+            if entry.on_evict is not None:
+                try:
+                    entry.on_evict(entry.value)
+                except Exception as e:
+                    logger.error(f"Evicting a conference resource failed: {str(e)}")
+
+    def get(
+        self,
+        key: Hashable,
+        load: Callable[[], Any],
+        size: Callable[[Any], int],
+        on_evict: Optional[Callable[[Any], None]] = None
+    ) -> Any:
+        """Cached value of key, loading it on first use (load errors propagate)"""
+        with self._lock:
+            found, value = self._hit(key)
+            if found:
+                return value
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                found, value = self._hit(key)
+            if found:
+                return value
+            started = time.perf_counter()
+            try:
+                value = load()
+            except BaseException:
+                with self._lock:
+                    self._loading.pop(key, None)
+                raise
+            entry = _Entry(value, size, on_evict)
+            with self._lock:
+                self.loads += 1
+                self.load_seconds += time.perf_counter() - started
+                self._entries[key] = entry
+                self._loading.pop(key, None)  # Only once the entry is visible
+                self.bytes += entry.nbytes
+                self._shrink()
+        return value
+
+    def contains(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def items(self, kind: str) -> List[Tuple[Hashable, Any]]:
+        """Snapshot of the loaded (key, value) pairs whose key starts with kind"""
+        with self._lock:
+            return [
+                (key, entry.value) for key, entry in self._entries.items()
+                if isinstance(key, tuple) and key[0] == kind
+            ]
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            kinds: Dict[str, int] = {}
+            for key in self._entries:
+                kind = key[0] if isinstance(key, tuple) else str(key)
+                kinds[kind] = kinds.get(kind, 0) + 1
+            lookups = self.hits + self.loads
+            return {
+                "entries": len(self._entries),
+                "entries_by_kind": kinds,
+                "memory_bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "load_ms_avg": round(self.load_seconds / self.loads * 1000, 2) if self.loads else 0.0,
+            }
+
+
+class ConferenceMiddleware:
+    """
+    Pure ASGI middleware: requests sent with X-Conference-Id run with that
+    conference's settings overlay (the whole request, streaming included)
+
+    Conferences without an overlay, and requests without the header, see the
+    global settings at the cost of one header scan.
+    """
+
+    def __init__(self, app, config: "ConferenceConfig"):
+        self.app = app
+        self.config = config
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        conference_id = dict(scope["headers"]).get(CONFERENCE_HEADER, b"").decode("latin-1").strip()
+        overlay = self.config.settings_for(conference_id)
+        if overlay is None:
+            await self.app(scope, receive, send)
+            return
+        self.config.activations += 1
+        with conference_scope(overlay):
+            await self.app(scope, receive, send)
+
+
+# Global instances
+conference_config = ConferenceConfig(settings.CONFERENCE_SETTINGS_FILE)
+conference_resources = ResourceCache(settings.CONFERENCE_RESOURCE_MEMORY_MB * 1024 * 1024)
@@ -3,8 +3,10 @@ AI Service Configuration
 Manages feature flags and settings for the AI Support Module
 """
 
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pydantic_settings import BaseSettings
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional
 
 
 class Settings(BaseSettings):
@@ -19,11 +21,16 @@ class Settings(BaseSettings):
     ENABLE_AUTHOR_SPELLCHECK: bool = True
     ENABLE_AUTHOR_ABSTRACT_POLISHING: bool = True
     ENABLE_AUTHOR_KEYWORD_SUGGESTION: bool = True
+    ENABLE_ENGLISH_CONTEXTUAL_CHECK: bool = True  # English sentences: English-prompted AI check (off = dictionary-free, no LLM)
+    CONTEXTUAL_GATE_THRESHOLD: float = 0.1  # Local pre-screen score needed to call the LLM (0 = always call)
     
     ENABLE_REVIEWER_SUMMARY: bool = True
     ENABLE_REVIEWER_KEY_POINTS: bool = True
     ENABLE_REVIEWER_SIMILARITY: bool = True
     
+    ENABLE_CHAIR_EMAIL_TEMPLATES: bool = True
+    ENABLE_CHAIR_DUPLICATE_DETECTION: bool = True
+    
     # Audit Logging
     ENABLE_AUDIT_LOGGING: bool = True
     AUDIT_LOG_PATH: str = "logs/audit.log"
@@ -33,12 +40,106 @@ class Settings(BaseSettings):
     SUMMARY_MIN_LENGTH: int = 150
     SUMMARY_MAX_LENGTH: int = 250
     MAX_KEYWORDS: int = 10
+    TOKENIZER_CACHE_ENTRIES: int = 256  # Token streams cached per text
+    
+    # Language resources (dictionary, lexicon, stopwords) - reloadable at runtime
+    LANGUAGE_RESOURCE_FILE: str = "resources/vietnamese.json"  # Relative to the service directory
+    
+    # Diacritic restoration (syllable bigram model, built by: python diacritics.py train)
+    DIACRITIC_MODEL_FILE: str = "resources/diacritics.npz"  # Relative to the service directory; missing = disabled
+    DIACRITIC_MAX_CANDIDATES: int = 6  # Accentuations considered per un-accented syllable
+    DIACRITIC_MIN_MARGIN: float = 1.0  # log10 odds over the syllable as typed before a fix is suggested
+    
+    # Conference keyphrase statistics (count-min sketches, fixed memory per conference)
+    COLLOCATION_SKETCH_WIDTH: int = 65536  # 3 sketches x depth x width x 4 bytes
+    COLLOCATION_SKETCH_DEPTH: int = 4
+    COLLOCATION_MAX_NGRAM: int = 4  # Syllables per keyphrase
+    COLLOCATION_MIN_COUNT: int = 3  # Corpus occurrences before a phrase can be a collocation
+    COLLOCATION_MIN_NPMI: float = 0.3
+    COLLOCATION_MIN_DOCUMENTS: int = 20  # Below this, keywords fall back to TF-IDF
+    COLLOCATION_STORE_DIR: str = "cache/collocations"  # Statistics evicted from memory are saved here; empty = dropped
+    COLLOCATION_SAVE_EVERY: int = 50  # New abstracts per conference between saves; 0 = only on eviction and shutdown
+    
+    # Near-duplicate submissions (MinHash + LSH over title and abstract)
+    NEAR_DUPLICATE_STORE_DIR: str = "cache/near_duplicates"  # Empty = in memory only
+    NEAR_DUPLICATE_SHINGLE_SIZE: int = 3  # Syllables per shingle
+    NEAR_DUPLICATE_NUM_PERM: int = 128
+    NEAR_DUPLICATE_BANDS: int = 32  # 4 rows per band: pairs above ~0.45 Jaccard become candidates
+    NEAR_DUPLICATE_THRESHOLD: float = 0.5  # Minimum estimated Jaccard reported
+    
+    # Per-conference settings (X-Conference-Id header) and lazily loaded resources
+    CONFERENCE_SETTINGS_FILE: str = "resources/conferences.json"  # Overlays on these settings; missing = none
+    CONFERENCE_RESOURCE_MEMORY_MB: int = 256  # Statistics, indexes and lexicons kept in memory (LRU)
+    
+    # Reviewer summary cache (shared by all reviewers and workers)
+    SUMMARY_CACHE_DIR: str = "cache/summaries"
+    SUMMARY_CACHE_MEMORY_ENTRIES: int = 1024
+    SUMMARY_BATCH_CHUNK: int = 4  # Uncached papers summarized per vectorized pass in a batch request
+    
+    # Reviewer expertise profiles (one JSON file per reviewer)
+    REVIEWER_PROFILE_DIR: str = "cache/reviewer_profiles"  # Empty = in memory only
+    REVIEWED_TOPIC_WEIGHT: float = 0.5  # Per reviewed paper, capped at the stated weight 1.0
+    
+    # Manuscript Mode (streaming spellcheck of full papers)
+    MANUSCRIPT_MAX_LENGTH: int = 2_000_000  # characters
+    MANUSCRIPT_CHUNK_SIZE: int = 4000
+    MANUSCRIPT_CHUNK_OVERLAP: int = 200  # Keeps phrases crossing a chunk boundary whole
     
     # External AI Service (Groq)
     GROQ_API_KEY: str = ""  # Set in .env file
     GROQ_MODEL: str = "llama-3.3-70b-versatile"  # Free tier model (updated)
-    GROQ_MAX_TOKENS: int = 2000
+    GROQ_MAX_TOKENS: int = 2000  # Upper bound; each call asks for what its input needs (see prompts.py)
     GROQ_TEMPERATURE: float = 0.7
+    PROMPT_OUTPUT_HEADROOM: float = 1.25  # Safety factor on the estimated output tokens
+    
+    # Global LLM rate limit (shared by all Groq calls in this worker)
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_REQUESTS_PER_MINUTE: int = 30  # Groq free tier
+    LLM_QUEUE_TIMEOUT: float = 10.0  # Seconds to wait for a slot before falling back
+    
+    # Circuit breaker around Groq - fail fast to local fallbacks during outages
+    LLM_BREAKER_WINDOW: int = 50  # Recent calls considered for the error rate
+    LLM_BREAKER_MIN_CALLS: int = 10
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0  # Before half-open probing
+    LLM_BREAKER_HALF_OPEN_PROBES: int = 2
+    LLM_SLOW_CALL_SECONDS: float = 15.0  # Slower successful calls count as failures
+    LLM_TIMEOUT_MIN: float = 2.0
+    LLM_TIMEOUT_MAX: float = 20.0  # Also used until enough latencies are observed
+    LLM_TIMEOUT_P95_MULTIPLIER: float = 2.0
+    
+    # Shared HTTP connection pool for Groq (keep-alive, HTTP/2 when h2 is installed)
+    LLM_POOL_MAX_CONNECTIONS: int = 8  # >= LLM_MAX_CONCURRENCY so slots never wait on the pool
+    LLM_POOL_MAX_KEEPALIVE: int = 8
+    LLM_POOL_KEEPALIVE_EXPIRY: float = 120.0  # Seconds an idle connection is kept open
+    LLM_POOL_WARM_CONNECTIONS: int = 2  # Opened at startup
+    LLM_HTTP2: bool = True
+    LLM_CONNECT_TIMEOUT: float = 5.0
+    
+    # Per-stage timings (Server-Timing header; X-Debug-Timing: 1 adds a "debug" field)
+    ENABLE_STAGE_TIMING: bool = True
+    
+    # Request deadlines (X-Request-Timeout-Ms / X-Request-Deadline headers)
+    REQUEST_DEFAULT_TIMEOUT: float = 90.0  # API gateway default downstream timeout
+    DEADLINE_SAFETY_MARGIN: float = 0.05  # Reserved for building the response
+    
+    # Admission control / load shedding
+    ENABLE_ADMISSION_CONTROL: bool = True
+    ADMISSION_CPU_CONCURRENCY: int = 0  # 0 = number of CPU cores
+    ADMISSION_LLM_CONCURRENCY: int = 0  # 0 = 4 x LLM_MAX_CONCURRENCY
+    ADMISSION_QUEUE_FACTOR: int = 4  # Queue depth as a multiple of the concurrency limit
+    ADMISSION_QUEUE_TIMEOUT: float = 5.0  # Seconds a request may wait for a slot
+    ADMISSION_TARGET_LAG: float = 0.05  # Event-loop lag at which low-priority work is shed
+    ADMISSION_LAG_INTERVAL: float = 0.1  # Event-loop lag sampling period
+    
+    # Admin endpoints (X-Admin-Token header); empty = admin endpoints disabled
+    ADMIN_API_TOKEN: str = ""
+    
+    # On-demand sampling profiler (admin only; collapsed stacks for flame graphs)
+    PROFILE_DIR: str = "cache/profiles"  # Empty = profiles are not written
+    PROFILE_SAMPLE_INTERVAL: float = 0.01  # Seconds between stack samples (100 Hz)
+    PROFILE_MAX_SECONDS: float = 60.0  # Longest session, window or single request
+    PROFILE_MAX_FILES: int = 50  # Oldest profiles are deleted beyond this
     
     # Privacy Settings
     HASH_INPUT_IN_LOGS: bool = True  # Hash sensitive content in logs
@@ -49,7 +150,36 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
-settings = Settings()
+base_settings = Settings()
+
+# Overlay of the conference the current request belongs to (see conferences.py)
+_conference_settings: ContextVar[Optional[Settings]] = ContextVar("conference_settings", default=None)
+
+
+class ScopedSettings:
+    """The settings as seen by the current request: its conference overlay if any, else the globals"""
+
+    __slots__ = ()
+
+    # __getattribute__ rather than __getattr__: no failed lookup on every read
+    def __getattribute__(self, name: str) -> Any:
+        return getattr(_conference_settings.get() or base_settings, name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(base_settings, name, value)
+
+
+@contextmanager
+def conference_scope(overlay: Optional[Settings]) -> Iterator[None]:
+    """Run the block with a conference's settings (None = the globals)"""
+    token = _conference_settings.set(overlay)
+    try:
+        yield
+    finally:
+        _conference_settings.reset(token)
+
+
+settings = ScopedSettings()
 
 
 def get_feature_status() -> Dict[str, Any]:
@@ -59,6 +189,7 @@ def get_feature_status() -> Dict[str, Any]:
             "spellcheck": settings.ENABLE_AUTHOR_SPELLCHECK,
             "abstract_polishing": settings.ENABLE_AUTHOR_ABSTRACT_POLISHING,
             "keyword_suggestion": settings.ENABLE_AUTHOR_KEYWORD_SUGGESTION,
+            "english_contextual_check": settings.ENABLE_ENGLISH_CONTEXTUAL_CHECK,
         },
         "reviewer_features": {
             "summary": settings.ENABLE_REVIEWER_SUMMARY,
@@ -67,6 +198,7 @@ def get_feature_status() -> Dict[str, Any]:
         },
         "chair_features": {
             "email_templates": settings.ENABLE_CHAIR_EMAIL_TEMPLATES,
+            "duplicate_detection": settings.ENABLE_CHAIR_DUPLICATE_DETECTION,
         },
         "audit_logging": settings.ENABLE_AUDIT_LOGGING,
     }
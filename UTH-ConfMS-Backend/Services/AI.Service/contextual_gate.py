@@ -0,0 +1,121 @@
+"""
+Contextual Check Gate
+Cheap local pre-screen in front of the LLM contextual check. Clean, fully
+accented Vietnamese almost never has contextual errors the dictionary pass
+cannot see, so the Groq call is only made when the text shows signs of
+missing or ambiguous diacritics
+"""
+
+import threading
+from typing import AbstractSet, Dict, Optional
+
+from config import settings
+from resources import LanguageResources, get_resources
+from tokenizer import segment
+
+# Weight of each un-accented single syllable in the score (per syllable of text)
+MISSING_WEIGHT = 1.0  # Needs diacritics, one known spelling - dictionary fixes it, LLM confirms
+AMBIGUOUS_WEIGHT = 3.0  # Several spellings, none accent-free ("moi": mới / mỗi / mọi)
+AMBIGUOUS_PLAIN_WEIGHT = 0.5  # Several spellings, one accent-free ("qua", "nay")
+UNKNOWN_WEIGHT = 0.5  # Not in the resources at all
+
+
+class GateDecision:
+    """Outcome of the pre-screen for one text"""
+
+    __slots__ = ("score", "escalate", "signals")
+
+    def __init__(self, score: float, escalate: bool, signals: Dict[str, int]):
+        self.score = score
+        self.escalate = escalate
+        self.signals = signals
+
+
+class ContextualGate:
+    """
+    Scores Vietnamese text for the LLM check; escalates at or above threshold
+
+    Recall guard: a syllable that is ambiguous without context and cannot be
+    correct un-accented always escalates, whatever the threshold.
+    A threshold of 0 restores the old behaviour (always call). Without a
+    fixed threshold, CONTEXTUAL_GATE_THRESHOLD is read on every decision, so
+    per-conference overrides apply.
+    """
+
+    def __init__(self, threshold: Optional[float] = None):
+        self._threshold = threshold
+        self.checked = 0
+        self.escalated = 0
+        self._lock = threading.Lock()
+
+    @property
+    def threshold(self) -> float:
+        return settings.CONTEXTUAL_GATE_THRESHOLD if self._threshold is None else self._threshold
+
+    @staticmethod
+    def signals(
+        text: str,
+        resources: Optional[LanguageResources] = None,
+        settled: AbstractSet[int] = frozenset()
+    ) -> Dict[str, int]:
+        """
+        Syllable counts: resolved (accented, inside a lexicon word, or settled -
+        start positions the diacritic model confirmed), missing, ambiguous,
+        ambiguous_plain and unknown (un-accented single syllables)
+        """
+        resources = resources or get_resources()
+        forms = resources.forms
+        counts = {"syllables": 0, "resolved": 0, "missing": 0, "ambiguous": 0, "ambiguous_plain": 0, "unknown": 0}
+        for token in segment(text, resources.lexicon):
+            if token.size > 1:
+                # Lexicon words resolve their own diacritics from the word
+                counts["syllables"] += token.size
+                counts["resolved"] += token.size
+                continue
+            word = token.text.lower()
+            counts["syllables"] += 1
+            if token.key != word or token.start in settled:
+                counts["resolved"] += 1
+                continue
+            spellings = forms.get(token.key)
+            if spellings is None:
+                if len(word) >= 2:
+                    counts["unknown"] += 1
+            elif len(spellings) > 1:
+                counts["ambiguous_plain" if word in spellings else "ambiguous"] += 1
+            elif word not in spellings:
+                counts["missing"] += 1
+        return counts
+
+    def decide(self, text: str, settled: AbstractSet[int] = frozenset()) -> GateDecision:
+        counts = self.signals(text, settled=settled)
+        if counts["syllables"] == 0:
+            score = 0.0
+        else:
+            score = (
+                MISSING_WEIGHT * counts["missing"]
+                + AMBIGUOUS_WEIGHT * counts["ambiguous"]
+                + AMBIGUOUS_PLAIN_WEIGHT * counts["ambiguous_plain"]
+                + UNKNOWN_WEIGHT * counts["unknown"]
+            ) / counts["syllables"]
+        escalate = counts["ambiguous"] > 0 or score >= self.threshold
+        with self._lock:
+            self.checked += 1
+            if escalate:
+                self.escalated += 1
+        return GateDecision(round(score, 3), escalate, counts)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            checked, escalated = self.checked, self.escalated
+        return {
+            "threshold": self.threshold,
+            "checked": checked,
+            "escalated": escalated,
+            "avoided": checked - escalated,
+            "avoided_ratio": round((checked - escalated) / checked, 3) if checked else 0.0,
+        }
+
+
+# Global gate instance
+contextual_gate = ContextualGate()
@@ -0,0 +1,91 @@
+"""
+Correction Application Engine
+Resolves overlapping corrections by priority and applies them in one pass
+"""
+
+from bisect import bisect_left
+from typing import Iterable, List
+
+from records import Correction, Patch
+
+
+# Lower value wins when two corrections overlap: dictionary before LLM,
+# multi-word phrases before single words
+ERROR_TYPE_PRIORITY = {
+    "phrase": 0,
+    "diacritic": 1,  # Context-aware, so it beats the dictionary's single guess
+    "spelling": 2,
+    "contextual": 3,
+}
+DEFAULT_PRIORITY = 4
+
+
+class IntervalSet:
+    """Sorted, non-overlapping half-open intervals with O(log n) overlap test"""
+
+    __slots__ = ("_starts", "_ends")
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+    def overlaps(self, start: int, end: int) -> bool:
+        i = bisect_left(self._starts, start)
+        # Interval starting at or after start
+        if i < len(self._starts) and self._starts[i] < end:
+            return True
+        # Interval starting before start
+        return i > 0 and self._ends[i - 1] > start
+
+    def add(self, start: int, end: int):
+        i = bisect_left(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+
+
+def resolve(text: str, corrections: Iterable[Correction]) -> List[Correction]:
+    """
+    Keep the highest-priority correction wherever corrections overlap
+
+    Corrections whose original does not match the text at their position
+    (e.g. stale LLM offsets) are dropped. Result is sorted by position.
+    """
+    candidates = []
+    for corr in corrections:
+        end = corr.position + len(corr.original)
+        if corr.position < 0 or text[corr.position:end] != corr.original:
+            continue
+        priority = ERROR_TYPE_PRIORITY.get(corr.error_type, DEFAULT_PRIORITY)
+        candidates.append((priority, corr.position, -len(corr.original), corr))
+
+    taken = IntervalSet()
+    accepted = []
+    for _, start, neg_len, corr in sorted(candidates, key=lambda c: c[:3]):
+        end = start - neg_len
+        if taken.overlaps(start, end):
+            continue
+        taken.add(start, end)
+        accepted.append(corr)
+
+    accepted.sort(key=lambda c: c.position)
+    return accepted
+
+
+def apply(text: str, corrections: List[Correction]) -> str:
+    """Build the corrected text in a single pass (corrections resolved and sorted)"""
+    parts = []
+    cursor = 0
+    for corr in corrections:
+        parts.append(text[cursor:corr.position])
+        parts.append(corr.suggested)
+        cursor = corr.position + len(corr.original)
+    parts.append(text[cursor:])
+    return "".join(parts)
+
+
+def to_patches(corrections: List[Correction]) -> List[Patch]:
+    """Compact replace operations against the original text (resolved and sorted)"""
+    return [
+        Patch(start=c.position, end=c.position + len(c.original), replacement=c.suggested)
+        for c in corrections
+    ]
@@ -0,0 +1,71 @@
+"""
+Request Deadlines
+Carries the caller's remaining time budget through the service methods so
+stages that cannot finish in time are skipped instead of outliving the
+gateway request
+"""
+
+import time
+from typing import List, Optional
+
+from fastapi import Request
+
+from config import settings
+
+
+# Relative budget in milliseconds (preferred - no clock sync needed)
+TIMEOUT_HEADER = "X-Request-Timeout-Ms"
+# Absolute deadline as Unix epoch milliseconds
+DEADLINE_HEADER = "X-Request-Deadline"
+
+
+class DeadlineExceeded(Exception):
+    """Not enough time left to run a stage"""
+
+
+class Deadline:
+    """Monotonic deadline plus the list of stages degraded to meet it"""
+
+    __slots__ = ("expires_at", "degraded")
+
+    def __init__(self, timeout: float):
+        self.expires_at = time.monotonic() + timeout
+        self.degraded: List[str] = []
+
+    @classmethod
+    def from_headers(cls, headers) -> "Deadline":
+        """Build from request headers, falling back to REQUEST_DEFAULT_TIMEOUT"""
+        timeout = settings.REQUEST_DEFAULT_TIMEOUT
+        try:
+            if TIMEOUT_HEADER in headers:
+                timeout = float(headers[TIMEOUT_HEADER]) / 1000
+            elif DEADLINE_HEADER in headers:
+                timeout = float(headers[DEADLINE_HEADER]) / 1000 - time.time()
+        except ValueError:
+            pass  # Malformed header - keep the default budget
+        return cls(max(timeout, 0.0))
+
+    def remaining(self) -> float:
+        """Seconds left, minus the margin reserved for building the response"""
+        return self.expires_at - time.monotonic() - settings.DEADLINE_SAFETY_MARGIN
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, seconds: float) -> bool:
+        """Is there time for a stage expected to take this long?"""
+        return self.remaining() >= seconds
+
+    def degrade(self, stage: str):
+        """Record a stage that was skipped or cut short"""
+        if stage not in self.degraded:
+            self.degraded.append(stage)
+
+
+def request_deadline(request: Request) -> Deadline:
+    """FastAPI dependency: deadline of the current request"""
+    return Deadline.from_headers(request.headers)
+
+
+def degraded_stages(deadline: Optional[Deadline]) -> List[str]:
+    return list(deadline.degraded) if deadline is not None else []
@@ -0,0 +1,59 @@
+"""
+Fast JSON Serialization
+Serializes result records straight to bytes on hot endpoints, skipping
+FastAPI's response_model re-validation and the default JSON encoder
+"""
+
+import dataclasses
+import json
+from typing import Any, Optional, Type
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Fallback encoder for the stdlib json path"""
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize dataclass records, pydantic models and plain containers to UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_line(content: Any) -> bytes:
+    """Serialize one NDJSON line"""
+    return dumps(content) + b"\n"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; accepts slotted dataclass records"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fast_response(content: Any, schema: Optional[Type[BaseModel]] = None, **kwargs) -> FastJSONResponse:
+    """
+    Build a response from a result record
+
+    The request was already validated at the boundary; in DEBUG the record is
+    also checked against its response model to catch schema drift.
+    """
+    if settings.DEBUG and schema is not None:
+        schema.model_validate(dataclasses.asdict(content) if dataclasses.is_dataclass(content) else content)
+    return FastJSONResponse(content=content, **kwargs)
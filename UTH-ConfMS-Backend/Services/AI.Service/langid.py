@@ -0,0 +1,184 @@
+"""
+Language Identification
+Vietnamese vs English per sentence, in microseconds and without a model:
+Vietnamese syllables have a closed shape (onset + vowel cluster + one of eight
+codas), so even un-accented Vietnamese matches it while most English content
+words do not; accented letters and English function words settle the rest.
+Used at the entry of the author and reviewer pipelines to pick stages,
+prompts and stopwords
+"""
+
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from config import settings
+from resources import LanguageResources, get_resources
+from tokenizer import SYLLABLE_PATTERN, fold
+
+VIETNAMESE = "vi"
+ENGLISH = "en"
+
+# Folded (no diacritics), lowercase Vietnamese syllable
+_ONSET = r"(?:ngh|ng|nh|ch|gh|gi|kh|ph|qu|th|tr|[bcdghklmnprstvx])?"
+_VOWELS = (
+    r"(?:uye|uya|uyu|ieu|yeu|uoi|uou|oai|oay|oeo|uay|"
+    r"ai|ao|au|ay|eo|eu|ia|ie|iu|oa|oe|oi|oo|ua|ue|ui|uo|uu|uy|ye|"
+    r"[aeiouy])"
+)
+_CODA = r"(?:ch|ng|nh|[cmnpt])?"
+VI_SYLLABLE = re.compile(rf"{_ONSET}{_VOWELS}{_CODA}")
+
+# Routing unit: sentences (and lines, so a heading is judged on its own)
+_SENTENCE_END = re.compile(r"[.!?;:\n]+\s*")
+
+
+class LanguageSpan:
+    """A run of consecutive sentences in one language"""
+
+    __slots__ = ("language", "start", "end")
+
+    def __init__(self, language: str, start: int, end: int):
+        self.language = language
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"LanguageSpan({self.language!r}, {self.start}, {self.end})"
+
+
+@lru_cache(maxsize=2)
+def _vocabulary(resources: LanguageResources) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    (known un-accented Vietnamese words, English markers)
+    Markers are English function words that cannot be un-accented Vietnamese:
+    "which", "from" count as English; "an", "that" could be "an toàn", "thật"
+    """
+    vietnamese = {fold(w) for w in resources.stopwords} | set(resources.dictionary)
+    vietnamese.update(k for key in resources.lexicon.forms for k in key.split())
+    markers = frozenset(
+        word for word in resources.english_stopwords
+        if word not in vietnamese and not VI_SYLLABLE.fullmatch(word)
+    )
+    return frozenset(vietnamese), markers
+
+
+def _votes(text: str) -> Tuple[int, int]:
+    """(Vietnamese, English) evidence of the words in text"""
+    vietnamese_words, english_words = _vocabulary(get_resources())
+    vi = en = 0
+    # Pattern, not syllables(): sentences must not evict whole texts from its cache
+    for match in SYLLABLE_PATTERN.finditer(text):
+        word = match.group().lower()
+        if fold(word) != word or word in vietnamese_words:
+            vi += 2  # Carries Vietnamese diacritics, or a known Vietnamese word without them
+        elif word in english_words:
+            en += 1
+        elif VI_SYLLABLE.fullmatch(word):
+            vi += 1  # Could be either ("can", "ban", "that")
+        else:
+            en += 2  # No Vietnamese syllable looks like this
+    return vi, en
+
+
+def identify(text: str) -> Optional[str]:
+    """Language of a sentence; None when it has no words to judge"""
+    vi, en = _votes(text)
+    if vi == en == 0:
+        return None
+    # Ties go to Vietnamese - the historical default of every pipeline
+    return VIETNAMESE if vi >= en else ENGLISH
+
+
+@lru_cache(maxsize=settings.TOKENIZER_CACHE_ENTRIES)
+def _spans(text: str, resources_version: str) -> Tuple[LanguageSpan, ...]:
+    bounds = [m.end() for m in _SENTENCE_END.finditer(text)]
+    if not bounds or bounds[-1] != len(text):
+        bounds.append(len(text))
+
+    labelled: List[Tuple[Optional[str], int, int]] = []
+    start = 0
+    for end in bounds:
+        labelled.append((identify(text[start:end]), start, end))
+        start = end
+
+    # Sentences without words join their neighbour; text without any is Vietnamese
+    known = [language for language, _, _ in labelled if language is not None]
+    previous = known[0] if known else VIETNAMESE
+    spans: List[LanguageSpan] = []
+    for language, start, end in labelled:
+        language = language or previous
+        previous = language
+        if spans and spans[-1].language == language:
+            spans[-1].end = end
+        else:
+            spans.append(LanguageSpan(language, start, end))
+    return tuple(spans)
+
+
+def language_spans(text: str) -> Tuple[LanguageSpan, ...]:
+    """Text split into single-language runs of sentences, covering all of it"""
+    spans = _spans(text, get_resources().version)
+    detections.record(spans)
+    return spans
+
+
+def languages_of(spans: Iterable[LanguageSpan]) -> List[str]:
+    """Languages present, largest share first"""
+    sizes: Dict[str, int] = {}
+    for span in spans:
+        sizes[span.language] = sizes.get(span.language, 0) + span.end - span.start
+    return sorted(sizes, key=lambda language: -sizes[language])
+
+
+def join_spans(
+    text: str,
+    spans: Iterable[LanguageSpan]
+) -> Tuple[str, Callable[[int, int], Optional[int]]]:
+    """
+    Concatenate spans of one language for a single pass over them
+
+    Returns the joined text and a function mapping (position, length) in it
+    back to a position in text - None if the range crosses a span boundary.
+    """
+    pieces: List[str] = []
+    starts: List[Tuple[int, int, int]] = []  # (joined start, original start, length)
+    offset = 0
+    for span in spans:
+        piece = text[span.start:span.end]
+        starts.append((offset, span.start, len(piece)))
+        pieces.append(piece)
+        offset += len(piece) + 1
+    joined = "\n".join(pieces)
+
+    def to_original(position: int, length: int) -> Optional[int]:
+        for joined_start, original_start, size in starts:
+            if joined_start <= position and position + length <= joined_start + size:
+                return original_start + position - joined_start
+        return None
+
+    return joined, to_original
+
+
+class DetectionStats:
+    """How much text went down each path (work the routing saved)"""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, spans: Tuple[LanguageSpan, ...]):
+        languages = {span.language for span in spans}
+        key = "mixed" if len(languages) > 1 else next(iter(languages), VIETNAMESE)
+        with self._lock:
+            self._counts[key] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {key: self._counts.get(key, 0) for key in (VIETNAMESE, ENGLISH, "mixed")}
+
+
+# Global detection counters
+detections = DetectionStats()
@@ -0,0 +1,196 @@
+"""
+LLM Client Layer
+One pooled, keep-alive HTTP transport and one Groq client shared by every
+feature, plus the single entry point for chat completions: circuit breaker
+first (fail fast), then the request deadline, then the global rate limiter,
+then the call itself with an adaptive timeout
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import httpx
+from groq import Groq
+
+from config import settings
+from circuit_breaker import groq_breaker
+from deadline import Deadline, DeadlineExceeded
+from rate_limit import llm_limiter
+from timing import record, stage
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Events after which a request is on a connection (new or reused)
+_CONNECTION_READY_EVENTS = (
+    "connection.connect_tcp.started",
+    "http11.send_request_headers.started",
+    "http2.send_request_headers.started",
+)
+# Waits above this are counted as pool waits
+POOL_WAIT_THRESHOLD = 0.001
+
+
+class TransportStats:
+    """Connection-level counters fed by httpcore trace events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.pool_waits = 0
+        self.pool_wait_total = 0.0
+        self.pool_wait_max = 0.0
+        self.started_at = time.monotonic()
+
+    def record_wait(self, wait: float):
+        with self._lock:
+            self.requests += 1
+            if wait > POOL_WAIT_THRESHOLD:
+                self.pool_waits += 1
+                self.pool_wait_total += wait
+                self.pool_wait_max = max(self.pool_wait_max, wait)
+
+    def record_event(self, name: str):
+        with self._lock:
+            if name == "connection.connect_tcp.complete":
+                self.new_connections += 1
+            elif name == "connection.start_tls.complete":
+                self.tls_handshakes += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            minutes = max((time.monotonic() - self.started_at) / 60, 1 / 60)
+            return {
+                "http2": HTTP2_AVAILABLE and settings.LLM_HTTP2,
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "new_connections_per_minute": round(self.new_connections / minutes, 2),
+                "connection_reuse_ratio": round(
+                    1 - self.new_connections / self.requests, 3
+                ) if self.requests else 0.0,
+                "tls_handshakes": self.tls_handshakes,
+                "pool_waits": self.pool_waits,
+                "pool_wait_avg_ms": round(
+                    self.pool_wait_total / self.pool_waits * 1000, 2
+                ) if self.pool_waits else 0.0,
+                "pool_wait_max_ms": round(self.pool_wait_max * 1000, 2),
+            }
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """HTTPTransport that reports pool waits and new connections"""
+
+    def __init__(self, stats: TransportStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.monotonic()
+        ready = []
+        stats = self.stats
+
+        def trace(name: str, info: Dict[str, Any]):
+            if not ready and name in _CONNECTION_READY_EVENTS:
+                ready.append(time.monotonic())
+            stats.record_event(name)
+
+        request.extensions["trace"] = trace
+        response = super().handle_request(request)
+        stats.record_wait((ready[0] if ready else time.monotonic()) - start)
+        return response
+
+
+transport_stats = TransportStats()
+
+
+def _build_http_client() -> httpx.Client:
+    """Keep-alive pool sized for LLM_MAX_CONCURRENCY concurrent calls"""
+    limits = httpx.Limits(
+        max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY,
+    )
+    http2 = HTTP2_AVAILABLE and settings.LLM_HTTP2
+    transport = InstrumentedTransport(transport_stats, limits=limits, http2=http2)
+    return httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(settings.LLM_TIMEOUT_MAX, connect=settings.LLM_CONNECT_TIMEOUT),
+    )
+
+
+def _build_groq_client() -> Optional[Groq]:
+    """Shared Groq client, or None when no API key is configured"""
+    if not settings.GROQ_API_KEY or settings.GROQ_API_KEY == "your_groq_api_key_here":
+        return None
+    try:
+        # Retries are left to the circuit breaker
+        return Groq(api_key=settings.GROQ_API_KEY, max_retries=0, http_client=_build_http_client())
+    except Exception as e:
+        print(f"Warning: Failed to initialize Groq client: {e}")
+        return None
+
+
+# Shared client used by every feature
+groq_client = _build_groq_client()
+
+
+def warm_up(connections: Optional[int] = None):
+    """
+    Open pooled connections before traffic arrives, so TLS handshakes are
+    paid at startup instead of in the first requests' latency.
+    Uses the model list endpoint, which does not consume completion quota.
+    """
+    if groq_client is None:
+        return
+    connections = connections or settings.LLM_POOL_WARM_CONNECTIONS
+    # HTTP/2 multiplexes requests over one connection
+    if HTTP2_AVAILABLE and settings.LLM_HTTP2:
+        connections = 1
+
+    def probe(_):
+        try:
+            groq_client.models.list(timeout=settings.LLM_CONNECT_TIMEOUT * 2)
+        except Exception as e:
+            logger.warning(f"LLM connection warm-up failed: {e}")
+
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        list(pool.map(probe, range(connections)))
+    logger.info(f"LLM connection pool warmed: {transport_stats.snapshot()}")
+
+
+def chat_completion(client: Any, deadline: Optional[Deadline] = None, **kwargs) -> Any:
+    """
+    Run client.chat.completions.create under the breaker and the limiter
+
+    The call is never allowed to outlive the request deadline: it is skipped
+    when the remaining budget is below the typical LLM latency, and its
+    timeout is capped at the remaining budget otherwise.
+
+    Raises:
+        CircuitOpenError: Groq is considered down - use the local fallback
+        DeadlineExceeded: not enough time left for an LLM call
+        LLMRateLimitExceeded: no LLM slot became free in time
+    """
+    groq_breaker.raise_if_open()
+    if deadline is not None and not deadline.allows(groq_breaker.expected_latency()):
+        raise DeadlineExceeded("Not enough time left for an LLM call")
+
+    queue_timeout = None
+    if deadline is not None:
+        queue_timeout = min(llm_limiter.queue_timeout, deadline.remaining())
+    waiting = time.perf_counter()
+    with llm_limiter.slot(timeout=queue_timeout):
+        record("llm_queue", time.perf_counter() - waiting)
+        limit = deadline.remaining() if deadline is not None else None
+        with groq_breaker.guard(limit=limit) as timeout, stage("llm"):
+            return client.chat.completions.create(timeout=timeout, **kwargs)
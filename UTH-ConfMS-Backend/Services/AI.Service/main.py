@@ -4,11 +4,15 @@ Main FastAPI application for AI Support Module
 Implements human-in-the-loop AI assistance for academic conference management
 """
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from contextlib import asynccontextmanager
+import asyncio
+import hmac
 import logging
+from typing import List
 
 # Import models
 from models import (
@@ -17,17 +21,41 @@ from models import (
     PolishRequest, PolishResponse,
     KeywordSuggestionRequest, KeywordSuggestionResponse,
     # Reviewer models
-    ReviewerSummaryRequest, ReviewerSummaryResponse,
+    ReviewerSummaryRequest, ReviewerSummaryResponse, BatchSummaryRequest,
     SimilarityRequest, SimilarityResponse,
+    PaperIndexRequest, PaperIndexResponse,
+    BiddingListRequest, BiddingListResponse,
+    ReviewerProfileRequest, ReviewedPaperRequest, ReviewerProfileResponse,
+    # Chair models
+    EmailTemplateRequest, EmailTemplateResponse, BulkEmailRequest,
+    NearDuplicateRequest, NearDuplicateResponse,
     # General models
-    HealthCheckResponse, ErrorResponse
+    ResourceStatusResponse, ProfileRequest, ProfileInfo, HealthCheckResponse, ErrorResponse
 )
 
 # Import services
 from author_service import author_service
 from reviewer_service import reviewer_service
+from chair_service import chair_service
 from config import settings, get_feature_status
 from audit_logging import audit_logger
+from fast_json import fast_response
+from manuscript import spool_upload, read_spool, ManuscriptTooLarge
+from circuit_breaker import groq_breaker, CircuitBreaker
+from rate_limit import llm_limiter
+from llm import transport_stats, warm_up
+from prompts import prompt_usage
+from summary_cache import summary_cache
+from admission import AdmissionMiddleware, admission_controller
+from deadline import Deadline, request_deadline
+from resources import language_resources, ResourceLoadError
+from langid import detections
+from contextual_gate import contextual_gate
+from diacritics import diacritic_restorer
+from profiler import ProfilingMiddleware, ProfilerBusy, profiler
+from timing import TimingMiddleware
+from conferences import ConferenceMiddleware, conference_config, conference_resources
+from collocations import collocation_stats
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -40,8 +68,15 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting {settings.SERVICE_NAME} v{settings.SERVICE_VERSION}")
     logger.info("AI features initialized")
+    # Open LLM connections in the background; startup does not wait on Groq
+    warm_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    admission_controller.monitor.start()
     yield
+    admission_controller.monitor.stop()
+    warm_task.cancel()
     # Shutdown
+    saved = await asyncio.to_thread(collocation_stats.flush)
+    logger.info(f"Saved collocation statistics of {saved} conferences")
     logger.info("Shutting down AI Service")
 
 
@@ -53,6 +88,18 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Per-conference settings overlay (X-Conference-Id) for everything the endpoint reads
+app.add_middleware(ConferenceMiddleware, config=conference_config)
+
+# Admission control - added before CORS so 503 responses still carry CORS headers
+app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+
+# On-demand profiling of single requests (outside admission, so queueing shows up too)
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+# Per-stage timings - outside admission, so its queue wait is a stage of the request
+app.add_middleware(TimingMiddleware)
+
 # CORS middleware for cross-origin requests
 app.add_middleware(
     CORSMiddleware,
@@ -68,14 +115,42 @@ app.add_middleware(
 @app.get("/", response_model=HealthCheckResponse)
 async def health_check():
     """Health check endpoint"""
+    # An open Groq circuit means degraded (local fallbacks), not unhealthy
+    groq_state = groq_breaker.state
     return HealthCheckResponse(
-        status="healthy",
+        status="healthy" if groq_state == CircuitBreaker.CLOSED else "degraded",
         service=settings.SERVICE_NAME,
         version=settings.SERVICE_VERSION,
-        features_enabled=get_feature_status()
+        features_enabled=get_feature_status(),
+        dependencies={"groq": {"circuit": groq_state}}
     )
 
 
+@app.get("/api/ai/metrics")
+async def get_metrics():
+    """Runtime metrics: LLM circuit breaker, rate limiter, connection pool, caches and admission control"""
+    return {
+        "llm": {
+            "circuit_breaker": groq_breaker.stats(),
+            "timeout_seconds": round(groq_breaker.timeout(), 2),
+            "rate_limiter": llm_limiter.stats(),
+            "transport": transport_stats.snapshot(),
+            "contextual_gate": contextual_gate.stats(),
+            "prompts": prompt_usage.stats(),
+        },
+        "summary_cache": summary_cache.stats(),
+        "admission": admission_controller.stats(),
+        "language_routing": detections.stats(),
+        "language_resources": language_resources.stats(),
+        "diacritic_model": diacritic_restorer.stats(),
+        "profiler": profiler.stats(),
+        "conferences": {
+            "settings": conference_config.stats(),
+            "resources": conference_resources.stats(),
+        },
+    }
+
+
 @app.get("/api/ai/features")
 async def get_features():
     """Get status of all AI features (which are enabled/disabled)"""
@@ -85,7 +160,7 @@ async def get_features():
 # ============= Author AI Endpoints =============
 
 @app.post("/api/ai/author/spellcheck", response_model=SpellCheckResponse)
-async def spell_and_grammar_check(request: SpellCheckRequest):
+async def spell_and_grammar_check(request: SpellCheckRequest, deadline: Deadline = Depends(request_deadline)):
     """
     Spell and grammar checking for paper title, abstract, or keywords
     Returns suggestions - user must explicitly approve
@@ -93,8 +168,9 @@ async def spell_and_grammar_check(request: SpellCheckRequest):
     Preview-before-apply: Response always has applied=False
     """
     try:
-        response = author_service.spell_and_grammar_check(request)
-        return response
+        # May wait on Groq - keep the event loop free
+        result = await run_in_threadpool(author_service.spell_and_grammar_check, request, deadline)
+        return fast_response(result, SpellCheckResponse)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -108,8 +184,41 @@ async def spell_and_grammar_check(request: SpellCheckRequest):
         )
 
 
+@app.post("/api/ai/author/spellcheck/manuscript")
+async def spell_check_manuscript(
+    request: Request,
+    user_id: str,
+    field_type: str = "manuscript",
+    deadline: Deadline = Depends(request_deadline)
+):
+    """
+    Spell checking for full manuscripts (beyond the 10,000 character limit)
+    Request body is the raw UTF-8 text; response streams NDJSON corrections
+    with absolute offsets, chunk by chunk
+    
+    Preview-before-apply: corrections are suggestions only
+    """
+    if not settings.ENABLE_AUTHOR_SPELLCHECK:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Spell check feature is disabled"
+        )
+    try:
+        # UTF-8 uses at most 4 bytes per character
+        spool = await spool_upload(request.stream(), settings.MANUSCRIPT_MAX_LENGTH * 4)
+    except ManuscriptTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    return StreamingResponse(
+        author_service.check_manuscript(read_spool(spool), user_id, field_type, deadline),
+        media_type="application/x-ndjson"
+    )
+
+
 @app.post("/api/ai/author/polish", response_model=PolishResponse)
-async def polish_abstract(request: PolishRequest):
+async def polish_abstract(request: PolishRequest, deadline: Deadline = Depends(request_deadline)):
     """
     Polish abstract for clearer academic English
     Shows side-by-side comparison - user must choose to accept
@@ -117,7 +226,7 @@ async def polish_abstract(request: PolishRequest):
     Preview-before-apply: Response includes both original and polished versions
     """
     try:
-        response = author_service.polish_abstract(request)
+        response = await run_in_threadpool(author_service.polish_abstract, request, deadline)
         return response
     except ValueError as e:
         raise HTTPException(
@@ -141,8 +250,8 @@ async def suggest_keywords(request: KeywordSuggestionRequest):
     Preview-before-apply: User selects from suggested keywords
     """
     try:
-        response = author_service.suggest_keywords(request)
-        return response
+        result = author_service.suggest_keywords(request)
+        return fast_response(result, KeywordSuggestionResponse)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -182,6 +291,32 @@ async def generate_paper_summary(request: ReviewerSummaryRequest):
         )
 
 
+@app.post("/api/ai/reviewer/summaries/batch")
+async def generate_paper_summaries(request: BatchSummaryRequest):
+    """
+    Summaries for a reviewer's whole assignment in one request
+    Streams NDJSON, one line per paper: cached summaries at once, missing
+    ones as they are computed. Papers sent without an abstract use their
+    stored summary (an "error" line if there is none)
+    
+    CRITICAL: Never exposes author identity (double-blind preserved)
+    """
+    try:
+        lines = reviewer_service.summarize_assignment(request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in batch summary generation: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred during summary generation"
+        )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
 @app.post("/api/ai/reviewer/similarity", response_model=SimilarityResponse)
 async def calculate_similarity(request: SimilarityRequest):
     """
@@ -193,6 +328,11 @@ async def calculate_similarity(request: SimilarityRequest):
     try:
         response = reviewer_service.calculate_similarity(request)
         return response
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -206,6 +346,258 @@ async def calculate_similarity(request: SimilarityRequest):
         )
 
 
+@app.post("/api/ai/reviewer/papers/index", response_model=PaperIndexResponse)
+async def index_paper(request: PaperIndexRequest):
+    """
+    Add or update a submitted paper in the conference bidding index
+    Called on submission and on every abstract/keyword update
+    """
+    try:
+        return reviewer_service.index_paper(request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in paper indexing: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred during paper indexing"
+        )
+
+
+@app.post("/api/ai/reviewer/bidding-list", response_model=BiddingListResponse)
+async def get_bidding_list(request: BiddingListRequest):
+    """
+    Ranked, paginated list of conference papers for a reviewer's bidding page
+    Returns paper IDs only - double-blind preserved
+    """
+    try:
+        result = reviewer_service.get_bidding_list(request)
+        return fast_response(result, BiddingListResponse)
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in bidding list ranking: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred during bidding list ranking"
+        )
+
+
+@app.post("/api/ai/reviewer/profiles", response_model=ReviewerProfileResponse)
+async def set_reviewer_profile(request: ReviewerProfileRequest):
+    """
+    Store a reviewer's stated expertise once
+    Similarity and bidding calls may then send only the reviewer_id
+    """
+    try:
+        return reviewer_service.set_profile(request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in reviewer profile update: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred during reviewer profile update"
+        )
+
+
+@app.post("/api/ai/reviewer/profiles/reviewed-papers", response_model=ReviewerProfileResponse)
+async def add_reviewed_paper(request: ReviewedPaperRequest):
+    """
+    Learn topics from a completed review (lower weight than stated expertise)
+    """
+    try:
+        return reviewer_service.add_reviewed_paper(request)
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in reviewer profile update: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred during reviewer profile update"
+        )
+
+
+# ============= Chair AI Endpoints =============
+
+@app.post("/api/ai/chair/email-template", response_model=EmailTemplateResponse)
+async def generate_email_template(
+    request: EmailTemplateRequest,
+    deadline: Deadline = Depends(request_deadline)
+):
+    """
+    Generate an email template for a conference (one AI call per email type and conference)
+    Chair must review before sending
+    
+    Preview-before-apply: Response always has applied=False
+    """
+    try:
+        return await run_in_threadpool(chair_service.generate_email_template, request, deadline)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in email template generation: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred during email template generation"
+        )
+
+
+@app.post("/api/ai/chair/emails/bulk")
+async def render_bulk_emails(request: BulkEmailRequest, deadline: Deadline = Depends(request_deadline)):
+    """
+    Render personalized emails for many recipients from the cached template
+    Streams NDJSON, one email per line - no AI call per recipient
+    
+    Preview-before-apply: every rendered email has applied=False
+    """
+    try:
+        # Template lookup may call the LLM: off the event loop, before streaming
+        lines = await run_in_threadpool(chair_service.render_bulk, request, deadline)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in bulk email rendering: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred during bulk email rendering"
+        )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@app.post("/api/ai/chair/near-duplicates", response_model=NearDuplicateResponse)
+async def check_near_duplicates(request: NearDuplicateRequest):
+    """
+    Check a submission for near-duplicates among earlier submissions of the conference
+    Returns paper IDs with estimated Jaccard similarity - never author data
+    
+    Candidates only: the chair decides whether submissions are duplicates
+    """
+    try:
+        return chair_service.check_near_duplicates(request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in near-duplicate check: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred during near-duplicate detection"
+        )
+
+
+# ============= Admin Endpoints =============
+
+def require_admin(request: Request):
+    """FastAPI dependency: X-Admin-Token must match ADMIN_API_TOKEN (disabled when unset)"""
+    token = request.headers.get("x-admin-token", "")
+    if not settings.ADMIN_API_TOKEN or not hmac.compare_digest(token, settings.ADMIN_API_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required"
+        )
+
+
+@app.post(
+    "/api/ai/admin/resources/reload",
+    response_model=ResourceStatusResponse,
+    dependencies=[Depends(require_admin)]
+)
+async def reload_language_resources():
+    """
+    Reload dictionary, lexicon and stopwords from the resource file
+    Compiled in a worker thread, then swapped in - requests keep being served
+    """
+    previous = language_resources.current.version
+    try:
+        resources = await run_in_threadpool(language_resources.reload)
+    except ResourceLoadError as e:
+        logger.error(f"Language resource reload failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{e} - version {previous} stays active"
+        )
+    return ResourceStatusResponse(previous_version=previous, **resources.stats())
+
+
+@app.post("/api/ai/admin/conferences/reload", dependencies=[Depends(require_admin)])
+async def reload_conference_settings():
+    """Re-read the per-conference settings overlays (invalid entries are skipped and logged)"""
+    await run_in_threadpool(conference_config.reload)
+    return conference_config.stats()
+
+
+@app.post(
+    "/api/ai/admin/profiles",
+    response_model=ProfileInfo,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_admin)]
+)
+async def start_profile(request: ProfileRequest):
+    """
+    Sample all threads of this worker for a time window
+    Returns at once; the profile is readable once the window has ended.
+    A single request can be profiled instead with X-Profile: 1 (plus X-Admin-Token)
+    """
+    try:
+        session = profiler.start(request.feature.value if request.feature else "all", request.seconds)
+    except ProfilerBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    return ProfileInfo(**session.info())
+
+
+@app.get("/api/ai/admin/profiles", response_model=List[ProfileInfo], dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """Profiles on disk, newest first"""
+    return [ProfileInfo(**info) for info in profiler.profiles()]
+
+
+@app.get("/api/ai/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str):
+    """Collapsed stacks (flamegraph.pl / speedscope input) of a finished profile"""
+    try:
+        folded = await run_in_threadpool(profiler.read, profile_id)
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    return PlainTextResponse(folded)
+
+
 # ============= Error Handlers =============
 
 @app.exception_handler(HTTPException)
@@ -0,0 +1,115 @@
+"""
+Manuscript Chunking
+Splits an uploaded byte stream into bounded, overlapping text chunks
+Memory stays at roughly chunk_size + overlap characters regardless of document size
+"""
+
+import asyncio
+import codecs
+import tempfile
+from typing import AsyncIterator, NamedTuple
+
+# Uploads above this size are spooled to disk instead of memory
+SPOOL_MEMORY_LIMIT = 1024 * 1024
+READ_SIZE = 64 * 1024
+
+
+class ManuscriptTooLarge(ValueError):
+    """Manuscript exceeds the configured maximum length"""
+
+
+class TextChunk(NamedTuple):
+    """
+    One chunk of the manuscript
+
+    text covers [offset, offset + len(text)); the chunk "owns" [offset, owned_end).
+    Characters past owned_end are overlap, present only so phrases crossing the
+    boundary are seen whole - the next chunk owns them.
+    """
+    index: int
+    offset: int
+    owned_end: int
+    text: str
+
+
+async def spool_upload(stream: AsyncIterator[bytes], max_bytes: int) -> tempfile.SpooledTemporaryFile:
+    """
+    Receive the whole request body before responding
+
+    Starlette's StreamingResponse listens for client disconnect on the same
+    receive channel, so the body cannot be read while the response streams.
+    Spooling keeps memory bounded: large uploads go to a temporary file.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_LIMIT)
+    size = 0
+    async for data in stream:
+        size += len(data)
+        if size > max_bytes:
+            spool.close()
+            raise ManuscriptTooLarge(f"Manuscript exceeds {max_bytes} bytes")
+        spool.write(data)
+    spool.seek(0)
+    return spool
+
+
+async def read_spool(spool: tempfile.SpooledTemporaryFile) -> AsyncIterator[bytes]:
+    """
+    Iterate a spooled upload in fixed-size blocks, closing it at the end
+    Reads run in a worker thread: past SPOOL_MEMORY_LIMIT they hit the disk
+    """
+    try:
+        while True:
+            data = await asyncio.to_thread(spool.read, READ_SIZE)
+            if not data:
+                break
+            yield data
+    finally:
+        spool.close()
+
+
+def _cut_point(buffer: str, chunk_size: int) -> int:
+    """Cut at the last whitespace before chunk_size so no word is split"""
+    cut = max(buffer.rfind(" ", 0, chunk_size), buffer.rfind("\n", 0, chunk_size))
+    if cut <= chunk_size // 2:
+        return chunk_size
+    return cut + 1
+
+
+async def iter_chunks(
+    stream: AsyncIterator[bytes],
+    chunk_size: int,
+    overlap: int,
+    max_length: int,
+    encoding: str = "utf-8"
+) -> AsyncIterator[TextChunk]:
+    """
+    Yield overlapping chunks with absolute character offsets as bytes arrive
+
+    Raises:
+        ManuscriptTooLarge: once more than max_length characters were received
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    buffer = ""
+    offset = 0
+    index = 0
+    received = 0
+
+    async for data in stream:
+        text = decoder.decode(data)
+        if not text:
+            continue
+        received += len(text)
+        if received > max_length:
+            raise ManuscriptTooLarge(f"Manuscript exceeds {max_length} characters")
+        buffer += text
+
+        while len(buffer) >= chunk_size + overlap:
+            cut = _cut_point(buffer, chunk_size)
+            yield TextChunk(index, offset, offset + cut, buffer[:cut + overlap])
+            buffer = buffer[cut:]
+            offset += cut
+            index += 1
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield TextChunk(index, offset, offset + len(buffer), buffer)
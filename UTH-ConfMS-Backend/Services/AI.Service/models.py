@@ -4,7 +4,7 @@ All request and response models following the human-in-the-loop principle
 """
 
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -18,6 +18,7 @@ class AIFeature(str, Enum):
     REVIEWER_KEY_POINTS = "reviewer_key_points"
     REVIEWER_SIMILARITY = "reviewer_similarity"
     CHAIR_EMAIL_TEMPLATE = "chair_email_template"
+    CHAIR_DUPLICATE_CHECK = "chair_duplicate_check"
 
 
 class UserRole(str, Enum):
@@ -35,6 +36,10 @@ class SpellCheckRequest(BaseModel):
     text: str = Field(..., max_length=10000, description="Text to check (title, abstract, or keywords)")
     user_id: str = Field(..., description="ID of the user requesting the service")
     field_type: str = Field(..., description="Type of field: title, abstract, or keywords")
+    output_format: Literal["text", "patch"] = Field(
+        "text",
+        description="text: return suggested_text; patch: return patches against original_text instead"
+    )
 
 
 class TextCorrection(BaseModel):
@@ -46,12 +51,21 @@ class TextCorrection(BaseModel):
     explanation: str
 
 
+class TextPatch(BaseModel):
+    """Replace original_text[start:end] with replacement"""
+    start: int
+    end: int
+    replacement: str
+
+
 class SpellCheckResponse(BaseModel):
     """Response with corrections - user must approve"""
     original_text: str
-    suggested_text: str
+    suggested_text: Optional[str]  # None when output_format="patch"
     corrections: List[TextCorrection]
     applied: bool = False  # Always False - user must explicitly apply
+    patches: Optional[List[TextPatch]] = None  # Non-overlapping, sorted by start
+    degraded_stages: List[str] = []  # Stages skipped to meet the request deadline
 
 
 class PolishRequest(BaseModel):
@@ -60,12 +74,25 @@ class PolishRequest(BaseModel):
     user_id: str = Field(..., description="ID of the user requesting the service")
 
 
+class TextChange(BaseModel):
+    """original_abstract[original_start:original_end] became polished_abstract[polished_start:polished_end]"""
+    operation: str  # insert, delete, replace
+    original_start: int
+    original_end: int
+    polished_start: int
+    polished_end: int
+    original: str
+    polished: str
+
+
 class PolishResponse(BaseModel):
     """Response with polished abstract - side-by-side comparison"""
     original_abstract: str
     polished_abstract: str
     improvements: List[str]  # List of improvements made
+    changes: List[TextChange] = []  # Word-level diff, in text order
     applied: bool = False  # User must choose to accept
+    degraded_stages: List[str] = []  # Stages skipped to meet the request deadline
 
 
 class KeywordSuggestionRequest(BaseModel):
@@ -73,6 +100,7 @@ class KeywordSuggestionRequest(BaseModel):
     abstract: str = Field(..., max_length=5000)
     user_id: str
     existing_keywords: Optional[List[str]] = []
+    conference_id: Optional[str] = None  # Enables keyphrases from conference statistics
 
 
 class KeywordSuggestionResponse(BaseModel):
@@ -93,6 +121,19 @@ class ReviewerSummaryRequest(BaseModel):
     # NEVER include: author_name, author_email, author_institution
 
 
+class BatchSummaryPaper(BaseModel):
+    """One paper of a batch - abstract omitted = use its stored summary"""
+    paper_id: str
+    paper_abstract: Optional[str] = Field(default=None, max_length=5000)
+    paper_keywords: Optional[List[str]] = []
+
+
+class BatchSummaryRequest(BaseModel):
+    """Summaries for a reviewer's whole assignment - NO author info allowed"""
+    reviewer_id: str
+    papers: List[BatchSummaryPaper] = Field(..., min_length=1, max_length=50)
+
+
 class ReviewerSummaryResponse(BaseModel):
     """Neutral summary for reviewer understanding"""
     summary: str = Field(..., description="150-250 word neutral summary")
@@ -104,11 +145,17 @@ class ReviewerSummaryResponse(BaseModel):
 
 
 class SimilarityRequest(BaseModel):
-    """Request for similarity between reviewer expertise and paper"""
+    """
+    Request for similarity between reviewer expertise and paper
+    Omitted expertise comes from the stored reviewer profile; omitted paper
+    fields come from the bidding index (conference_id + paper_id)
+    """
     reviewer_id: str
-    reviewer_expertise: List[str]  # Reviewer's keywords/topics
-    paper_keywords: List[str]
-    paper_abstract: str
+    reviewer_expertise: Optional[List[str]] = None  # Reviewer's keywords/topics
+    paper_keywords: Optional[List[str]] = None
+    paper_abstract: Optional[str] = None
+    conference_id: Optional[str] = None
+    paper_id: Optional[str] = None
 
 
 class SimilarityResponse(BaseModel):
@@ -119,6 +166,68 @@ class SimilarityResponse(BaseModel):
     recommendation: str  # "High match", "Moderate match", "Low match"
 
 
+class ReviewerProfileRequest(BaseModel):
+    """Stated expertise of a reviewer - replaces the previous statement"""
+    reviewer_id: str
+    expertise: List[str] = Field(..., max_length=200)
+
+
+class ReviewedPaperRequest(BaseModel):
+    """A paper the reviewer reviewed; its keywords are learned into the profile"""
+    reviewer_id: str
+    paper_keywords: Optional[List[str]] = None  # Taken from the bidding index if omitted
+    conference_id: Optional[str] = None
+    paper_id: Optional[str] = None
+
+
+class ReviewerProfileResponse(BaseModel):
+    """Stored profile: topic -> weight (stated 1.0, learned topics lower)"""
+    reviewer_id: str
+    topics: Dict[str, float]
+    reviewed_papers: int
+
+
+class PaperIndexRequest(BaseModel):
+    """Add or update a submitted paper in the bidding index - NO author info allowed"""
+    conference_id: str
+    paper_id: str
+    paper_keywords: List[str] = []
+    paper_abstract: str = Field(..., max_length=5000)
+
+
+class PaperIndexResponse(BaseModel):
+    """Result of indexing a paper"""
+    paper_id: str
+    indexed_terms: int
+    total_papers: int
+
+
+class BiddingListRequest(BaseModel):
+    """Request for a reviewer's ranked bidding list"""
+    conference_id: str
+    reviewer_id: str
+    reviewer_expertise: Optional[List[str]] = None  # Defaults to the stored reviewer profile
+    page: int = Field(1, ge=1)
+    page_size: int = Field(20, ge=1, le=100)
+
+
+class RankedPaper(BaseModel):
+    """One paper in the ranked bidding list - paper ID only (double-blind)"""
+    paper_id: str
+    similarity_score: float = Field(..., ge=0.0, le=1.0)
+    matching_topics: List[str]
+    recommendation: str
+
+
+class BiddingListResponse(BaseModel):
+    """Ranked page of papers for a reviewer to bid on"""
+    papers: List[RankedPaper]
+    page: int
+    page_size: int
+    total_matches: int
+    total_papers: int
+
+
 # ============= Chair Models =============
 
 class EmailType(str, Enum):
@@ -134,6 +243,7 @@ class EmailTemplateRequest(BaseModel):
     """Request for email template generation"""
     chair_id: str
     email_type: EmailType
+    conference_id: Optional[str] = None  # Template cache key; falls back to context["conference_name"]
     context: Dict[str, Any] = Field(
         ...,
         description="Context for email: conference_name, deadline, recipient_role, etc."
@@ -148,6 +258,40 @@ class EmailTemplateResponse(BaseModel):
     placeholders: List[str]  # List of {{placeholder}} fields to fill
     applied: bool = False  # Chair must review and approve
     warnings: List[str] = []  # Any warnings or things to check
+    degraded_stages: List[str] = []  # Stages skipped to meet the request deadline
+
+
+class BulkEmailRequest(EmailTemplateRequest):
+    """Render one email per recipient from the cached template - no per-recipient AI call"""
+    recipients: List[Dict[str, Any]] = Field(
+        ...,
+        max_length=20000,
+        description="Per-recipient placeholder values: recipient_id, recipient_name, paper_id, paper_title, etc."
+    )
+
+
+class NearDuplicateRequest(BaseModel):
+    """Check a submission against earlier ones of the conference - NO author info allowed"""
+    chair_id: str
+    conference_id: str
+    paper_id: str
+    title: str = Field(..., max_length=500)
+    abstract: str = Field(..., max_length=5000)
+    index: bool = True  # Also add this submission so later ones are checked against it
+    threshold: Optional[float] = Field(None, ge=0.0, le=1.0)  # Defaults to NEAR_DUPLICATE_THRESHOLD
+
+
+class NearDuplicateMatch(BaseModel):
+    """Earlier submission with similar title + abstract - paper ID only"""
+    paper_id: str
+    estimated_jaccard: float = Field(..., ge=0.0, le=1.0)
+
+
+class NearDuplicateResponse(BaseModel):
+    """Candidate duplicates for the chair to inspect - never a verdict"""
+    paper_id: str
+    matches: List[NearDuplicateMatch]
+    indexed_papers: int
 
 
 # ============= Audit Logging Models =============
@@ -167,12 +311,42 @@ class AuditLogEntry(BaseModel):
 
 # ============= General Models =============
 
+class ResourceStatusResponse(BaseModel):
+    """Active language resource version after a reload"""
+    version: str
+    previous_version: Optional[str] = None
+    source: str
+    loaded_at: str
+    compile_ms: float
+    dictionary_words: int
+    lexicon_words: int
+    stopwords: int
+    english_stopwords: int
+
+
+class ProfileRequest(BaseModel):
+    """Sample every thread of this worker for a time window"""
+    seconds: float = Field(default=10.0, gt=0, description="Capped at PROFILE_MAX_SECONDS")
+    feature: Optional[AIFeature] = None  # Tag for the profile (e.g. the feature under investigation)
+
+
+class ProfileInfo(BaseModel):
+    """A profiling session or a profile on disk"""
+    profile_id: str
+    feature: str
+    started_at: str
+    samples: Optional[int] = None
+    running: bool = False
+    size_bytes: Optional[int] = None
+
+
 class HealthCheckResponse(BaseModel):
     """Health check response"""
     status: str
     service: str
     version: str
     features_enabled: Dict[str, Any]
+    dependencies: Dict[str, Any] = {}  # External dependency state (e.g. Groq circuit breaker)
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,231 @@
+"""
+Near-Duplicate Detection
+MinHash signatures of title + abstract shingles with a banded LSH index, so a
+new submission is compared only with the few papers sharing a band bucket
+instead of every previous submission (duplicate and salami submissions
+across tracks)
+Only paper IDs and signatures are stored - never text or author information
+"""
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from config import settings
+from conferences import conference_resources
+from tokenizer import syllables
+
+
+MAX_HASH = np.uint32(0xFFFFFFFF)
+ENTRY_OVERHEAD_BYTES = 112  # Per paper: dict slot and array header
+BUCKET_ENTRY_BYTES = 120  # Per paper and band: set slot and bucket key share
+
+
+def shingles(text: str, size: int) -> Set[int]:
+    """
+    Hashed syllable k-shingles; diacritics and case are ignored so an
+    un-accented copy still matches. Stable across processes (persisted).
+    """
+    words = [t.key for t in syllables(text)]
+    if 0 < len(words) < size:
+        size = len(words)  # Very short text: one shingle of everything
+    return {
+        int.from_bytes(
+            hashlib.blake2b(" ".join(words[i:i + size]).encode("utf-8"), digest_size=8).digest(),
+            "little"
+        )
+        for i in range(max(len(words) - size + 1, 0))
+    }
+
+
+class MinHasher:
+    """num_perm universal hash functions over 64-bit shingle hashes"""
+
+    def __init__(self, num_perm: int, seed: int = 7):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, hashed_shingles: Set[int]) -> np.ndarray:
+        if not hashed_shingles:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint32)
+        values = np.fromiter(hashed_shingles, dtype=np.uint64, count=len(hashed_shingles))
+        # Multiply-shift: top 32 bits of (a*x + b) mod 2^64
+        mixed = self._a[:, None] * values[None, :] + self._b[:, None]
+        return (mixed >> np.uint64(32)).astype(np.uint32).min(axis=1)
+
+
+class NearDuplicateIndex:
+    """
+    Banded LSH over MinHash signatures for one conference
+
+    Papers are indexed incrementally; every change is appended to a log file
+    that is replayed on startup (compacted when mostly superseded).
+    """
+
+    def __init__(self, path: Optional[Path], hasher: MinHasher, bands: int):
+        if hasher.num_perm % bands:
+            raise ValueError("NEAR_DUPLICATE_NUM_PERM must be a multiple of NEAR_DUPLICATE_BANDS")
+        self.path = path
+        self.hasher = hasher
+        self.bands = bands
+        self.rows = hasher.num_perm // bands
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, Set[str]]] = [defaultdict(set) for _ in range(bands)]
+        self._lock = threading.Lock()
+        if path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated resident size, for the conference resource LRU"""
+        per_paper = self.hasher.num_perm * 4 + ENTRY_OVERHEAD_BYTES + self.bands * BUCKET_ENTRY_BYTES
+        return len(self._signatures) * per_paper
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+    def _link(self, paper_id: str, signature: np.ndarray):
+        self._signatures[paper_id] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band][key].add(paper_id)
+
+    def _unlink(self, paper_id: str):
+        signature = self._signatures.pop(paper_id, None)
+        if signature is None:
+            return
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(paper_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def signature_of(self, title: str, abstract: str) -> np.ndarray:
+        return self.hasher.signature(shingles(f"{title}\n{abstract}", settings.NEAR_DUPLICATE_SHINGLE_SIZE))
+
+    def query(
+        self,
+        signature: np.ndarray,
+        threshold: float,
+        exclude: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Indexed papers whose estimated Jaccard similarity is >= threshold"""
+        with self._lock:
+            candidates: Set[str] = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates |= self._buckets[band].get(key, set())
+            candidates.discard(exclude)
+            if not candidates:
+                return []
+            ids = list(candidates)
+            others = np.stack([self._signatures[i] for i in ids])
+        # Share of agreeing MinHash values estimates Jaccard similarity
+        estimates = (others == signature).mean(axis=1)
+        matches = [(i, round(float(e), 3)) for i, e in zip(ids, estimates) if e >= threshold]
+        return sorted(matches, key=lambda m: (-m[1], m[0]))
+
+    def add(self, paper_id: str, signature: np.ndarray):
+        """Insert or replace a paper"""
+        with self._lock:
+            self._unlink(paper_id)
+            self._link(paper_id, signature)
+            self._append({"paper_id": paper_id, "signature": base64.b64encode(signature.tobytes()).decode("ascii")})
+
+    def remove(self, paper_id: str) -> bool:
+        """Drop a withdrawn paper"""
+        with self._lock:
+            if paper_id not in self._signatures:
+                return False
+            self._unlink(paper_id)
+            self._append({"paper_id": paper_id, "removed": True})
+            return True
+
+    # ---- persistence (lock held) ----
+
+    def _append(self, record: Dict):
+        if self.path is None:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Torn last line after a crash
+            self._unlink(record["paper_id"])
+            if not record.get("removed"):
+                signature = np.frombuffer(base64.b64decode(record["signature"]), dtype=np.uint32).copy()
+                if len(signature) == self.hasher.num_perm:
+                    self._link(record["paper_id"], signature)
+        if len(lines) > 2 * len(self._signatures) + 100:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the log with live papers only (atomic replace)"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for paper_id, signature in self._signatures.items():
+                f.write(json.dumps({
+                    "paper_id": paper_id,
+                    "signature": base64.b64encode(signature.tobytes()).decode("ascii")
+                }) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+class NearDuplicateRegistry:
+    """
+    One LSH index per conference, persisted under NEAR_DUPLICATE_STORE_DIR
+    Persisted indexes are loaded on first use into the conference resource
+    LRU and simply dropped on eviction (the log has every change); without a
+    store directory they stay resident
+    """
+
+    def __init__(self, directory: Optional[str]):
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.hasher = MinHasher(settings.NEAR_DUPLICATE_NUM_PERM)
+        self._indexes: Dict[str, NearDuplicateIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, conference_id: str) -> NearDuplicateIndex:
+        if self.directory is not None:
+            name = hashlib.sha256(conference_id.encode("utf-8")).hexdigest()[:32]
+            path = self.directory / f"{name}.jsonl"
+            return conference_resources.get(
+                ("near_duplicates", conference_id),
+                load=lambda: NearDuplicateIndex(path, self.hasher, settings.NEAR_DUPLICATE_BANDS),
+                size=lambda index: index.nbytes
+            )
+        index = self._indexes.get(conference_id)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(conference_id)
+                if index is None:
+                    index = NearDuplicateIndex(None, self.hasher, settings.NEAR_DUPLICATE_BANDS)
+                    self._indexes[conference_id] = index
+        return index
+
+
+# Global registry instance
+near_duplicates = NearDuplicateRegistry(settings.NEAR_DUPLICATE_STORE_DIR)
@@ -0,0 +1,206 @@
+"""
+Paper Inverted Index
+Keyword/abstract term index used to rank papers for reviewer bidding
+Only paper IDs and normalized terms are stored - never author information
+"""
+
+import heapq
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from tokenizer import terms
+
+
+# Field weights - same as ReviewerAIService.calculate_similarity, but the
+# scores are not identical: here one expertise topic counts once when all of
+# its terms appear in a paper's keyword (or abstract) terms, and the topics
+# themselves are returned as matching_topics. calculate_similarity counts
+# every substring (topic, paper keyword) pair, weights topics by the reviewer
+# profile and returns the paper's keywords. Term matching is what lets this
+# index touch only candidate papers; the bidding list is a ranking aid, the
+# per-paper similarity call is the detailed score
+KEYWORD_WEIGHT = 0.6
+ABSTRACT_WEIGHT = 0.4
+
+
+def normalize_terms(text: str) -> List[str]:
+    """Segmented, lowercased index terms - same tokenizer as the author service"""
+    return terms(text)
+
+
+class IndexedPaper:
+    """Terms stored for one paper so it can be re-indexed or removed in O(terms)"""
+
+    __slots__ = ("paper_id", "keywords", "keyword_terms", "abstract_terms")
+
+    def __init__(self, paper_id: str, keywords: List[str], abstract: str):
+        self.paper_id = paper_id
+        self.keywords = [k.strip().lower() for k in keywords if k.strip()]
+        self.keyword_terms: Set[str] = set()
+        for kw in self.keywords:
+            self.keyword_terms.update(normalize_terms(kw))
+        self.abstract_terms: Set[str] = set(normalize_terms(abstract))
+
+
+class PaperIndex:
+    """
+    Inverted index: term -> paper IDs, kept separately for keywords and abstracts
+
+    A reviewer's ranked list only touches papers sharing at least one term with
+    their expertise; adding or replacing a paper costs O(terms in that paper).
+    """
+
+    def __init__(self):
+        self._papers: Dict[str, IndexedPaper] = {}
+        self._keyword_postings: Dict[str, Set[str]] = defaultdict(set)
+        self._abstract_postings: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._papers)
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self._papers
+
+    def get(self, paper_id: str) -> Optional[IndexedPaper]:
+        return self._papers.get(paper_id)
+
+    def add_paper(self, paper_id: str, keywords: List[str], abstract: str) -> IndexedPaper:
+        """Add a paper, replacing any previous version of it"""
+        paper = IndexedPaper(paper_id, keywords, abstract)
+        with self._lock:
+            self._unlink(paper_id)
+            self._papers[paper_id] = paper
+            for term in paper.keyword_terms:
+                self._keyword_postings[term].add(paper_id)
+            for term in paper.abstract_terms:
+                self._abstract_postings[term].add(paper_id)
+        return paper
+
+    def remove_paper(self, paper_id: str) -> bool:
+        """Remove a paper (e.g. withdrawn submission)"""
+        with self._lock:
+            return self._unlink(paper_id)
+
+    def _unlink(self, paper_id: str) -> bool:
+        paper = self._papers.pop(paper_id, None)
+        if paper is None:
+            return False
+        for term in paper.keyword_terms:
+            self._discard(self._keyword_postings, term, paper_id)
+        for term in paper.abstract_terms:
+            self._discard(self._abstract_postings, term, paper_id)
+        return True
+
+    @staticmethod
+    def _discard(postings: Dict[str, Set[str]], term: str, paper_id: str):
+        ids = postings.get(term)
+        if ids is not None:
+            ids.discard(paper_id)
+            if not ids:
+                del postings[term]
+
+    def _match(self, postings: Dict[str, Set[str]], terms: List[str]) -> Set[str]:
+        """Papers containing every term of an expertise phrase"""
+        if not terms:
+            return set()
+        lists = [postings.get(t) for t in terms]
+        if any(ids is None for ids in lists):
+            return set()
+        lists.sort(key=len)
+        matched = set(lists[0])
+        for ids in lists[1:]:
+            matched &= ids
+            if not matched:
+                break
+        return matched
+
+    def score_candidates(
+        self,
+        expertise: Iterable[str]
+    ) -> Dict[str, Tuple[float, List[str]]]:
+        """
+        Score every paper sharing terms with the reviewer's expertise
+
+        Returns:
+            paper_id -> (similarity score, matching expertise topics)
+        """
+        expertise_terms = []
+        for topic in expertise:
+            topic = topic.strip().lower()
+            terms = normalize_terms(topic)
+            if terms:
+                expertise_terms.append((topic, terms))
+
+        if not expertise_terms:
+            return {}
+
+        keyword_hits: Dict[str, List[str]] = defaultdict(list)
+        abstract_hits: Dict[str, int] = defaultdict(int)
+
+        with self._lock:
+            for topic, terms in expertise_terms:
+                for paper_id in self._match(self._keyword_postings, terms):
+                    keyword_hits[paper_id].append(topic)
+                for paper_id in self._match(self._abstract_postings, terms):
+                    abstract_hits[paper_id] += 1
+
+            n_expertise = len(expertise_terms)
+            scores = {}
+            for paper_id in keyword_hits.keys() | abstract_hits.keys():
+                paper = self._papers[paper_id]
+                topics = keyword_hits.get(paper_id, [])
+                keyword_score = 0.0
+                if topics and paper.keywords:
+                    keyword_score = len(topics) / max(n_expertise, len(paper.keywords))
+                abstract_score = abstract_hits.get(paper_id, 0) / n_expertise
+                score = min(keyword_score * KEYWORD_WEIGHT + abstract_score * ABSTRACT_WEIGHT, 1.0)
+                if score > 0:
+                    scores[paper_id] = (score, topics)
+
+        return scores
+
+    def rank(
+        self,
+        expertise: Iterable[str],
+        page: int = 1,
+        page_size: int = 20
+    ) -> Tuple[List[Tuple[str, float, List[str]]], int]:
+        """
+        Heap-based top-k ranking with pagination
+
+        Returns:
+            (page of (paper_id, score, matching_topics), total matching papers)
+        """
+        scores = self.score_candidates(expertise)
+        k = page * page_size
+        # Ties broken by paper_id so pages are stable between calls
+        top = heapq.nsmallest(
+            k, scores.items(), key=lambda item: (-item[1][0], item[0])
+        )
+        start = (page - 1) * page_size
+        ranked = [
+            (paper_id, score, topics)
+            for paper_id, (score, topics) in top[start:start + page_size]
+        ]
+        return ranked, len(scores)
+
+
+class PaperIndexRegistry:
+    """One paper index per conference"""
+
+    def __init__(self):
+        self._indexes: Dict[str, PaperIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, conference_id: str) -> PaperIndex:
+        index = self._indexes.get(conference_id)
+        if index is None:
+            with self._lock:
+                index = self._indexes.setdefault(conference_id, PaperIndex())
+        return index
+
+
+# Global registry instance
+paper_indexes = PaperIndexRegistry()
@@ -0,0 +1,265 @@
+"""
+Sampling Profiler
+On-demand statistical profiling of the live service: a background thread
+snapshots every thread's Python stack at a fixed interval and writes the
+counts as collapsed stacks (one "frame;frame;... count" line per stack), the
+input format of flamegraph.pl, speedscope and inferno. Nothing runs - no
+thread, no hook - unless an admin starts a session, one at a time
+"""
+
+import hmac
+import logging
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from models import AIFeature
+
+logger = logging.getLogger(__name__)
+
+SERVICE_DIR = Path(__file__).resolve().parent
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+MAX_STACK_DEPTH = 128
+_FILE_NAME = re.compile(r"^(\d{8}T\d{6})-([a-z_]+)-([0-9a-f]{8})\.folded$")
+
+# Path prefix -> feature tag of a profiled request, first match wins
+ENDPOINT_FEATURES: List[Tuple[str, AIFeature]] = [
+    ("/api/ai/author/spellcheck", AIFeature.AUTHOR_SPELLCHECK),
+    ("/api/ai/author/polish", AIFeature.AUTHOR_POLISH),
+    ("/api/ai/author/keywords", AIFeature.AUTHOR_KEYWORDS),
+    ("/api/ai/reviewer/summary", AIFeature.REVIEWER_SUMMARY),
+    ("/api/ai/reviewer/summaries", AIFeature.REVIEWER_SUMMARY),
+    ("/api/ai/reviewer/", AIFeature.REVIEWER_SIMILARITY),
+    ("/api/ai/chair/near-duplicates", AIFeature.CHAIR_DUPLICATE_CHECK),
+    ("/api/ai/chair/", AIFeature.CHAIR_EMAIL_TEMPLATE),
+]
+
+
+class ProfilerBusy(Exception):
+    """Another profiling session is running"""
+
+
+def feature_for(path: str) -> Optional[AIFeature]:
+    for prefix, feature in ENDPOINT_FEATURES:
+        if path.startswith(prefix):
+            return feature
+    return None
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class ProfileSession:
+    """One sampling run: a window of wall-clock time over all threads"""
+
+    def __init__(self, tag: str, max_seconds: float, interval: float, directory: Optional[Path]):
+        self.tag = tag
+        self.max_seconds = max_seconds
+        self.interval = interval
+        started = datetime.utcnow()
+        self.started_at = started.isoformat()
+        self.profile_id = f"{started:%Y%m%dT%H%M%S}-{tag}-{uuid.uuid4().hex[:8]}"
+        self.path = directory / f"{self.profile_id}.folded" if directory else None
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.done = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Ends sampling; the profile is written by the sampler thread"""
+        self._stop.set()
+
+    def _sample(self, own_id: int, names: Dict[int, str]):
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            frames = []
+            while frame is not None and len(frames) < MAX_STACK_DEPTH:
+                frames.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            thread = names.get(thread_id, str(thread_id))
+            self.stacks[";".join([self.tag, thread] + frames[::-1])] += 1
+        self.samples += 1
+
+    def _run(self):
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + self.max_seconds
+        try:
+            while not self._stop.is_set() and time.monotonic() < deadline:
+                # Names of worker threads (thread pool, to_thread) rarely change
+                names = {t.ident: t.name for t in threading.enumerate()}
+                self._sample(own_id, names)
+                self._stop.wait(self.interval)
+            self._write()
+        except Exception as e:
+            logger.error(f"Profile {self.profile_id} failed: {str(e)}")
+        finally:
+            self.done.set()
+
+    def _write(self):
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [f"{stack} {count}\n" for stack, count in self.stacks.most_common()]
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        tmp.replace(self.path)
+        logger.info(f"Profile {self.profile_id}: {self.samples} samples -> {self.path.name}")
+
+    def info(self) -> Dict[str, object]:
+        return {
+            "profile_id": self.profile_id,
+            "feature": self.tag,
+            "started_at": self.started_at,
+            "samples": self.samples,
+            "running": not self.done.is_set(),
+        }
+
+
+class Profiler:
+    """Admits one session at a time and keeps the newest profiles on disk"""
+
+    def __init__(self, directory: str, interval: float, max_seconds: float, max_files: int):
+        if directory:
+            self.directory: Optional[Path] = Path(directory) if Path(directory).is_absolute() else SERVICE_DIR / directory
+        else:
+            self.directory = None
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.max_files = max_files
+        self.sessions = 0
+        self._active: Optional[ProfileSession] = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> Optional[ProfileSession]:
+        session = self._active
+        return session if session is not None and not session.done.is_set() else None
+
+    def start(self, tag: str, seconds: Optional[float] = None) -> ProfileSession:
+        """Start sampling for at most seconds (capped); raises ProfilerBusy"""
+        limit = min(seconds or self.max_seconds, self.max_seconds)
+        with self._lock:
+            if self.active is not None:
+                raise ProfilerBusy(f"Profile {self._active.profile_id} is still running")
+            session = ProfileSession(tag, limit, self.interval, self.directory)
+            self._active = session
+            self.sessions += 1
+        self._prune()
+        session.start()
+        return session
+
+    def _prune(self):
+        """Drop the oldest profiles beyond max_files (names sort by start time)"""
+        if self.directory is None or not self.directory.is_dir():
+            return
+        files = sorted(self.directory.glob("*.folded"))
+        for old in files[:max(len(files) - self.max_files + 1, 0)]:
+            old.unlink(missing_ok=True)
+
+    def profiles(self) -> List[Dict[str, object]]:
+        """Profiles on disk, newest first"""
+        if self.directory is None or not self.directory.is_dir():
+            return []
+        found = []
+        for path in sorted(self.directory.glob("*.folded"), reverse=True):
+            match = _FILE_NAME.match(path.name)
+            if match:
+                found.append({
+                    "profile_id": path.stem,
+                    "feature": match.group(2),
+                    "started_at": datetime.strptime(match.group(1), "%Y%m%dT%H%M%S").isoformat(),
+                    "size_bytes": path.stat().st_size,
+                })
+        return found
+
+    def read(self, profile_id: str) -> str:
+        """Collapsed stacks of a finished profile; raises LookupError"""
+        if self.directory is None or not _FILE_NAME.match(f"{profile_id}.folded"):
+            raise LookupError(f"Unknown profile {profile_id}")
+        path = self.directory / f"{profile_id}.folded"
+        if not path.is_file():
+            raise LookupError(f"Unknown profile {profile_id}")
+        return path.read_text(encoding="utf-8")
+
+    def stats(self) -> Dict[str, object]:
+        active = self.active
+        return {
+            "sessions": self.sessions,
+            "active": active.info() if active is not None else None,
+        }
+
+
+def _admin_token_valid(token: str) -> bool:
+    """Same rule as the admin endpoints: ADMIN_API_TOKEN set and matching"""
+    return bool(settings.ADMIN_API_TOKEN) and hmac.compare_digest(token, settings.ADMIN_API_TOKEN)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware: profiles one request sent with X-Profile: 1 and a
+    valid X-Admin-Token, and names the profile in the X-Profile-Id header
+
+    The sampler sees every thread, so on a busy worker concurrent requests
+    appear too (under their own endpoint frames). Without the header the
+    cost is one header scan; a busy profiler or a bad token just runs the
+    request unprofiled.
+    """
+
+    def __init__(self, app, profiler: "Profiler"):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if headers.get(PROFILE_HEADER.encode()) not in (b"1", b"true") or not _admin_token_valid(
+            headers.get(b"x-admin-token", b"").decode("latin-1")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        feature = feature_for(scope["path"])
+        try:
+            session = self.profiler.start(feature.value if feature else "request")
+        except ProfilerBusy:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (PROFILE_ID_HEADER.lower().encode(), session.profile_id.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            session.stop()
+
+
+# Global profiler instance
+profiler = Profiler(
+    directory=settings.PROFILE_DIR,
+    interval=settings.PROFILE_SAMPLE_INTERVAL,
+    max_seconds=settings.PROFILE_MAX_SECONDS,
+    max_files=settings.PROFILE_MAX_FILES
+)
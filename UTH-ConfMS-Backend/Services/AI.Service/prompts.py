@@ -0,0 +1,252 @@
+"""
+Prompt Templates
+Versioned LLM prompts built once at import: each template is a fixed system
+message and instruction prefix followed by the request text, so consecutive
+calls share a byte-identical prefix that provider-side prefix caching can
+reuse. max_tokens is sized from a local token estimate of the input instead
+of one worst-case limit, and the provider's reported usage is recorded per
+template (including how far the estimate was off)
+"""
+
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from tokenizer import LETTERS, fold
+
+# Rough BPE costs (Llama 3 family): an English word is ~1 token, accented
+# Vietnamese syllables split into ~2, digits go in groups of 3
+_PIECE = re.compile(rf"[{LETTERS}]+|\d+|\S", re.IGNORECASE)
+ACCENTED_SYLLABLE_TOKENS = 2
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and separators per chat message
+
+
+def estimate_tokens(text: str) -> int:
+    """Local estimate of the model's token count for text (Vietnamese or English)"""
+    tokens = 0
+    for match in _PIECE.finditer(text):
+        piece = match.group()
+        if piece[0].isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif piece[0].isalpha():
+            if fold(piece) != piece:
+                tokens += ACCENTED_SYLLABLE_TOKENS
+            else:
+                tokens += 1 + len(piece) // 8
+        else:
+            tokens += 1
+    return tokens
+
+
+class RenderedPrompt:
+    """Messages and output budget of one call"""
+
+    __slots__ = ("template", "messages", "estimated_tokens", "max_tokens")
+
+    def __init__(self, template: "PromptTemplate", messages: List[Dict[str, str]], estimated_tokens: int, max_tokens: int):
+        self.template = template
+        self.messages = messages
+        self.estimated_tokens = estimated_tokens  # Prompt, as estimated locally
+        self.max_tokens = max_tokens
+
+
+class PromptTemplate:
+    """
+    system + instructions + text + suffix, with the static parts joined and
+    token-counted once
+
+    The output budget is output_ratio tokens per input-text token plus
+    output_floor, times PROMPT_OUTPUT_HEADROOM, capped at max_output and
+    GROQ_MAX_TOKENS.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        version: int,
+        system: str,
+        instructions: str,
+        suffix: str = "",
+        output_ratio: float = 1.0,
+        output_floor: int = 64,
+        max_output: Optional[int] = None
+    ):
+        self.name = name
+        self.version = version
+        self.system = system
+        self.prefix = instructions
+        self.suffix = suffix
+        self.output_ratio = output_ratio
+        self.output_floor = output_floor
+        self.max_output = max_output
+        self.static_tokens = (
+            estimate_tokens(system) + estimate_tokens(instructions) + estimate_tokens(suffix)
+            + 2 * MESSAGE_OVERHEAD_TOKENS
+        )
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}-v{self.version}"
+
+    def max_tokens_for(self, text_tokens: int) -> int:
+        budget = (self.output_floor + self.output_ratio * text_tokens) * settings.PROMPT_OUTPUT_HEADROOM
+        cap = settings.GROQ_MAX_TOKENS
+        if self.max_output is not None:
+            cap = min(cap, self.max_output)
+        return max(1, min(int(math.ceil(budget)), cap))
+
+    def render(self, text: str) -> RenderedPrompt:
+        text_tokens = estimate_tokens(text)
+        messages = [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.prefix + text + self.suffix},
+        ]
+        return RenderedPrompt(self, messages, self.static_tokens + text_tokens, self.max_tokens_for(text_tokens))
+
+
+class PromptUsage:
+    """Token usage reported by the provider, per template"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._templates: Dict[str, Dict[str, float]] = {}
+
+    def record(self, prompt: RenderedPrompt, response: Any):
+        """Count one completed call; responses without usage only count the call"""
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+        completion_tokens = getattr(usage, "completion_tokens", None) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) or 0
+        choices = getattr(response, "choices", None) or []
+        truncated = bool(choices) and getattr(choices[0], "finish_reason", None) == "length"
+        with self._lock:
+            entry = self._templates.setdefault(prompt.template.key, {
+                "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_prompt_tokens": 0,
+                "max_tokens_requested": 0, "estimated_prompt_tokens": 0, "truncated": 0,
+            })
+            entry["calls"] += 1
+            entry["max_tokens_requested"] += prompt.max_tokens
+            entry["truncated"] += truncated
+            if usage is not None:
+                entry["prompt_tokens"] += prompt_tokens
+                entry["completion_tokens"] += completion_tokens
+                entry["cached_prompt_tokens"] += cached_tokens
+                entry["estimated_prompt_tokens"] += prompt.estimated_tokens
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            snapshot = {key: dict(entry) for key, entry in self._templates.items()}
+        for entry in snapshot.values():
+            # Share of the reserved output budget actually used, and estimate / actual
+            entry["output_budget_used"] = round(
+                entry["completion_tokens"] / entry["max_tokens_requested"], 3
+            ) if entry["max_tokens_requested"] else 0.0
+            entry["estimate_ratio"] = round(
+                entry["estimated_prompt_tokens"] / entry["prompt_tokens"], 3
+            ) if entry["prompt_tokens"] else None
+        return snapshot
+
+
+POLISH = PromptTemplate(
+    name="polish",
+    version=1,
+    system="Bạn là chuyên gia viết bài báo khoa học, giúp tác giả cải thiện văn phong academic.",
+    instructions="""Bạn là một chuyên gia viết bài báo khoa học. Hãy cải thiện đoạn văn sau để phù hợp với phong cách học thuật (academic writing), giữ nguyên ý nghĩa nhưng làm cho văn phong chuyên nghiệp hơn.
+
+Yêu cầu:
+- Giữ nguyên ngôn ngữ gốc (tiếng Việt hoặc tiếng Anh)
+- Sửa lỗi ngữ pháp nếu có
+- Cải thiện cấu trúc câu cho rõ ràng hơn
+- Dùng từ ngữ học thuật phù hợp
+- KHÔNG thêm hoặc bớt thông tin
+- CHỈ trả về văn bản đã chỉnh sửa, KHÔNG giải thích
+
+Văn bản gốc:
+""",
+    suffix="""
+
+Văn bản đã cải thiện:""",
+    # The polished text is about as long as the original
+    output_ratio=1.2,
+    output_floor=64,
+)
+
+CONTEXTUAL_EN = PromptTemplate(
+    name="contextual_en",
+    version=1,
+    system="You are an academic English proofreader. Return JSON only.",
+    instructions="""You are an expert editor of SCIENTIFIC/ACADEMIC English.
+
+CONTEXT: This text belongs to a conference paper management system (title, abstract or keywords of a scientific paper).
+
+Find CONTEXTUAL errors only: wrong word for the context, agreement errors, misspellings (e.g. "there results" → "their results", "an novel" → "a novel").
+
+NOTES:
+- Only fix CLEAR errors, do not rephrase correct sentences
+- Keep technical terms and acronyms as they are
+
+RETURN JSON ONLY:
+{"errors": [{"original": "wrong text", "correct": "correct text", "context": "context"}]}
+
+If there are no errors: {"errors": []}
+
+Text:
+""",
+    # A short JSON list: grows with the text, but far slower than it
+    output_ratio=0.3,
+    output_floor=96,
+    max_output=500,
+)
+
+CONTEXTUAL_VI = PromptTemplate(
+    name="contextual_vi",
+    version=1,
+    system="Bạn là chuyên gia kiểm tra tiếng Việt. Chỉ trả về JSON.",
+    instructions="""Bạn là chuyên gia tiếng Việt chuyên về văn bản KHOA HỌC/HỌC THUẬT.
+
+NGỮ CẢNH: Đây là văn bản trong hệ thống quản lý BÀI BÁO KHOA HỌC (scientific paper/conference paper).
+
+Tìm LỖI NGỮ CẢNH (ví dụ: "phương pháp moi" → "phương pháp mới", "bai bao" → "bài báo").
+
+LƯU Ý:
+- "bài báo" = scientific paper (ĐÚNG)
+- "bài bảo" hoặc "báo cáo" = report (SAI trong ngữ cảnh này)
+- Chỉ sửa từ SAI RÕ RÀNG, không sửa từ đúng ngữ pháp
+
+CHỈ TRẢ VỀ JSON:
+{"errors": [{"original": "từ sai", "correct": "từ đúng", "context": "ngữ cảnh"}]}
+
+Nếu không có lỗi: {"errors": []}
+
+Văn bản:
+""",
+    output_ratio=0.3,
+    output_floor=96,
+    max_output=500,
+)
+
+CHAIR_EMAIL = PromptTemplate(
+    name="chair_email",
+    version=1,
+    system="You write concise, polite academic conference emails. Return only JSON.",
+    instructions="""Write a professional email template for an academic conference.
+
+Use {{placeholder}} syntax for every recipient-specific value, e.g. {{recipient_name}}, {{paper_id}}, {{paper_title}}.
+Keep conference-wide values as placeholders too: {{conference_name}}, {{deadline}}, {{chair_name}}.
+
+RETURN ONLY JSON:
+{"subject": "...", "body": "..."}
+
+""",
+    # One short email whatever the context; longer instructions ask for a bit more
+    output_ratio=0.5,
+    output_floor=320,
+    max_output=800,
+)
+
+
+# Global usage counters
+prompt_usage = PromptUsage()
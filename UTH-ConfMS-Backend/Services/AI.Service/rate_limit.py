@@ -0,0 +1,93 @@
+"""
+Global LLM Rate Limiting
+One process-wide limiter shared by every Groq call: bounded concurrency
+plus a requests-per-minute token bucket matching the Groq quota
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from config import settings
+
+
+class LLMRateLimitExceeded(Exception):
+    """No LLM slot became available within the queue timeout"""
+
+
+class LLMRateLimiter:
+    """Thread-safe limiter; async callers use it from worker threads"""
+
+    def __init__(self, max_concurrency: int, requests_per_minute: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.queue_timeout = queue_timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._tokens = float(requests_per_minute)
+        self._updated = time.monotonic()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def _take_token(self, deadline: float) -> bool:
+        """Wait for a token from the per-minute bucket until deadline"""
+        rate = self.requests_per_minute / 60.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    float(self.requests_per_minute),
+                    self._tokens + (now - self._updated) * rate
+                )
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                wait = (1.0 - self._tokens) / rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold one LLM slot for the duration of a call
+
+        Raises:
+            LLMRateLimitExceeded: if no slot is free within timeout
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        if not self._semaphore.acquire(timeout=max(timeout, 0.0)):
+            self.rejected += 1
+            raise LLMRateLimitExceeded("LLM concurrency limit reached")
+        try:
+            if not self._take_token(deadline):
+                self.rejected += 1
+                raise LLMRateLimitExceeded("LLM requests-per-minute limit reached")
+            with self._lock:
+                self.in_flight += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+        finally:
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "requests_per_minute": self.requests_per_minute,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+
+# Global limiter instance shared by all LLM callers
+llm_limiter = LLMRateLimiter(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    queue_timeout=settings.LLM_QUEUE_TIMEOUT
+)
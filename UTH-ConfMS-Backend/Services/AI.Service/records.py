@@ -0,0 +1,65 @@
+"""
+Lightweight Result Records
+Slotted dataclasses built inside the service layer on hot paths
+Field names mirror the pydantic response models in models.py, so the wire
+schema is unchanged; they are serialized directly by fast_json
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass(slots=True)
+class Correction:
+    """Mirror of models.TextCorrection"""
+    original: str
+    suggested: str
+    position: int
+    error_type: str  # phrase, spelling, contextual
+    explanation: str
+
+
+@dataclass(slots=True)
+class Patch:
+    """Mirror of models.TextPatch"""
+    start: int
+    end: int
+    replacement: str
+
+
+@dataclass(slots=True)
+class SpellCheckResult:
+    """Mirror of models.SpellCheckResponse"""
+    original_text: str
+    suggested_text: Optional[str]
+    corrections: List[Correction]
+    applied: bool = False
+    patches: Optional[List[Patch]] = None
+    degraded_stages: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class KeywordSuggestionResult:
+    """Mirror of models.KeywordSuggestionResponse"""
+    suggested_keywords: List[str]
+    confidence_scores: Dict[str, float]
+    applied: bool = False
+
+
+@dataclass(slots=True)
+class RankedPaperRecord:
+    """Mirror of models.RankedPaper"""
+    paper_id: str
+    similarity_score: float
+    matching_topics: List[str]
+    recommendation: str
+
+
+@dataclass(slots=True)
+class BiddingListResult:
+    """Mirror of models.BiddingListResponse"""
+    papers: List[RankedPaperRecord] = field(default_factory=list)
+    page: int = 1
+    page_size: int = 20
+    total_matches: int = 0
+    total_papers: int = 0
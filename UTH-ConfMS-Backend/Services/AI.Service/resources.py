@@ -0,0 +1,195 @@
+"""
+Language Resources
+Spellcheck dictionary, segmentation lexicon and stopwords are loaded from a
+versioned JSON file and compiled into their lookup structures off the request
+path. The compiled set is immutable and swapped in with one reference
+assignment, so requests in flight finish on the version they started with
+and a reload never blocks them (copy-on-write)
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set
+
+from config import settings
+from conferences import conference_resources
+from tokenizer import Lexicon, fold, set_lexicon, set_lexicon_resolver
+
+logger = logging.getLogger(__name__)
+
+SERVICE_DIR = Path(__file__).resolve().parent
+
+
+class ResourceLoadError(Exception):
+    """Resource file missing or invalid - the active version stays in place"""
+
+
+class LanguageResources:
+    """One compiled, read-only version of the language resources"""
+
+    __slots__ = (
+        "version", "source", "dictionary", "forms", "lexicon", "stopwords", "english_stopwords",
+        "edge_words", "compile_ms", "loaded_at"
+    )
+
+    def __init__(self, data: Dict[str, Any], source: str):
+        version = data.get("version")
+        if not isinstance(version, str) or not version:
+            raise ResourceLoadError("Resource file has no version")
+        for field in ("syllables", "compound_words", "stopwords"):
+            if not isinstance(data.get(field), list):
+                raise ResourceLoadError(f"Resource file field '{field}' must be a list")
+
+        started = time.perf_counter()
+        self.version = version
+        self.source = source
+        # No-diacritics -> correct form, for words that actually carry diacritics
+        dictionary: Dict[str, str] = {}
+        for word in data["syllables"]:
+            key = fold(word).lower()
+            if key != word.lower():
+                dictionary[key] = word
+        self.dictionary = dictionary
+        # No-diacritics -> every known spelling; more than one = ambiguous without context
+        forms: Dict[str, Set[str]] = {}
+        for word in list(data["syllables"]) + list(data["stopwords"]):
+            forms.setdefault(fold(word).lower(), set()).add(word.lower())
+        for key, spellings in data.get("confusables", {}).items():
+            forms.setdefault(key, set()).update(w.lower() for w in spellings)
+        self.forms: Dict[str, FrozenSet[str]] = {key: frozenset(v) for key, v in forms.items()}
+        self.lexicon = Lexicon(data["compound_words"], version=version)
+        self.stopwords: FrozenSet[str] = frozenset(w.lower() for w in data["stopwords"])
+        self.english_stopwords: FrozenSet[str] = frozenset(
+            w.lower() for w in data.get("english_stopwords", [])
+        )
+        # Words allowed inside a keyphrase but never at its edge
+        self.edge_words: FrozenSet[str] = self.stopwords | self.english_stopwords | frozenset(
+            w.lower() for w in data.get("edge_words", [])
+        )
+        self.compile_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.loaded_at = datetime.utcnow().isoformat()
+
+    def stopwords_for(self, languages: Iterable[str]) -> FrozenSet[str]:
+        """Stopwords of the languages present in a text (langid codes)"""
+        languages = set(languages)
+        words = frozenset()
+        if "vi" in languages or not languages:
+            words |= self.stopwords
+        if "en" in languages:
+            words |= self.english_stopwords
+        return words
+
+    def estimated_bytes(self) -> int:
+        """Rough resident size (~150 bytes per stored word), for the conference resource LRU"""
+        words = (
+            len(self.dictionary) + sum(len(v) for v in self.forms.values()) + len(self.lexicon.forms)
+            + len(self.lexicon.prefixes) + len(self.edge_words)
+        )
+        return words * 150
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+            "compile_ms": self.compile_ms,
+            "dictionary_words": len(self.dictionary),
+            "lexicon_words": len(self.lexicon.forms),
+            "stopwords": len(self.stopwords),
+            "english_stopwords": len(self.english_stopwords),
+        }
+
+
+def _resolve(path: str) -> Path:
+    return Path(path) if Path(path).is_absolute() else SERVICE_DIR / path
+
+
+def _read(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except OSError as e:
+        raise ResourceLoadError(f"Cannot read resource file: {e}")
+    except ValueError as e:
+        raise ResourceLoadError(f"Resource file is not valid JSON: {e}")
+
+
+class ResourceManager:
+    """Holds the active resources; reload compiles first, then swaps"""
+
+    def __init__(self, path: str):
+        self.configured = path  # As written in the settings, compared per request
+        self.path = _resolve(path)
+        self.reloads = 0
+        self.failed_reloads = 0
+        self._reload_lock = threading.Lock()  # Serializes reloads, never taken by readers
+        self._current: Optional[LanguageResources] = None
+        self.reload()
+
+    @property
+    def current(self) -> LanguageResources:
+        """Snapshot for one request - read it once and keep using it"""
+        return self._current
+
+    def reload(self) -> LanguageResources:
+        """
+        Load and compile the resource file, then swap it in
+
+        Blocking - call from a worker thread. On error the previous version
+        stays active and ResourceLoadError is raised.
+        """
+        with self._reload_lock:
+            try:
+                resources = LanguageResources(_read(self.path), source=self.path.name)
+            except ResourceLoadError:
+                self.failed_reloads += 1
+                raise
+            previous = self._current
+            # Reference assignments: readers see either the old or the new set
+            self._current = resources
+            set_lexicon(resources.lexicon)
+            if previous is not None:
+                self.reloads += 1
+            logger.info(
+                f"Language resources {resources.version} active "
+                f"(compiled in {resources.compile_ms} ms)"
+            )
+            return resources
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.current.stats(),
+            "reloads": self.reloads,
+            "failed_reloads": self.failed_reloads,
+        }
+
+
+def _conference_resources(path: str) -> LanguageResources:
+    """A conference's own resource file, compiled on first use into the shared LRU"""
+    resolved = _resolve(path)
+    try:
+        return conference_resources.get(
+            ("language", str(resolved)),
+            load=lambda: LanguageResources(_read(resolved), source=resolved.name),
+            size=LanguageResources.estimated_bytes
+        )
+    except ResourceLoadError as e:
+        logger.warning(f"Conference resources {path} not loaded, using the global set: {e}")
+        return language_resources.current
+
+
+def get_resources() -> LanguageResources:
+    """Resources of the current request: its conference's file when it sets one"""
+    path = settings.LANGUAGE_RESOURCE_FILE
+    if path == language_resources.configured:
+        return language_resources.current
+    return _conference_resources(path)
+
+
+# Global manager instance (loads the bundled file at import)
+language_resources = ResourceManager(settings.LANGUAGE_RESOURCE_FILE)
+set_lexicon_resolver(lambda: get_resources().lexicon)
@@ -0,0 +1,198 @@
+"""
+Reviewer Expertise Profiles
+Expertise is normalized once when a reviewer states it (or reviews a paper)
+and kept per reviewer_id, so similarity calls only pass IDs
+Profiles hold reviewer topics only - never paper or author data
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import settings
+from tokenizer import fold
+
+
+# (inode, mtime) of a profile file: os.replace gives every save a new inode
+FileVersion = Tuple[int, int]
+
+
+class ProfileNotFound(LookupError):
+    """No stored profile for this reviewer"""
+
+
+class ReviewerProfile:
+    """
+    Weighted topic vector of one reviewer
+
+    Stated expertise has weight 1.0; topics learned from reviewed papers
+    start at REVIEWED_TOPIC_WEIGHT and grow with each further paper.
+    Immutable once built: updates return a new profile, so a reader never
+    sees weights and folded topics from two different versions.
+    """
+
+    __slots__ = ("reviewer_id", "stated", "learned", "reviewed_papers", "weights", "folded")
+
+    def __init__(
+        self,
+        reviewer_id: str,
+        stated: Optional[List[str]] = None,
+        learned: Optional[Dict[str, int]] = None,
+        reviewed_papers: int = 0
+    ):
+        self.reviewer_id = reviewer_id
+        self.stated: List[str] = self.normalize(stated or [])
+        self.learned: Dict[str, int] = dict(learned or {})  # topic -> papers it appeared in
+        self.reviewed_papers = reviewed_papers
+
+        stated_keys = {fold(topic) for topic in self.stated}
+        weights = {
+            topic: min(1.0, settings.REVIEWED_TOPIC_WEIGHT * count)
+            for topic, count in self.learned.items()
+            if fold(topic) not in stated_keys  # Un-accented copy of a stated topic
+        }
+        for topic in self.stated:
+            weights[topic] = 1.0
+        self.weights: Dict[str, float] = weights
+        self.folded: Dict[str, str] = {topic: fold(topic) for topic in weights}
+
+    @staticmethod
+    def normalize(topics: Iterable[str]) -> List[str]:
+        seen = []
+        for topic in topics:
+            topic = " ".join(topic.lower().split())
+            if topic and topic not in seen:
+                seen.append(topic)
+        return seen
+
+    def with_expertise(self, topics: Iterable[str]) -> "ReviewerProfile":
+        """Copy with the stated expertise replaced (learned topics are kept)"""
+        return ReviewerProfile(self.reviewer_id, list(topics), self.learned, self.reviewed_papers)
+
+    def with_reviewed_paper(self, keywords: Iterable[str]) -> "ReviewerProfile":
+        """Copy with the keywords of one more reviewed paper learned"""
+        learned = dict(self.learned)
+        for topic in self.normalize(keywords):
+            learned[topic] = learned.get(topic, 0) + 1
+        return ReviewerProfile(self.reviewer_id, self.stated, learned, self.reviewed_papers + 1)
+
+    @property
+    def topics(self) -> List[str]:
+        return list(self.weights)
+
+    def to_dict(self) -> Dict:
+        return {
+            "reviewer_id": self.reviewer_id,
+            "stated": self.stated,
+            "learned": self.learned,
+            "reviewed_papers": self.reviewed_papers,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ReviewerProfile":
+        return cls(
+            reviewer_id=data["reviewer_id"],
+            stated=data.get("stated", []),
+            learned=data.get("learned", {}),
+            reviewed_papers=data.get("reviewed_papers", 0)
+        )
+
+
+class ReviewerProfileStore:
+    """
+    In-memory profiles backed by one JSON file per reviewer
+
+    Each cached profile remembers the file version (inode, mtime) it was read
+    from; a lookup re-reads the file when another worker has replaced it, so
+    every worker serves the latest saved profile. Concurrent updates of one
+    reviewer from two workers are last-writer-wins.
+    """
+
+    def __init__(self, directory: Optional[str]):
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._profiles: Dict[str, Tuple[Optional[FileVersion], ReviewerProfile]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, reviewer_id: str) -> Path:
+        name = hashlib.sha256(reviewer_id.encode("utf-8")).hexdigest()
+        return self.directory / f"{name}.json"
+
+    def _version(self, reviewer_id: str) -> Optional[FileVersion]:
+        try:
+            stat = os.stat(self._path(reviewer_id))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _load(self, reviewer_id: str) -> Optional[ReviewerProfile]:
+        try:
+            with open(self._path(reviewer_id), "r", encoding="utf-8") as f:
+                return ReviewerProfile.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, profile: ReviewerProfile):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(profile.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(profile.reviewer_id))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _current(self, reviewer_id: str) -> Optional[ReviewerProfile]:
+        """Cached profile, re-read first if its file changed since (no locking)"""
+        cached = self._profiles.get(reviewer_id)
+        if self.directory is None:
+            return cached[1] if cached is not None else None
+        version = self._version(reviewer_id)
+        if version is None or (cached is not None and cached[0] == version):
+            return cached[1] if cached is not None else None
+        profile = self._load(reviewer_id)
+        if profile is None:
+            return cached[1] if cached is not None else None
+        self._profiles[reviewer_id] = (version, profile)  # One assignment: readers see either entry
+        return profile
+
+    def find(self, reviewer_id: str) -> Optional[ReviewerProfile]:
+        return self._current(reviewer_id)
+
+    def get(self, reviewer_id: str) -> ReviewerProfile:
+        """
+        Raises:
+            ProfileNotFound: if the reviewer has no stored profile
+        """
+        profile = self.find(reviewer_id)
+        if profile is None:
+            raise ProfileNotFound(f"No expertise profile for reviewer {reviewer_id}")
+        return profile
+
+    def _update(self, reviewer_id: str, change: Callable[[ReviewerProfile], ReviewerProfile]) -> ReviewerProfile:
+        with self._lock:
+            profile = change(self._current(reviewer_id) or ReviewerProfile(reviewer_id))
+            version = None
+            if self.directory is not None:
+                self._save(profile)
+                version = self._version(reviewer_id)
+            self._profiles[reviewer_id] = (version, profile)
+        return profile
+
+    def set_expertise(self, reviewer_id: str, expertise: List[str]) -> ReviewerProfile:
+        """Create the profile or replace its stated expertise (learned topics are kept)"""
+        return self._update(reviewer_id, lambda profile: profile.with_expertise(expertise))
+
+    def add_reviewed_paper(self, reviewer_id: str, keywords: List[str]) -> ReviewerProfile:
+        """Fold the keywords of a reviewed paper into the profile"""
+        return self._update(reviewer_id, lambda profile: profile.with_reviewed_paper(keywords))
+
+
+# Global store instance
+reviewer_profiles = ReviewerProfileStore(settings.REVIEWER_PROFILE_DIR)
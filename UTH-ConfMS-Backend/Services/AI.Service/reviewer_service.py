@@ -4,18 +4,72 @@ Provides AI assistance for reviewers during paper evaluation
 CRITICAL: Never exposes author identity or violates double-blind review
 """
 
+import asyncio
 import re
-from typing import List, Dict, Tuple
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from collections import Counter
 import numpy as np
 
 from models import (
     ReviewerSummaryRequest, ReviewerSummaryResponse,
+    BatchSummaryRequest, BatchSummaryPaper,
     SimilarityRequest, SimilarityResponse,
+    ReviewerProfileRequest, ReviewedPaperRequest, ReviewerProfileResponse,
+    PaperIndexRequest, PaperIndexResponse,
+    BiddingListRequest,
     AIFeature, UserRole
 )
+from records import RankedPaperRecord, BiddingListResult
 from config import settings
 from audit_logging import audit_logger
+from fast_json import dumps_line
+from paper_index import paper_indexes
+from summary_cache import summary_cache, content_hash
+from collocations import collocation_stats
+from reviewer_profiles import reviewer_profiles, ReviewerProfile
+from tokenizer import fold, terms
+from langid import identify, ENGLISH, VIETNAMESE
+from timing import stage
+from summarizer import summarize, summarize_batch
+
+
+# Bump when summary output changes - invalidates every cached summary
+SUMMARIZER_VERSION = "textrank-1"
+
+
+def summary_version() -> str:
+    """Cache version: the summarizer plus the length budget, which conferences can override"""
+    return f"{SUMMARIZER_VERSION}:{settings.SUMMARY_MIN_LENGTH}-{settings.SUMMARY_MAX_LENGTH}"
+
+
+# Sentence cues for each key point, per language (Vietnamese cues are un-accented:
+# they are matched against the folded sentence so missing diacritics still match)
+KEY_POINT_CUES = {
+    ENGLISH: {
+        "research_problem": ['problem', 'challenge', 'issue', 'difficulty', 'limitation'],
+        "methodology": [
+            'method', 'approach', 'technique', 'algorithm', 'framework',
+            'model', 'system', 'propose', 'develop', 'introduce', 'present'
+        ],
+        "dataset": ['dataset', 'data', 'corpus', 'benchmark', 'experiment'],
+        "contributions": [
+            'contribution', 'result', 'achieve', 'improve', 'outperform',
+            'demonstrate', 'show', 'effective', 'performance'
+        ],
+    },
+    VIETNAMESE: {
+        "research_problem": ['van de', 'thach thuc', 'kho khan', 'han che', 'bai toan'],
+        "methodology": [
+            'phuong phap', 'cach tiep can', 'ky thuat', 'thuat toan', 'mo hinh',
+            'he thong', 'de xuat', 'phat trien', 'gioi thieu', 'trinh bay'
+        ],
+        "dataset": ['du lieu', 'ngu lieu', 'benchmark', 'thuc nghiem', 'thu nghiem'],
+        "contributions": [
+            'dong gop', 'ket qua', 'dat duoc', 'cai thien', 'vuot troi',
+            'chung minh', 'cho thay', 'hieu qua', 'hieu suat'
+        ],
+    },
+}
 
 
 class ReviewerAIService:
@@ -42,40 +96,140 @@ class ReviewerAIService:
         abstract = request.paper_abstract
         keywords = request.paper_keywords or []
         
-        # Extract key points from abstract
-        key_points = self._extract_key_points(abstract, keywords)
-        
-        # Generate neutral summary
-        summary = self._generate_neutral_summary(abstract, key_points)
-        
-        # Ensure summary is within word limits
-        word_count = len(summary.split())
-        if word_count < settings.SUMMARY_MIN_LENGTH:
-            summary = self._expand_summary(summary, abstract)
-        elif word_count > settings.SUMMARY_MAX_LENGTH:
-            summary = self._truncate_summary(summary, settings.SUMMARY_MAX_LENGTH)
-        
-        word_count = len(summary.split())
+        # Shared by all reviewers of the paper - only paper content goes in
+        with stage("summary_cache"):
+            summary_data, cache_source = summary_cache.get_or_compute(
+                request.paper_id,
+                content_hash(abstract, keywords),
+                summary_version(),
+                lambda: self._summarize(abstract, keywords)
+            )
         
-        response = ReviewerSummaryResponse(
-            summary=summary,
-            key_points=key_points,
-            word_count=word_count
-        )
+        response = ReviewerSummaryResponse(**summary_data)
         
-        # Log the operation (with privacy preservation)
+        # Every reviewer read is audited, cached or not
         audit_logger.log_ai_operation(
             user_id=request.reviewer_id,
             user_role=UserRole.REVIEWER,
             feature=AIFeature.REVIEWER_SUMMARY,
             input_text=abstract,
-            output_data={"summary_length": word_count},
+            output_data={"summary_length": response.word_count},
             applied=False,
-            metadata={"paper_id": request.paper_id}
+            metadata={"paper_id": request.paper_id, "cache": cache_source}
         )
         
         return response
     
+    def summarize_assignment(self, request: BatchSummaryRequest) -> AsyncIterator[bytes]:
+        """
+        Summaries for a reviewer's whole assignment, as NDJSON lines
+        Cached summaries are sent first; missing ones are computed in
+        vectorized chunks in worker threads and sent as each chunk finishes.
+        Every paper read gets its own audit record
+        
+        CRITICAL: Never include or infer author information
+        """
+        if not settings.ENABLE_REVIEWER_SUMMARY:
+            audit_logger.log_feature_disabled(request.reviewer_id, AIFeature.REVIEWER_SUMMARY)
+            raise ValueError("Summary generation feature is currently disabled")
+        
+        if not settings.PRESERVE_DOUBLE_BLIND:
+            raise ValueError("Double-blind review mode must be enabled")
+        
+        return self._stream_summaries(request)
+    
+    async def _stream_summaries(self, request: BatchSummaryRequest) -> AsyncIterator[bytes]:
+        missing: List[Tuple[BatchSummaryPaper, str]] = []
+        for paper in request.papers:
+            if paper.paper_abstract is None:
+                # ID only: whatever the latest stored summary of the paper is
+                value, source = summary_cache.latest(paper.paper_id, summary_version())
+                if value is None:
+                    yield dumps_line({"paper_id": paper.paper_id, "error": "No stored summary - send the abstract"})
+                    continue
+            else:
+                digest = content_hash(paper.paper_abstract, paper.paper_keywords or [])
+                value, source = summary_cache.lookup(paper.paper_id, digest, summary_version())
+                if value is None:
+                    missing.append((paper, digest))
+                    continue
+            yield self._summary_line(request.reviewer_id, paper, value, source)
+        
+        size = max(settings.SUMMARY_BATCH_CHUNK, 1)
+        tasks = [
+            asyncio.ensure_future(asyncio.to_thread(self._summarize_chunk, missing[i:i + size]))
+            for i in range(0, len(missing), size)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                for paper, value, source in await finished:
+                    yield self._summary_line(request.reviewer_id, paper, value, source)
+        finally:
+            # Client gone: chunks not started yet are dropped
+            for task in tasks:
+                task.cancel()
+    
+    def _summarize_chunk(
+        self,
+        papers: List[Tuple[BatchSummaryPaper, str]]
+    ) -> List[Tuple[BatchSummaryPaper, Dict[str, object], str]]:
+        """One summarize_batch pass, then stored like single summaries"""
+        with stage("summarize"):
+            summaries = summarize_batch(
+                [paper.paper_abstract for paper, _ in papers],
+                [paper.paper_keywords or [] for paper, _ in papers]
+            )
+            computed = [
+                (paper, digest, self._summary_data(paper.paper_abstract, paper.paper_keywords or [], summary))
+                for (paper, digest), summary in zip(papers, summaries)
+            ]
+        results = []
+        for paper, digest, data in computed:
+            # A concurrent request may have stored this paper already - serve its value
+            value, source = summary_cache.get_or_compute(
+                paper.paper_id, digest, summary_version(), lambda data=data: data
+            )
+            results.append((paper, value, source))
+        return results
+    
+    @staticmethod
+    def _summary_line(
+        reviewer_id: str,
+        paper: BatchSummaryPaper,
+        value: Dict[str, object],
+        source: str
+    ) -> bytes:
+        audit_logger.log_ai_operation(
+            user_id=reviewer_id,
+            user_role=UserRole.REVIEWER,
+            feature=AIFeature.REVIEWER_SUMMARY,
+            input_text=paper.paper_abstract or paper.paper_id,
+            output_data={"summary_length": value["word_count"]},
+            applied=False,
+            metadata={"paper_id": paper.paper_id, "cache": source, "mode": "batch"}
+        )
+        return dumps_line({"paper_id": paper.paper_id, "cache": source, **value})
+    
+    def _summarize(self, abstract: str, keywords: List[str]) -> Dict[str, object]:
+        """Reviewer-independent summary data (the cached value)"""
+        with stage("summarize"):
+            return self._summary_data(abstract, keywords, summarize(abstract, keywords))
+    
+    def _summary_data(self, abstract: str, keywords: List[str], summary: str) -> Dict[str, object]:
+        """Key points plus the extractive summary, within the word budget"""
+        # Extract key points from abstract
+        key_points = self._extract_key_points(abstract, keywords)
+        
+        # Only a single over-long sentence can exceed the budget
+        if len(summary.split()) > settings.SUMMARY_MAX_LENGTH:
+            summary = self._truncate_summary(summary, settings.SUMMARY_MAX_LENGTH)
+        
+        return {
+            "summary": summary,
+            "key_points": key_points,
+            "word_count": len(summary.split())
+        }
+    
     def _extract_key_points(self, abstract: str, keywords: List[str]) -> Dict[str, str]:
         """
         Extract key points from abstract:
@@ -96,9 +250,8 @@ class ReviewerAIService:
         sentences = [s.strip() for s in sentences if s.strip()]
         
         # Identify research problem (usually in first 1-2 sentences)
-        problem_keywords = ['problem', 'challenge', 'issue', 'difficulty', 'limitation']
         for sentence in sentences[:3]:
-            if any(kw in sentence.lower() for kw in problem_keywords):
+            if self._has_cue(sentence, "research_problem"):
                 key_points["research_problem"] = sentence
                 break
         
@@ -106,82 +259,33 @@ class ReviewerAIService:
             key_points["research_problem"] = sentences[0]
         
         # Identify methodology
-        method_keywords = [
-            'method', 'approach', 'technique', 'algorithm', 'framework',
-            'model', 'system', 'propose', 'develop', 'introduce', 'present'
-        ]
         for sentence in sentences:
-            if any(kw in sentence.lower() for kw in method_keywords):
+            if self._has_cue(sentence, "methodology"):
                 key_points["methodology"] = sentence
                 break
         
         # Identify dataset
-        data_keywords = ['dataset', 'data', 'corpus', 'benchmark', 'experiment']
         for sentence in sentences:
-            if any(kw in sentence.lower() for kw in data_keywords):
+            if self._has_cue(sentence, "dataset"):
                 key_points["dataset"] = sentence
                 break
         
         # Identify contributions
-        contrib_keywords = [
-            'contribution', 'result', 'achieve', 'improve', 'outperform',
-            'demonstrate', 'show', 'effective', 'performance'
-        ]
         for sentence in sentences[-3:]:  # Usually at the end
-            if any(kw in sentence.lower() for kw in contrib_keywords):
+            if self._has_cue(sentence, "contributions"):
                 key_points["contributions"] = sentence
                 break
         
         return key_points
     
-    def _generate_neutral_summary(self, abstract: str, key_points: Dict[str, str]) -> str:
-        """
-        Generate a neutral, objective summary
-        Combines extracted key points into coherent text
-        """
-        summary_parts = []
-        
-        # Start with research problem
-        if key_points["research_problem"]:
-            summary_parts.append(f"This paper addresses {key_points['research_problem'].lower()}")
-        else:
-            summary_parts.append("This paper presents research in the given domain.")
-        
-        # Add methodology
-        if key_points["methodology"]:
-            summary_parts.append(key_points["methodology"])
-        
-        # Add dataset info if available
-        if key_points["dataset"]:
-            summary_parts.append(key_points["dataset"])
-        
-        # Add contributions
-        if key_points["contributions"]:
-            summary_parts.append(key_points["contributions"])
-        
-        # Join into coherent summary
-        summary = " ".join(summary_parts)
-        
-        # If too short, add more context from abstract
-        if len(summary.split()) < 100:
-            sentences = re.split(r'[.!?]+', abstract)
-            for sentence in sentences:
-                if sentence.strip() not in summary:
-                    summary += " " + sentence.strip()
-                    if len(summary.split()) >= 150:
-                        break
-        
-        return summary.strip()
-    
-    def _expand_summary(self, summary: str, abstract: str) -> str:
-        """Expand summary if it's too short"""
-        sentences = re.split(r'[.!?]+', abstract)
-        for sentence in sentences:
-            if sentence.strip() not in summary:
-                summary += " " + sentence.strip() + "."
-                if len(summary.split()) >= settings.SUMMARY_MIN_LENGTH:
-                    break
-        return summary
+    @staticmethod
+    def _has_cue(sentence: str, key_point: str) -> bool:
+        """Cue words of the sentence's own language (mixed abstracts are routed per sentence)"""
+        if identify(sentence) == ENGLISH:
+            text = sentence.lower()
+            return any(kw in text for kw in KEY_POINT_CUES[ENGLISH][key_point])
+        text = fold(sentence.lower())
+        return any(kw in text for kw in KEY_POINT_CUES[VIETNAMESE][key_point])
     
     def _truncate_summary(self, summary: str, max_words: int) -> str:
         """Truncate summary to max word count"""
@@ -201,38 +305,54 @@ class ReviewerAIService:
         Calculate similarity between reviewer expertise and paper topics
         Helps reviewers decide whether to bid on a paper
         
-        Based on keyword matching and abstract analysis
+        Based on keyword matching and abstract analysis, weighted by the
+        reviewer profile (stated topics 1.0, learned topics less); accents
+        are ignored when comparing
+        
+        Raises:
+            LookupError: stored profile or indexed paper not found
         """
         if not settings.ENABLE_REVIEWER_SIMILARITY:
             audit_logger.log_feature_disabled(request.reviewer_id, AIFeature.REVIEWER_SIMILARITY)
             raise ValueError("Similarity calculation feature is currently disabled")
         
-        reviewer_keywords = [k.lower() for k in request.reviewer_expertise]
-        paper_keywords = [k.lower() for k in request.paper_keywords]
-        abstract = request.paper_abstract.lower()
+        with stage("profile"):
+            profile = self._profile_for(request.reviewer_id, request.reviewer_expertise)
+            paper_keywords, abstract, abstract_terms = self._paper_for(request)
+        weights = profile.weights
+        total_weight = sum(weights.values())
+        # Same form as profile.folded: lowercased, no diacritics
+        paper_keywords = [k.strip().lower() for k in paper_keywords if k.strip()]
+        folded_keywords = [fold(k) for k in paper_keywords]
         
         # 1. Direct keyword matching
         matching_topics = []
         keyword_score = 0.0
         
-        for rev_kw in reviewer_keywords:
-            for paper_kw in paper_keywords:
-                if rev_kw == paper_kw or rev_kw in paper_kw or paper_kw in rev_kw:
+        for topic, weight in weights.items():
+            rev_kw = profile.folded[topic]
+            for paper_kw, folded_kw in zip(paper_keywords, folded_keywords):
+                if rev_kw == folded_kw or rev_kw in folded_kw or folded_kw in rev_kw:
                     matching_topics.append(paper_kw)
-                    keyword_score += 1.0
+                    keyword_score += weight
         
         # Normalize keyword score
-        if reviewer_keywords and paper_keywords:
-            keyword_score = keyword_score / max(len(reviewer_keywords), len(paper_keywords))
+        if weights and paper_keywords:
+            keyword_score = keyword_score / max(total_weight, len(paper_keywords))
         
         # 2. Abstract content matching
         abstract_score = 0.0
-        for rev_kw in reviewer_keywords:
-            if rev_kw in abstract:
-                abstract_score += 1.0
-        
-        if reviewer_keywords:
-            abstract_score = abstract_score / len(reviewer_keywords)
+        for topic, weight in weights.items():
+            if abstract is not None:
+                found = profile.folded[topic] in abstract
+            else:
+                topic_terms = terms(topic)
+                found = bool(topic_terms) and all(t in abstract_terms for t in topic_terms)
+            if found:
+                abstract_score += weight
+        
+        if total_weight:
+            abstract_score = abstract_score / total_weight
         
         # 3. Combined similarity score (weighted average)
         similarity_score = (keyword_score * 0.6 + abstract_score * 0.4)
@@ -270,15 +390,153 @@ class ReviewerAIService:
             user_id=request.reviewer_id,
             user_role=UserRole.REVIEWER,
             feature=AIFeature.REVIEWER_SIMILARITY,
-            input_text=abstract,
+            input_text=request.paper_abstract or request.paper_id or "",
             output_data={
                 "similarity_score": similarity_score,
                 "recommendation": recommendation
             },
-            applied=False
+            applied=False,
+            metadata={"profile": "request" if request.reviewer_expertise is not None else "stored"}
         )
         
         return response
+    
+    @staticmethod
+    def _profile_for(reviewer_id: str, expertise: Optional[List[str]]) -> ReviewerProfile:
+        """Expertise sent with the request wins; otherwise the stored profile"""
+        if expertise is not None:
+            return ReviewerProfile(reviewer_id, stated=expertise)
+        return reviewer_profiles.get(reviewer_id)
+    
+    @staticmethod
+    def _paper_for(request: SimilarityRequest) -> Tuple[List[str], Optional[str], set]:
+        """
+        (keywords, folded abstract or None, indexed abstract terms)
+        Fields missing from the request are read from the bidding index
+        """
+        if request.paper_keywords is not None and request.paper_abstract is not None:
+            return request.paper_keywords, fold(request.paper_abstract.lower()), set()
+        paper = None
+        if request.conference_id and request.paper_id:
+            paper = paper_indexes.get(request.conference_id).get(request.paper_id)
+        if paper is None:
+            raise LookupError("Paper not found in the bidding index - send paper_keywords and paper_abstract")
+        keywords = request.paper_keywords if request.paper_keywords is not None else paper.keywords
+        if request.paper_abstract is not None:
+            return keywords, fold(request.paper_abstract.lower()), set()
+        return keywords, None, paper.abstract_terms
+    
+    def set_profile(self, request: ReviewerProfileRequest) -> ReviewerProfileResponse:
+        """Store (or replace) the reviewer's stated expertise"""
+        if not settings.ENABLE_REVIEWER_SIMILARITY:
+            raise ValueError("Similarity calculation feature is currently disabled")
+        profile = reviewer_profiles.set_expertise(request.reviewer_id, request.expertise)
+        return self._profile_response(profile)
+    
+    def add_reviewed_paper(self, request: ReviewedPaperRequest) -> ReviewerProfileResponse:
+        """
+        Learn topics from a paper the reviewer reviewed
+        
+        Raises:
+            LookupError: keywords omitted and paper not in the bidding index
+        """
+        if not settings.ENABLE_REVIEWER_SIMILARITY:
+            raise ValueError("Similarity calculation feature is currently disabled")
+        keywords = request.paper_keywords
+        if keywords is None:
+            paper = None
+            if request.conference_id and request.paper_id:
+                paper = paper_indexes.get(request.conference_id).get(request.paper_id)
+            if paper is None:
+                raise LookupError("Paper not found in the bidding index - send paper_keywords")
+            keywords = paper.keywords
+        profile = reviewer_profiles.add_reviewed_paper(request.reviewer_id, keywords)
+        return self._profile_response(profile)
+    
+    @staticmethod
+    def _profile_response(profile: ReviewerProfile) -> ReviewerProfileResponse:
+        return ReviewerProfileResponse(
+            reviewer_id=profile.reviewer_id,
+            topics={topic: round(weight, 3) for topic, weight in profile.weights.items()},
+            reviewed_papers=profile.reviewed_papers
+        )
+    
+    def index_paper(self, request: PaperIndexRequest) -> PaperIndexResponse:
+        """
+        Add or update a submitted paper in the conference bidding index
+        Cost is O(terms in this paper), independent of conference size
+        """
+        if not settings.ENABLE_REVIEWER_SIMILARITY:
+            raise ValueError("Similarity calculation feature is currently disabled")
+        
+        index = paper_indexes.get(request.conference_id)
+        paper = index.add_paper(request.paper_id, request.paper_keywords, request.paper_abstract)
+        # Submitted abstracts also feed the conference keyphrase statistics
+        collocation_stats.add_document(request.conference_id, request.paper_id, request.paper_abstract)
+        
+        return PaperIndexResponse(
+            paper_id=request.paper_id,
+            indexed_terms=len(paper.keyword_terms) + len(paper.abstract_terms),
+            total_papers=len(index)
+        )
+    
+    def get_bidding_list(self, request: BiddingListRequest) -> BiddingListResult:
+        """
+        Rank all indexed papers of a conference against the reviewer's expertise
+        Only papers sharing terms with the expertise are scored; scores use the
+        index's term matching (see paper_index), so they can differ from
+        calculate_similarity for the same paper
+        """
+        if not settings.ENABLE_REVIEWER_SIMILARITY:
+            audit_logger.log_feature_disabled(request.reviewer_id, AIFeature.REVIEWER_SIMILARITY)
+            raise ValueError("Similarity calculation feature is currently disabled")
+        
+        with stage("profile"):
+            expertise = self._profile_for(request.reviewer_id, request.reviewer_expertise).topics
+        index = paper_indexes.get(request.conference_id)
+        with stage("rank"):
+            ranked, total_matches = index.rank(
+                expertise,
+                page=request.page,
+                page_size=request.page_size
+            )
+        
+        papers = [
+            RankedPaperRecord(
+                paper_id=paper_id,
+                similarity_score=round(score, 3),
+                matching_topics=topics,
+                recommendation=self._recommendation_for(score)
+            )
+            for paper_id, score, topics in ranked
+        ]
+        
+        audit_logger.log_ai_operation(
+            user_id=request.reviewer_id,
+            user_role=UserRole.REVIEWER,
+            feature=AIFeature.REVIEWER_SIMILARITY,
+            input_text=" ".join(expertise),
+            output_data={"total_matches": total_matches, "page": request.page},
+            applied=False,
+            metadata={"conference_id": request.conference_id, "mode": "bidding_list"}
+        )
+        
+        return BiddingListResult(
+            papers=papers,
+            page=request.page,
+            page_size=request.page_size,
+            total_matches=total_matches,
+            total_papers=len(index)
+        )
+    
+    @staticmethod
+    def _recommendation_for(score: float) -> str:
+        """Same thresholds as calculate_similarity"""
+        if score >= 0.7:
+            return "High match"
+        if score >= 0.4:
+            return "Moderate match"
+        return "Low match"
 
 
 # Global service instance
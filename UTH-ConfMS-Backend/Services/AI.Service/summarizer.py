@@ -0,0 +1,165 @@
+"""
+Extractive Summarizer
+TextRank over a sparse sentence-similarity graph: sentences are nodes, edges
+are cosine similarities of their (segmented, diacritic-folded) words, and the
+best-connected sentences are picked, in abstract order, within the word
+budget. A batch of abstracts is ranked in one pass: word columns are keyed
+per abstract, so the similarity product is block-diagonal by construction and
+one power iteration ranks every graph at once
+"""
+
+import bisect
+import re
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from config import settings
+from resources import LanguageResources, get_resources
+from tokenizer import fold_key, segment
+
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+REDUNDANCY = 0.7  # A sentence this similar to an already selected one adds nothing
+KEYWORD_BOOST = 1.0  # Extra restart weight per author keyword found in a sentence
+
+# Sentence ends: terminal punctuation before whitespace (so not inside "3.5"), or a line break
+_SENTENCE = re.compile(r"[^\n]+?(?:[.!?]+(?=\s|$)|(?=\n)|$)")
+
+
+@lru_cache(maxsize=2)
+def _stopwords(resources: LanguageResources) -> FrozenSet[str]:
+    """Stopwords of both languages, as folded keys"""
+    return frozenset(fold_key(w) for w in resources.stopwords | resources.english_stopwords)
+
+
+def sentences(text: str) -> List[Tuple[int, int]]:
+    """(start, end) of each sentence with at least one letter"""
+    spans = []
+    for match in _SENTENCE.finditer(text):
+        sentence = match.group()
+        if any(c.isalpha() for c in sentence):
+            start = match.start() + len(sentence) - len(sentence.lstrip())
+            spans.append((start, match.start() + len(sentence.rstrip())))
+    return spans
+
+
+def summarize_batch(
+    abstracts: Sequence[str],
+    keywords: Optional[Sequence[Optional[Sequence[str]]]] = None,
+    min_words: Optional[int] = None,
+    max_words: Optional[int] = None
+) -> List[str]:
+    """
+    Extractive summaries of many abstracts in one vectorized pass
+
+    Sentences are selected by rank until min_words is reached, skipping any
+    that would exceed max_words; abstracts shorter than min_words come back
+    whole. Author keywords, when given, bias the ranking towards sentences
+    that mention them.
+    """
+    min_words = settings.SUMMARY_MIN_LENGTH if min_words is None else min_words
+    max_words = settings.SUMMARY_MAX_LENGTH if max_words is None else max_words
+    keywords = keywords or [None] * len(abstracts)
+    resources = get_resources()
+    stopwords = _stopwords(resources)
+
+    # 1. Sentence x (abstract, word) counts, plus per-sentence restart weights
+    rows: List[int] = []
+    cols: List[int] = []
+    columns = {}
+    column_doc: List[int] = []
+    spans: List[List[Tuple[int, int]]] = []
+    offsets = [0]
+    restart: List[float] = []
+    lengths: List[int] = []
+    for doc, text in enumerate(abstracts):
+        doc_spans = sentences(text)
+        starts = [start for start, _ in doc_spans]
+        base = offsets[-1]
+        wanted = {fold_key(k) for k in keywords[doc] or ()}
+        hits = [0] * len(doc_spans)
+        for token in segment(text, resources.lexicon):
+            if len(token.key) < 2 or token.key in stopwords:
+                continue
+            index = bisect.bisect_right(starts, token.start) - 1
+            if index < 0 or token.end > doc_spans[index][1]:
+                continue
+            column = columns.get((doc, token.key))
+            if column is None:
+                column = columns[(doc, token.key)] = len(column_doc)
+                column_doc.append(doc)
+            rows.append(base + index)
+            cols.append(column)
+            if token.key in wanted:
+                hits[index] += 1
+        spans.append(doc_spans)
+        offsets.append(base + len(doc_spans))
+        restart.extend(1.0 + KEYWORD_BOOST * h for h in hits)
+        lengths.extend(len(text[start:end].split()) for start, end in doc_spans)
+
+    total = offsets[-1]
+    if total == 0:
+        return [text.strip() for text in abstracts]
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+        shape=(total, len(columns))
+    )
+    counts.sum_duplicates()
+
+    # 2. Log term frequency x inverse sentence frequency, rows L2-normalized
+    doc_sizes = np.diff(offsets)
+    doc_of_sentence = np.repeat(np.arange(len(abstracts)), doc_sizes)
+    sentence_frequency = np.bincount(counts.indices, minlength=len(column_doc))
+    isf = np.log1p(doc_sizes[np.asarray(column_doc, dtype=np.int64)] / np.maximum(sentence_frequency, 1))
+    counts.data = (1.0 + np.log(counts.data)) * isf[counts.indices]
+    norms = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+    weights = sparse.diags(1.0 / np.where(norms > 0, norms, 1.0)) @ counts
+
+    # 3. Similarity graph (block-diagonal: columns never span two abstracts)
+    similarity = (weights @ weights.T).tocsr()
+    similarity.setdiag(0.0)
+    similarity.eliminate_zeros()
+    out_degree = np.asarray(similarity.sum(axis=1)).ravel()
+    transition = (sparse.diags(1.0 / np.where(out_degree > 0, out_degree, 1.0)) @ similarity).T.tocsr()
+
+    # 4. Personalized PageRank, all graphs at once (restart mass sums to 1 per abstract)
+    restart = np.asarray(restart, dtype=np.float64)
+    restart_sums = np.bincount(doc_of_sentence, weights=restart, minlength=len(abstracts))
+    restart /= restart_sums[doc_of_sentence]
+    rank = restart.copy()
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) * restart + DAMPING * (transition @ rank)
+        converged = np.abs(updated - rank).max(initial=0.0) < TOLERANCE
+        rank = updated
+        if converged:
+            break
+
+    # 5. Per abstract: best sentences within the budget, in original order
+    summaries = []
+    for doc, text in enumerate(abstracts):
+        base, end = offsets[doc], offsets[doc + 1]
+        if base == end:
+            summaries.append(text.strip())
+            continue
+        block = similarity[base:end, base:end].toarray()
+        chosen: List[int] = []
+        words = 0
+        for index in np.argsort(-rank[base:end], kind="stable"):
+            if chosen and (words + lengths[base + index] > max_words or block[index, chosen].max() >= REDUNDANCY):
+                continue
+            chosen.append(int(index))
+            words += lengths[base + index]
+            if words >= min_words:
+                break
+        doc_spans = spans[doc]
+        summaries.append(" ".join(text[doc_spans[i][0]:doc_spans[i][1]] for i in sorted(chosen)))
+    return summaries
+
+
+def summarize(abstract: str, keywords: Optional[Sequence[str]] = None) -> str:
+    """Extractive summary of one abstract (see summarize_batch)"""
+    return summarize_batch([abstract], [keywords])[0]
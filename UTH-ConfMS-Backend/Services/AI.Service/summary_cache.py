@@ -0,0 +1,183 @@
+"""
+Paper Summary Cache
+Summaries are a function of the paper content only, so one entry per paper
+is shared by every reviewer and every worker (file-backed, small in-memory
+LRU in front)
+Cached values never contain reviewer data - reads are audited by the caller
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import settings
+
+
+def content_hash(abstract: str, keywords: Optional[List[str]] = None) -> str:
+    """Hash of the summarizer inputs; a changed abstract gives a new key"""
+    normalized_keywords = sorted(k.strip().lower() for k in (keywords or []) if k.strip())
+    payload = abstract.strip() + "\x00" + "\x1f".join(normalized_keywords)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """
+    Summary store keyed by (paper_id, content hash, summarizer version)
+
+    The file holds only the latest entry of a paper: a different hash or
+    version is a miss and the recomputed summary overwrites it, so edited
+    abstracts and summarizer upgrades invalidate without a sweep.
+    """
+
+    def __init__(self, directory: str, memory_entries: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One computation per paper at a time in this worker
+        self._paper_locks: Dict[str, threading.Lock] = {}
+
+        self.memory_hits = 0
+        self.file_hits = 0
+        self.misses = 0
+
+    def _path(self, paper_id: str) -> Path:
+        # Paper IDs come from the caller - never use them as file names directly
+        name = hashlib.sha256(paper_id.encode("utf-8")).hexdigest()
+        return self.directory / f"{name}.json"
+
+    def _remember(self, key: Tuple[str, str, str], value: Dict[str, Any]):
+        """Insert into the LRU (lock held)"""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key: Tuple[str, str, str]) -> Tuple[Optional[Dict[str, Any]], str]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value, "memory"
+
+        paper_id, digest, version = key
+        try:
+            with open(self._path(paper_id), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None, "miss"
+        if entry.get("content_hash") != digest or entry.get("version") != version:
+            return None, "miss"
+
+        value = entry["value"]
+        with self._lock:
+            self._remember(key, value)
+            self.file_hits += 1
+        return value, "file"
+
+    def _store(self, key: Tuple[str, str, str], value: Dict[str, Any]):
+        paper_id, digest, version = key
+        entry = {"paper_id": paper_id, "content_hash": digest, "version": version, "value": value}
+        # Atomic replace so other workers never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(paper_id))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self._remember(key, value)
+
+    def lookup(self, paper_id: str, digest: str, version: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Return (value, source) without computing; source is "miss" when absent"""
+        return self._lookup((paper_id, digest, version))
+
+    def latest(self, paper_id: str, version: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        Latest stored summary of a paper for this summarizer version, whatever
+        its content hash - for callers that only know the paper ID
+        """
+        try:
+            with open(self._path(paper_id), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None, "miss"
+        if entry.get("version") != version:
+            return None, "miss"
+        value = entry["value"]
+        with self._lock:
+            self._remember((paper_id, entry["content_hash"], version), value)
+            self.file_hits += 1
+        return value, "file"
+
+    def get_or_compute(
+        self,
+        paper_id: str,
+        digest: str,
+        version: str,
+        compute: Callable[[], Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Return (value, source) where source is "memory", "file" or "miss"
+
+        compute() must return reviewer-independent data only.
+        """
+        key = (paper_id, digest, version)
+        value, source = self._lookup(key)
+        if value is not None:
+            return value, source
+
+        with self._lock:
+            paper_lock = self._paper_locks.setdefault(paper_id, threading.Lock())
+        with paper_lock:
+            # Another reviewer of the same paper may have just computed it
+            value, source = self._lookup(key)
+            if value is not None:
+                return value, source
+            value = compute()
+            try:
+                self._store(key, value)
+            except OSError:
+                pass  # Read-only or full disk - serve uncached
+            with self._lock:
+                self.misses += 1
+                self._paper_locks.pop(paper_id, None)
+            return value, "miss"
+
+    def invalidate(self, paper_id: str):
+        """Drop every cached summary of a paper (e.g. on withdrawal)"""
+        with self._lock:
+            for key in [k for k in self._memory if k[0] == paper_id]:
+                del self._memory[key]
+        try:
+            os.unlink(self._path(paper_id))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.file_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "file_hits": self.file_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.file_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Global cache instance
+summary_cache = SummaryCache(
+    directory=settings.SUMMARY_CACHE_DIR,
+    memory_entries=settings.SUMMARY_CACHE_MEMORY_ENTRIES
+)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Service modules are imported top-level, as uvicorn runs them
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
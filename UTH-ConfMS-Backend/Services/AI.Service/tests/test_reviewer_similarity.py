@@ -0,0 +1,32 @@
+from reviewer_profiles import ReviewerProfileStore
+from reviewer_service import reviewer_service
+from models import SimilarityRequest
+
+
+def test_keyword_match_ignores_case():
+    result = reviewer_service.calculate_similarity(SimilarityRequest(
+        reviewer_id="r1",
+        reviewer_expertise=["machine learning", "NLP"],
+        paper_keywords=["Machine Learning", "NLP Methods"],
+        paper_abstract="We apply machine learning to NLP tasks."
+    ))
+    assert result.similarity_score == 1.0
+    assert sorted(result.matching_topics) == ["machine learning", "nlp methods"]
+
+
+def test_profile_updates_are_new_objects(tmp_path):
+    store = ReviewerProfileStore(str(tmp_path))
+    before = store.set_expertise("r1", ["Học máy"])
+    after = store.add_reviewed_paper("r1", ["Xử lý ảnh"])
+    assert after is not before
+    assert set(before.weights) == set(before.folded) == {"học máy"}
+    assert set(after.weights) == set(after.folded) == {"học máy", "xử lý ảnh"}
+
+
+def test_profile_saved_by_another_worker_is_reloaded(tmp_path):
+    worker_a = ReviewerProfileStore(str(tmp_path))
+    worker_b = ReviewerProfileStore(str(tmp_path))
+    worker_a.set_expertise("r1", ["databases"])
+    assert worker_b.get("r1").topics == ["databases"]
+    worker_a.set_expertise("r1", ["compilers"])
+    assert worker_b.get("r1").topics == ["compilers"]
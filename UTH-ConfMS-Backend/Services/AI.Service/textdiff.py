@@ -0,0 +1,188 @@
+"""
+Word-Level Text Diff
+Compares an original and a revised text as sequences of Vietnamese syllables,
+English words, numbers and punctuation (whitespace never counts as a change).
+Short regions go through Myers' O(ND) algorithm (a minimal diff); long ones
+are first split patience-style, on tokens that occur exactly once on both
+sides, and D is capped so a fully rewritten region costs one replace instead
+of quadratic time
+"""
+
+import bisect
+import re
+from itertools import accumulate
+from typing import Dict, List, NamedTuple, Tuple
+
+from tokenizer import LETTERS
+
+# A token with the whitespace before it, so offsets follow from the lengths
+_TOKEN = re.compile(rf"\s*(?:[{LETTERS}]+|\d+(?:[.,]\d+)*|\S)", re.IGNORECASE)
+
+# Edits explored per region before it is reported as one replace; regions
+# of at most this many tokens (both sides) skip the patience split
+MAX_EDIT_DISTANCE = 128
+
+# (a_start, a_end, b_start, b_end) token ranges of one changed region
+Hunk = Tuple[int, int, int, int]
+
+
+class Edit(NamedTuple):
+    """original[original_start:original_end] became revised[revised_start:revised_end]"""
+    operation: str  # insert, delete, replace
+    original_start: int
+    original_end: int
+    revised_start: int
+    revised_end: int
+
+
+def _tokens(text: str) -> Tuple[List[str], List[int]]:
+    """Tokens and their end offsets (no per-match Python objects)"""
+    pieces = _TOKEN.findall(text)
+    return list(map(str.lstrip, pieces)), list(accumulate(map(len, pieces)))
+
+
+def _unique_anchors(a: List[str], b: List[str], a_lo: int, a_hi: int, b_lo: int, b_hi: int) -> List[Tuple[int, int]]:
+    """Longest increasing run of (i, j) pairs of tokens unique in both ranges"""
+    seen_a: Dict[str, int] = {}
+    for i in range(a_lo, a_hi):
+        seen_a[a[i]] = -1 if a[i] in seen_a else i
+    seen_b: Dict[str, int] = {}
+    for j in range(b_lo, b_hi):
+        if a_lo < a_hi and b[j] in seen_a:
+            seen_b[b[j]] = -1 if b[j] in seen_b else j
+    pairs = [
+        (i, seen_b[a[i]]) for i in range(a_lo, a_hi)
+        if seen_a[a[i]] >= 0 and seen_b.get(a[i], -1) >= 0
+    ]
+    if not pairs:
+        return []
+    # Patience sorting: longest subsequence increasing in j
+    tails: List[int] = []  # j of the last pair of each pile
+    tops: List[int] = []  # Index into pairs of that pair
+    back = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        pile = bisect.bisect_left(tails, j)
+        if pile:
+            back[index] = tops[pile - 1]
+        if pile == len(tails):
+            tails.append(j)
+            tops.append(index)
+        else:
+            tails[pile] = j
+            tops[pile] = index
+    chain = []
+    index = tops[-1]
+    while index >= 0:
+        chain.append(pairs[index])
+        index = back[index]
+    return chain[::-1]
+
+
+def _myers(a: List[str], b: List[str], a_lo: int, a_hi: int, b_lo: int, b_hi: int) -> List[Hunk]:
+    """Shortest edit script of one gap as hunks, or the whole gap past MAX_EDIT_DISTANCE"""
+    n, m = a_hi - a_lo, b_hi - b_lo
+    max_d = min(n + m, MAX_EDIT_DISTANCE)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)  # Furthest x reached per diagonal k = x - y
+    trace: List[List[int]] = []
+    for d in range(max_d + 1):
+        trace.append(v[:])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]  # Down: insert b[y]
+            else:
+                x = v[offset + k - 1] + 1  # Right: delete a[x]
+            y = x - k
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, offset, n, m, a_lo, b_lo)
+    return [(a_lo, a_hi, b_lo, b_hi)]
+
+
+def _backtrack(trace: List[List[int]], offset: int, x: int, y: int, a_lo: int, b_lo: int) -> List[Hunk]:
+    """Walk the forward pass back from (x, y) and merge adjacent edits into hunks"""
+    steps: List[Tuple[int, int, bool]] = []  # (x, y, inserted) before each edit, last edit first
+    for d in range(len(trace) - 1, 0, -1):
+        v = trace[d]
+        k = x - y
+        inserted = k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1])
+        prev_k = k + 1 if inserted else k - 1
+        x = v[offset + prev_k]
+        y = x - prev_k
+        steps.append((x, y, inserted))
+
+    hunks: List[Hunk] = []
+    for x, y, inserted in reversed(steps):
+        a_end, b_end = (x, y + 1) if inserted else (x + 1, y)
+        if hunks and hunks[-1][1] == a_lo + x and hunks[-1][3] == b_lo + y:
+            a_start, _, b_start, _ = hunks[-1]
+            hunks[-1] = (a_start, a_lo + a_end, b_start, b_lo + b_end)
+        else:
+            hunks.append((a_lo + x, a_lo + a_end, b_lo + y, b_lo + b_end))
+    return hunks
+
+
+def _hunks(a: List[str], b: List[str]) -> List[Hunk]:
+    """Changed token regions of a -> b, in order"""
+    hunks: List[Hunk] = []
+    ranges = [(0, len(a), 0, len(b))]  # Explicit stack: no recursion limit on long texts
+    while ranges:
+        a_lo, a_hi, b_lo, b_hi = ranges.pop()
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            a_lo += 1
+            b_lo += 1
+        while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+        if a_lo == a_hi or b_lo == b_hi:
+            if a_lo < a_hi or b_lo < b_hi:
+                hunks.append((a_lo, a_hi, b_lo, b_hi))
+            continue
+        if a_hi - a_lo + b_hi - b_lo <= MAX_EDIT_DISTANCE:
+            hunks.extend(_myers(a, b, a_lo, a_hi, b_lo, b_hi))
+            continue
+        anchors = _unique_anchors(a, b, a_lo, a_hi, b_lo, b_hi)
+        if not anchors:
+            hunks.extend(_myers(a, b, a_lo, a_hi, b_lo, b_hi))
+            continue
+        gaps = []
+        for i, j in anchors:
+            gaps.append((a_lo, i, b_lo, j))
+            a_lo, b_lo = i + 1, j + 1
+        gaps.append((a_lo, a_hi, b_lo, b_hi))
+        ranges.extend(reversed(gaps))
+    return hunks
+
+
+def diff_words(original: str, revised: str) -> List[Edit]:
+    """
+    Changed regions between two texts as character spans of each
+
+    Inserts are empty spans of the original (at the end of the preceding
+    token), deletes empty spans of the revised text; spans cover whole tokens
+    and the whitespace between them.
+    """
+    if original == revised:
+        return []
+    a, a_ends = _tokens(original)
+    b, b_ends = _tokens(revised)
+
+    def span(tokens: List[str], ends: List[int], start: int, end: int) -> Tuple[int, int]:
+        if start < end:
+            return ends[start] - len(tokens[start]), ends[end - 1]
+        position = ends[start - 1] if start > 0 else 0
+        return position, position
+
+    edits = []
+    for a_start, a_end, b_start, b_end in _hunks(a, b):
+        if a_start == a_end:
+            operation = "insert"
+        elif b_start == b_end:
+            operation = "delete"
+        else:
+            operation = "replace"
+        edits.append(Edit(operation, *span(a, a_ends, a_start, a_end), *span(b, b_ends, b_start, b_end)))
+    return edits
@@ -0,0 +1,156 @@
+"""
+Stage Timings
+Per-request latency breakdown without a tracing backend: service code wraps
+its stages in `with stage("name"):` and the middleware returns the totals in
+a Server-Timing header (browser devtools and gateway logs read it), and in a
+"debug" field of JSON responses when the request sends X-Debug-Timing: 1.
+Outside a request - benchmarks, scripts - stage() only reads a context var
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+from fast_json import dumps
+
+DEBUG_HEADER = b"x-debug-timing"
+TIMED_PATH_PREFIX = "/api/ai/"
+
+
+class StageTimings:
+    """Milliseconds per stage name for one request (repeated stages add up)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._stages: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()  # Stages also run in worker threads
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self._stages[name] = self._stages.get(name, 0.0) + seconds * 1000
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def stages(self) -> List[Tuple[str, float, int]]:
+        """(name, ms, count) in the order stages first ran"""
+        with self._lock:
+            return [(name, ms, self._counts[name]) for name, ms in self._stages.items()]
+
+    def header(self) -> str:
+        """Server-Timing value, e.g. 'dictionary;dur=1.2, llm;dur=412.0, total;dur=420.3'"""
+        parts = [
+            f"{name};dur={ms:.1f}" + (f';desc="x{count}"' if count > 1 else "")
+            for name, ms, count in self.stages()
+        ]
+        parts.append(f"total;dur={self.total_ms():.1f}")
+        return ", ".join(parts)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "stages_ms": {name: round(ms, 2) for name, ms, _ in self.stages()},
+            "total_ms": round(self.total_ms(), 2),
+        }
+
+
+_current: ContextVar[Optional[StageTimings]] = ContextVar("stage_timings", default=None)
+
+
+def current_timings() -> Optional[StageTimings]:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block as a stage of the current request (no-op outside one)"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def record(name: str, seconds: float):
+    """Add an already measured duration to the current request"""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware: one StageTimings per API request
+
+    Worker threads (run_in_threadpool, asyncio.to_thread) copy the context,
+    so their stages land in the same request. Streaming responses send the
+    header with the stages finished before the first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.ENABLE_STAGE_TIMING
+            or not scope["path"].startswith(TIMED_PATH_PREFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        timings = StageTimings()
+        token = _current.set(timings)
+        debug = dict(scope["headers"]).get(DEBUG_HEADER) in (b"1", b"true")
+        held: Optional[dict] = None
+        body: List[bytes] = []
+
+        def with_header(message: dict, length: Optional[int] = None) -> dict:
+            headers = [
+                (key, value) for key, value in message.get("headers", [])
+                if length is None or key.lower() != b"content-length"
+            ]
+            headers.append((b"server-timing", timings.header().encode("latin-1")))
+            if length is not None:
+                headers.append((b"content-length", str(length).encode()))
+            return {**message, "headers": headers}
+
+        async def send_with_timings(message):
+            nonlocal held
+            if message["type"] == "http.response.start":
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                if debug and content_type.startswith(b"application/json"):
+                    held = message  # Sent once the body is complete
+                    return
+                await send(with_header(message))
+                return
+            if held is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            content = b"".join(body)
+            try:
+                payload = json.loads(content)
+                if isinstance(payload, dict):
+                    payload["debug"] = {"timings": timings.as_dict()}
+                    content = dumps(payload)
+            except ValueError:
+                pass
+            await send(with_header(held, len(content)))
+            await send({"type": "http.response.body", "body": content})
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            _current.reset(token)
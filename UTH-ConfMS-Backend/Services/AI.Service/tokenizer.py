@@ -0,0 +1,172 @@
+"""
+Vietnamese Tokenizer
+Single compiled tokenizer shared by spellcheck, keyword suggestion and the
+paper index: syllable tokenization plus longest-match word segmentation
+against a lexicon of multi-syllable words ("nghiên cứu" stays one word)
+loaded from the language resource file (see resources.py)
+Token streams are cached per text, so the stages of one request tokenize once
+"""
+
+import re
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import settings
+
+
+# Vietnamese + English letters; case-insensitive so accented capitals match too
+LETTERS = "a-zA-ZàáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđĐ"
+SYLLABLE_PATTERN = re.compile(rf"\b[{LETTERS}]+\b", re.IGNORECASE)
+
+# Single-syllable tokens shorter than this are noise for spellcheck and keywords
+MIN_SYLLABLE_LENGTH = 3
+
+_DIACRITICS = str.maketrans({
+    'à': 'a', 'á': 'a', 'ả': 'a', 'ã': 'a', 'ạ': 'a',
+    'ă': 'a', 'ằ': 'a', 'ắ': 'a', 'ẳ': 'a', 'ẵ': 'a', 'ặ': 'a',
+    'â': 'a', 'ầ': 'a', 'ấ': 'a', 'ẩ': 'a', 'ẫ': 'a', 'ậ': 'a',
+    'è': 'e', 'é': 'e', 'ẻ': 'e', 'ẽ': 'e', 'ẹ': 'e',
+    'ê': 'e', 'ề': 'e', 'ế': 'e', 'ể': 'e', 'ễ': 'e', 'ệ': 'e',
+    'ì': 'i', 'í': 'i', 'ỉ': 'i', 'ĩ': 'i', 'ị': 'i',
+    'ò': 'o', 'ó': 'o', 'ỏ': 'o', 'õ': 'o', 'ọ': 'o',
+    'ô': 'o', 'ồ': 'o', 'ố': 'o', 'ổ': 'o', 'ỗ': 'o', 'ộ': 'o',
+    'ơ': 'o', 'ờ': 'o', 'ớ': 'o', 'ở': 'o', 'ỡ': 'o', 'ợ': 'o',
+    'ù': 'u', 'ú': 'u', 'ủ': 'u', 'ũ': 'u', 'ụ': 'u',
+    'ư': 'u', 'ừ': 'u', 'ứ': 'u', 'ử': 'u', 'ữ': 'u', 'ự': 'u',
+    'ỳ': 'y', 'ý': 'y', 'ỷ': 'y', 'ỹ': 'y', 'ỵ': 'y',
+    'đ': 'd', 'Đ': 'D',
+})
+
+
+def fold(text: str) -> str:
+    """Remove Vietnamese diacritics"""
+    return text.translate(_DIACRITICS)
+
+
+def fold_key(text: str) -> str:
+    """Lookup key: lowercase, no diacritics, single spaces"""
+    return " ".join(fold(text.lower()).split())
+
+
+class Token:
+    """A syllable or segmented word with its span in the source text"""
+
+    __slots__ = ("text", "start", "end", "key", "size")
+
+    def __init__(self, text: str, start: int, end: int, key: str, size: int):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.key = key  # fold_key(text)
+        self.size = size  # Number of syllables
+
+    def __repr__(self) -> str:
+        return f"Token({self.text!r}, {self.start}, {self.end})"
+
+
+class Lexicon:
+    """Multi-syllable words used for longest-match segmentation, keyed by fold_key"""
+
+    def __init__(self, words: Iterable[str], version: str):
+        self.forms: Dict[str, str] = {
+            fold_key(w): " ".join(w.split()) for w in words if len(w.split()) > 1
+        }
+        # Proper prefixes of words, so segmentation stops extending a run early
+        self.prefixes = frozenset(
+            " ".join(k.split()[:n]) for k in self.forms for n in range(1, len(k.split()))
+        )
+        self.version = version
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.forms
+
+    def form(self, key: str) -> Optional[str]:
+        """Correctly accented form of a word, if known"""
+        return self.forms.get(key)
+
+
+# Empty until resources.py installs the lexicon from the resource file
+_lexicon = Lexicon([], version="empty")
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon() -> Lexicon:
+    return _lexicon
+
+
+# Lexicon of callers that pass none; resources.py makes it follow the request's conference
+_default_lexicon: Callable[[], Lexicon] = get_lexicon
+
+
+def set_lexicon_resolver(resolver: Callable[[], Lexicon]):
+    global _default_lexicon
+    _default_lexicon = resolver
+
+
+def set_lexicon(lexicon: Lexicon):
+    """Swap the segmentation lexicon; cached streams of the old one stop being used"""
+    global _lexicon
+    with _lexicon_lock:
+        _lexicon = lexicon
+
+
+@lru_cache(maxsize=settings.TOKENIZER_CACHE_ENTRIES)
+def syllables(text: str) -> Tuple[Token, ...]:
+    """All letter runs of the text, in order"""
+    return tuple(
+        Token(m.group(), m.start(), m.end(), fold(m.group().lower()), 1)
+        for m in SYLLABLE_PATTERN.finditer(text)
+    )
+
+
+@lru_cache(maxsize=settings.TOKENIZER_CACHE_ENTRIES)
+def _segment(text: str, lexicon: Lexicon) -> Tuple[Token, ...]:
+    sylls = syllables(text)
+    forms, prefixes = lexicon.forms, lexicon.prefixes
+    words: List[Token] = []
+    i = 0
+    n = len(sylls)
+    while i < n:
+        # Longest run of whitespace-separated syllables that is a lexicon word
+        first = sylls[i]
+        key = first.key
+        size = 1
+        best_key = key
+        j = i + 1
+        while key in prefixes and j < n and text[sylls[j - 1].end:sylls[j].start].isspace():
+            key = key + " " + sylls[j].key
+            j += 1
+            if key in forms:
+                size = j - i
+                best_key = key
+        if size == 1:
+            words.append(first)
+        else:
+            start, end = first.start, sylls[i + size - 1].end
+            words.append(Token(text[start:end], start, end, best_key, size))
+        i += size
+    return tuple(words)
+
+
+def segment(text: str, lexicon: Optional[Lexicon] = None) -> Tuple[Token, ...]:
+    """Words of the text: lexicon words merged, other syllables as-is"""
+    # The lexicon is part of the cache key, so a swap never serves stale streams
+    return _segment(text, lexicon or _default_lexicon())
+
+
+def terms(text: str, lexicon: Optional[Lexicon] = None) -> List[str]:
+    """
+    Lowercased words for keyword extraction and indexing
+    Multi-syllable words are always kept; syllables need MIN_SYLLABLE_LENGTH
+    """
+    return [
+        " ".join(t.text.lower().split())
+        for t in segment(text, lexicon)
+        if t.size > 1 or len(t.text) >= MIN_SYLLABLE_LENGTH
+    ]
+
+
+def cache_stats() -> dict:
+    info = _segment.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "entries": info.currsize}